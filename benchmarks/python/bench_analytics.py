@@ -0,0 +1,157 @@
+"""
+Analytics Benchmark for Energy Tracker
+Measures wall time, peak traced memory and allocations of the chart and
+summary functions on generated data, from 30 days to 10 years of history and
+from 1 to 10k users. Results are written as JSON and can be compared against
+a previous run (e.g. from another commit).
+
+Usage:
+    python benchmarks/python/bench_analytics.py [--quick] [--output results.json]
+        [--compare baseline.json] [--threshold 1.2]
+"""
+
+import argparse
+import sys
+
+from harness import compare_results, measure, report_comparison, write_results
+
+from analytics import energy_analytics as ea
+from analytics.sample_data import generate_bulk_sample_data
+
+FUNCTIONS = {
+    'plot_energy_correlations': lambda df: ea.plot_energy_correlations(df),
+    'plot_history_chart': lambda df: ea.plot_history_chart(
+        df, ['physical_energy', 'cognitive_clarity', 'mood']
+    ),
+    'plot_time_breakdown': lambda df: ea.plot_time_breakdown(df),
+    'plot_metric_trend': lambda df: ea.plot_metric_trend(df, 'physical_energy'),
+    'calculate_summary_metrics': lambda df: ea.calculate_summary_metrics(df),
+}
+
+DAYS = (30, 365, 3650)
+USERS = (1, 100, 10000)
+QUICK_DAYS = (30, 365)
+QUICK_USERS = (1, 10)
+
+# Cases above this many generated rows are skipped unless --max-rows is raised
+MAX_ROWS = 5_000_000
+
+
+def run_case(function: str, partitions: list, rows: int, repeat: int) -> dict:
+    """
+    Benchmark one function over every user partition.
+
+    Args:
+        function: Key of FUNCTIONS
+        partitions: One DataFrame per user
+        rows: Total number of rows across partitions
+        repeat: Number of timed runs
+
+    Returns:
+        dict: Measurements plus rows and throughput
+    """
+    fn = FUNCTIONS[function]
+
+    def work():
+        return [fn(user_df) for user_df in partitions]
+
+    # Multi-user cases are long enough that a warmup run only adds time
+    warmup = 1 if len(partitions) == 1 else 0
+    result = measure(work, repeat=repeat if len(partitions) == 1 else 1, warmup=warmup)
+    result['rows'] = rows
+    result['rows_per_s'] = rows / result['wall_s_min'] if result['wall_s_min'] else None
+    return result
+
+
+def run_benchmark(
+    days_grid=DAYS,
+    users_grid=USERS,
+    functions=tuple(FUNCTIONS),
+    repeat: int = 3,
+    max_rows: int = MAX_ROWS
+) -> list:
+    """
+    Run every function over the days x users grid.
+
+    Args:
+        days_grid: History lengths in days
+        users_grid: Numbers of users
+        functions: Functions to benchmark (keys of FUNCTIONS)
+        repeat: Number of timed runs for single-user cases
+        max_rows: Skip cases whose generated data would exceed this many rows
+
+    Returns:
+        list: One result dict per case with name, function, days, users and
+        either measurements or 'skipped'
+    """
+    results = []
+    for days in days_grid:
+        for n_users in users_grid:
+            # About 2.6 check-ins per user per day
+            estimate = int(days * n_users * 2.6)
+            if estimate > max_rows:
+                for function in functions:
+                    results.append({
+                        'name': f'{function}/days={days}/users={n_users}',
+                        'function': function, 'days': days, 'users': n_users,
+                        'skipped': f'~{estimate} rows exceeds --max-rows',
+                    })
+                continue
+
+            df = generate_bulk_sample_data(days=days, n_users=n_users)
+            partitions = [
+                user_df.drop(columns='user_id').reset_index(drop=True)
+                for _, user_df in df.groupby('user_id', sort=False)
+            ]
+            rows = len(df)
+            del df
+
+            for function in functions:
+                result = {
+                    'name': f'{function}/days={days}/users={n_users}',
+                    'function': function, 'days': days, 'users': n_users,
+                }
+                result.update(run_case(function, partitions, rows, repeat))
+                results.append(result)
+                print(f"{result['name']:<48} {result['wall_s_min'] * 1000:10.1f} ms  "
+                      f"peak {result['peak_bytes'] / 2**20:8.1f} MiB  "
+                      f"blocks {result['alloc_blocks']:>8}", flush=True)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='Small grid for quick checks')
+    parser.add_argument('--days', type=int, nargs='+', help='History lengths in days')
+    parser.add_argument('--users', type=int, nargs='+', help='Numbers of users')
+    parser.add_argument('--functions', nargs='+', choices=sorted(FUNCTIONS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-rows', type=int, default=MAX_ROWS)
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--metric', default='wall_s_min',
+                        choices=('wall_s_min', 'wall_s_median', 'peak_bytes', 'alloc_blocks'))
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Ratio above which a case counts as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(
+        days_grid=args.days or (QUICK_DAYS if args.quick else DAYS),
+        users_grid=args.users or (QUICK_USERS if args.quick else USERS),
+        functions=args.functions or tuple(FUNCTIONS),
+        repeat=args.repeat,
+        max_rows=args.max_rows,
+    )
+
+    if args.output:
+        write_results(args.output, 'analytics', results)
+
+    if args.compare:
+        measured = [r for r in results if 'skipped' not in r]
+        comparison = compare_results(args.compare, measured, args.metric, args.threshold)
+        return 1 if report_comparison(comparison, args.metric) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
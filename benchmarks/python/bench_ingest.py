@@ -0,0 +1,132 @@
+"""
+Ingestion Benchmark for Energy Tracker Analytics
+Compares handing check-in batches to the analytics code as JSON records
+(json.loads plus the pandas constructor) against Arrow IPC files read with
+analytics.arrow_io, memory-mapped and read into memory. Both payloads are
+written to disk once; each case measures getting from the file to a frame
+the analytics functions accept.
+
+peak_bytes only covers Python allocations (tracemalloc); Arrow cases also
+report arrow_bytes, the Arrow memory pool allocated by the read.
+
+Usage:
+    python benchmarks/python/bench_ingest.py [--rows 1000000] [--output results.json]
+        [--compare baseline.json] [--threshold 1.2]
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from harness import compare_results, measure, report_comparison, write_results
+
+from analytics.arrow_io import _pyarrow, read_arrow, write_arrow
+from analytics.sample_data import generate_bulk_sample_data
+from analytics.schema import to_analytics_frame
+
+ROWS = 1_000_000
+DAYS = 365
+
+
+def make_payloads(rows: int, directory: str) -> dict:
+    """
+    Generate about `rows` check-ins and write them as JSON and Arrow.
+
+    Args:
+        rows: Number of rows
+        directory: Directory receiving the payload files
+
+    Returns:
+        dict: Paths keyed by format ('json', 'arrow')
+    """
+    # About 2.6 check-ins per user per day
+    n_users = max(1, math.ceil(rows / (DAYS * 2.6)))
+    df = generate_bulk_sample_data(days=DAYS, n_users=n_users).head(rows)
+
+    paths = {'json': os.path.join(directory, 'check_ins.json'),
+             'arrow': os.path.join(directory, 'check_ins.arrow')}
+    df.to_json(paths['json'], orient='records', date_format='iso')
+    write_arrow(df, paths['arrow'])
+    return paths
+
+
+def read_json(path: str, typed: bool = False) -> pd.DataFrame:
+    """Parse JSON records into a frame, as the JSON hand-off does."""
+    with open(path, 'rb') as f:
+        records = json.loads(f.read())
+    df = pd.DataFrame.from_records(records)
+    df['date'] = pd.to_datetime(df['date'], format='ISO8601')
+    return to_analytics_frame(df) if typed else df
+
+
+def run_benchmark(rows: int = ROWS, repeat: int = 3) -> list:
+    """
+    Time every ingestion path on the same data.
+
+    Args:
+        rows: Number of check-in rows
+        repeat: Number of timed runs
+
+    Returns:
+        list: One result dict per case with name, format, rows, payload
+        size and measurements
+    """
+    pa = _pyarrow()
+    cases = {
+        'json': ('json', lambda path: read_json(path)),
+        'json_typed': ('json', lambda path: read_json(path, typed=True)),
+        'arrow_mmap': ('arrow', lambda path: read_arrow(path)),
+        'arrow_read': ('arrow', lambda path: read_arrow(path, memory_map=False)),
+    }
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_payloads(rows, directory)
+        for name, (fmt, read) in cases.items():
+            path = paths[fmt]
+            result = {'name': f'{name}/rows={rows}', 'format': fmt, 'rows': rows,
+                      'payload_bytes': os.path.getsize(path)}
+            result.update(measure(lambda: read(path), repeat=repeat, warmup=1))
+            if fmt == 'arrow':
+                before = pa.total_allocated_bytes()
+                df = read(path)
+                result['arrow_bytes'] = pa.total_allocated_bytes() - before
+                del df
+            result['rows_per_s'] = rows / result['wall_s_min'] if result['wall_s_min'] else None
+            results.append(result)
+            print(f"{result['name']:<32} {result['wall_s_min'] * 1000:10.1f} ms  "
+                  f"peak {result['peak_bytes'] / 2**20:8.1f} MiB  "
+                  f"blocks {result['alloc_blocks']:>8}", flush=True)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--metric', default='wall_s_min',
+                        choices=('wall_s_min', 'wall_s_median', 'peak_bytes', 'alloc_blocks'))
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Ratio above which a case counts as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(rows=args.rows, repeat=args.repeat)
+
+    if args.output:
+        write_results(args.output, 'ingest', results)
+
+    if args.compare:
+        comparison = compare_results(args.compare, results, args.metric, args.threshold)
+        return 1 if report_comparison(comparison, args.metric) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Peak Memory Benchmark for Energy Tracker
+Measures the peak resident set size an analytics call adds on top of its
+input frame, each case in a fresh process. Runs the current tree with and
+without pandas copy-on-write and, optionally, a baseline source tree (e.g. a
+git worktree of an older commit) to show memory before and after a change.
+
+Usage:
+    git worktree add /tmp/energy-baseline <commit>
+    python benchmarks/python/bench_memory.py [--baseline-src /tmp/energy-baseline/src]
+        [--days 3650] [--users 50] [--output results.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+
+from harness import SRC_DIR, write_results
+
+# Calls that exist in every version of energy_analytics
+FUNCTIONS = {
+    'plot_energy_correlations': lambda ea, df: ea.plot_energy_correlations(df),
+    'plot_history_chart': lambda ea, df: ea.plot_history_chart(
+        df, ['physical_energy', 'cognitive_clarity', 'mood']
+    ),
+    'plot_time_breakdown': lambda ea, df: ea.plot_time_breakdown(df),
+    'plot_metric_trend': lambda ea, df: ea.plot_metric_trend(df, 'physical_energy'),
+    'calculate_summary_metrics': lambda ea, df: ea.calculate_summary_metrics(df),
+}
+
+
+def _status_kib(field: str) -> int:
+    """A memory field of /proc/self/status in KiB (0 if unavailable)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _reset_peak() -> bool:
+    """Reset the kernel's peak RSS counter (Linux); False if unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def measure_peak(function: str, data_path: str, src: str, copy_on_write: bool) -> dict:
+    """
+    Peak RSS added by one call, measured in this process.
+
+    The call runs once as warmup (lazy imports, caches), then the peak
+    counter is reset and the call runs again.
+
+    Returns:
+        dict: rss_bytes (resident before the call) and peak_delta_bytes
+    """
+    sys.path.insert(0, src)
+    import matplotlib
+    matplotlib.use('Agg')
+    import pandas as pd
+    from analytics import energy_analytics as ea
+
+    pd.set_option('mode.copy_on_write', copy_on_write)
+    with open(data_path, 'rb') as f:
+        df = pickle.load(f)
+    fn = FUNCTIONS[function]
+
+    fn(ea, df)
+    gc.collect()
+    rss = _status_kib('VmRSS')
+    if _reset_peak():
+        fn(ea, df)
+        peak = _status_kib('VmHWM')
+    else:
+        # Peak since process start; includes loading the data
+        fn(ea, df)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'rss_bytes': rss * 1024, 'peak_delta_bytes': max(peak - rss, 0) * 1024}
+
+
+def run_case(function: str, data_path: str, src: str, copy_on_write: bool) -> dict:
+    """Run measure_peak in a fresh interpreter."""
+    command = [sys.executable, os.path.abspath(__file__), '--worker', function,
+               '--data', data_path, '--src', src]
+    if copy_on_write:
+        command.append('--copy-on-write')
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=3650, help='History length in days')
+    parser.add_argument('--users', type=int, default=50,
+                        help='Generated users merged into one long history')
+    parser.add_argument('--functions', nargs='+', choices=sorted(FUNCTIONS))
+    parser.add_argument('--baseline-src', help='src directory of a baseline tree')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--worker', choices=sorted(FUNCTIONS), help=argparse.SUPPRESS)
+    parser.add_argument('--data', help=argparse.SUPPRESS)
+    parser.add_argument('--src', default=SRC_DIR, help=argparse.SUPPRESS)
+    parser.add_argument('--copy-on-write', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(measure_peak(args.worker, args.data, args.src, args.copy_on_write)))
+        return 0
+
+    from analytics.sample_data import generate_bulk_sample_data
+
+    # One long, date-ordered history in the raw (untyped) schema every version reads
+    df = generate_bulk_sample_data(days=args.days, n_users=args.users)
+    df = df.drop(columns='user_id').sort_values('date', kind='stable').reset_index(drop=True)
+    variants = [('current', SRC_DIR, False), ('current+cow', SRC_DIR, True)]
+    if args.baseline_src:
+        variants.insert(0, ('baseline', os.path.abspath(args.baseline_src), False))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, 'frame.pkl')
+        with open(data_path, 'wb') as f:
+            pickle.dump(df, f)
+        frame_bytes = int(df.memory_usage(deep=True).sum())
+        print(f'{len(df)} rows, frame {frame_bytes / 2**20:.1f} MiB')
+        print(f"{'function':<28}" + ''.join(f'{name:>16}' for name, _, _ in variants))
+
+        for function in args.functions or list(FUNCTIONS):
+            row = []
+            for name, src, copy_on_write in variants:
+                result = run_case(function, data_path, src, copy_on_write)
+                result.update({'name': f'{function}/{name}', 'function': function,
+                               'variant': name, 'rows': len(df), 'frame_bytes': frame_bytes})
+                results.append(result)
+                row.append(result['peak_delta_bytes'])
+            print(f'{function:<28}' + ''.join(f'{b / 2**20:12.1f} MiB' for b in row),
+                  flush=True)
+
+    if args.output:
+        write_results(args.output, 'memory', results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
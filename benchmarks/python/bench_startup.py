@@ -0,0 +1,117 @@
+"""
+Startup Benchmark for Energy Tracker Analytics
+Measures cold import time and peak RSS of the analytics module in a fresh
+interpreter, for compute-only use and for the render path.
+
+Usage:
+    python benchmarks/python/bench_startup.py [--repeat 5] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src'))
+
+# Each probe runs in its own interpreter so module caches never leak between runs
+_PROBE = r'''
+import json, resource, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import analytics.energy_analytics as ea
+import_s = time.perf_counter() - start
+if {work!r} != 'import':
+    from analytics.sample_data import generate_sample_data
+    df = generate_sample_data(days=90)
+    start = time.perf_counter()
+    ea.compute_energy_correlations(df)
+    ea.compute_time_breakdown(df)
+    ea.compute_metric_trend(df, 'physical_energy')
+    ea.calculate_summary_metrics(df)
+    if {work!r} == 'render':
+        ea.plot_energy_correlations(df)
+        ea.plot_time_breakdown(df)
+        ea.plot_metric_trend(df, 'physical_energy')
+    work_s = time.perf_counter() - start
+else:
+    work_s = 0.0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss //= 1024
+print(json.dumps({{
+    'import_s': import_s,
+    'work_s': work_s,
+    'peak_rss_kb': rss,
+    'matplotlib_loaded': 'matplotlib' in sys.modules,
+    'seaborn_loaded': 'seaborn' in sys.modules,
+}}))
+'''
+
+SCENARIOS = ('import', 'compute', 'render')
+
+
+def run_probe(work: str) -> dict:
+    """
+    Run one probe in a fresh interpreter.
+
+    Args:
+        work: 'import', 'compute' or 'render'
+
+    Returns:
+        dict: Timings, peak RSS and which plotting modules were loaded
+    """
+    code = _PROBE.format(src=SRC_DIR, work=work)
+    output = subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(repeat: int = 5) -> dict:
+    """
+    Run every startup scenario several times and summarize the results.
+
+    Args:
+        repeat: Number of fresh interpreters per scenario
+
+    Returns:
+        dict: {scenario: {'import_s', 'work_s', 'peak_rss_kb', ...}} with
+        median timings and the maximum peak RSS
+    """
+    results = {}
+    for work in SCENARIOS:
+        runs = [run_probe(work) for _ in range(repeat)]
+        results[work] = {
+            'import_s': statistics.median(r['import_s'] for r in runs),
+            'work_s': statistics.median(r['work_s'] for r in runs),
+            'peak_rss_kb': max(r['peak_rss_kb'] for r in runs),
+            'matplotlib_loaded': runs[0]['matplotlib_loaded'],
+            'seaborn_loaded': runs[0]['seaborn_loaded'],
+        }
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.repeat)
+    for work, result in results.items():
+        print(f"{work:>8}: import {result['import_s'] * 1000:7.1f} ms  "
+              f"work {result['work_s'] * 1000:7.1f} ms  "
+              f"peak RSS {result['peak_rss_kb'] / 1024:6.1f} MiB  "
+              f"matplotlib={'yes' if result['matplotlib_loaded'] else 'no'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
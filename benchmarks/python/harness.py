@@ -0,0 +1,154 @@
+"""
+Benchmark Harness for Energy Tracker Analytics
+Shared helpers for timing and memory measurement, machine-readable result
+files and comparison between two runs (e.g. two commits).
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def measure(fn: Callable[[], Any], repeat: int = 3, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time a callable and measure its memory use.
+
+    Timing runs and the memory run are separate so tracemalloc overhead does
+    not distort wall times.
+
+    Args:
+        fn: Zero-argument callable to benchmark
+        repeat: Number of timed runs
+        warmup: Number of untimed runs before timing
+
+    Returns:
+        dict: wall_s_min, wall_s_median, peak_bytes (tracemalloc peak above
+        the starting point) and alloc_blocks (net blocks still allocated)
+    """
+    for _ in range(warmup):
+        fn()
+
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    gc.collect()
+
+    return {
+        'wall_s_min': min(times),
+        'wall_s_median': statistics.median(times),
+        'peak_bytes': peak - baseline,
+        'alloc_blocks': sys.getallocatedblocks() - blocks_before,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """
+    Describe the environment a benchmark ran in.
+
+    Returns:
+        dict: git commit, timestamp, Python/platform and library versions
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(__file__), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+
+    info = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    for module in ('numpy', 'pandas', 'matplotlib'):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = 'missing'
+    return info
+
+
+def write_results(path: str, suite: str, results: List[Dict[str, Any]]) -> None:
+    """
+    Write benchmark results as JSON.
+
+    Args:
+        path: Output file
+        suite: Name of the benchmark suite
+        results: One dict per case, each with a unique 'name'
+    """
+    with open(path, 'w') as f:
+        json.dump({'suite': suite, 'meta': environment(), 'results': results}, f, indent=2)
+
+
+def compare_results(
+    baseline_path: str,
+    current: List[Dict[str, Any]],
+    metric: str = 'wall_s_min',
+    threshold: float = 1.2
+) -> List[Dict[str, Any]]:
+    """
+    Compare results against a baseline file.
+
+    Args:
+        baseline_path: JSON file written by write_results
+        current: Results of the current run
+        metric: Result field to compare
+        threshold: Ratio (current / baseline) above which a case regressed
+
+    Returns:
+        list: One dict per case present in both runs with name, baseline,
+        current, ratio and regressed
+    """
+    with open(baseline_path) as f:
+        baseline = {r['name']: r for r in json.load(f)['results']}
+
+    comparison = []
+    for result in current:
+        before = baseline.get(result['name'])
+        if before is None or not before.get(metric):
+            continue
+        ratio = result[metric] / before[metric]
+        comparison.append({
+            'name': result['name'],
+            'baseline': before[metric],
+            'current': result[metric],
+            'ratio': ratio,
+            'regressed': ratio > threshold,
+        })
+    return comparison
+
+
+def report_comparison(comparison: List[Dict[str, Any]], metric: str) -> Optional[int]:
+    """Print a comparison table and return the number of regressions."""
+    for row in comparison:
+        flag = '  REGRESSION' if row['regressed'] else ''
+        print(f"{row['name']:<48} {metric} {row['baseline']:.4g} -> "
+              f"{row['current']:.4g} ({row['ratio']:.2f}x){flag}")
+    return sum(row['regressed'] for row in comparison)
@@ -0,0 +1,119 @@
+"""
+Load Test for the Energy Tracker Analytics API
+Builds a local stand-in database, runs the app in-process and fires
+concurrent requests across users and routes, reporting throughput, latency
+percentiles and cache counters.
+
+Usage:
+    python benchmarks/python/load_test_api.py [--users 50] [--requests 500]
+        [--concurrency 32] [--workers 4] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from harness import write_results
+
+import httpx
+
+from api.data.generate_sample_data import create_database
+from api.main import create_app
+
+ROUTES = (
+    ('/api/analytics/correlations', {}),
+    ('/api/analytics/history', {'metrics': 'physical_energy,mood'}),
+    ('/api/analytics/time-breakdown', {}),
+    ('/api/analytics/trend', {'metric': 'physical_energy'}),
+    ('/api/analytics/summary', {}),
+    ('/api/analytics/trend/image', {'metric': 'mood'}),
+)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_load(app, n_users: int, n_requests: int, concurrency: int) -> dict:
+    """
+    Send n_requests requests with at most concurrency in flight.
+
+    Returns:
+        dict: Throughput, latency percentiles, error count and cache stats
+    """
+    latencies = {route: [] for route, _ in ROUTES}
+    errors = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://load-test',
+                                     timeout=300) as client:
+            async def one(i):
+                nonlocal errors
+                route, params = ROUTES[i % len(ROUTES)]
+                params = dict(params, user_id=f'user-{(i // len(ROUTES)) % n_users}')
+                async with gate:
+                    start = time.perf_counter()
+                    response = await client.get(route, params=params)
+                    await response.aread()
+                    latencies[route].append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(n_requests)))
+            elapsed = time.perf_counter() - start
+            cache = (await client.get('/api/analytics/cache-stats')).json()
+
+    every = [v for values in latencies.values() for v in values]
+    return {
+        'requests': n_requests,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'requests_per_s': n_requests / elapsed,
+        'latency_p50_s': statistics.median(every),
+        'latency_p95_s': _percentile(every, 0.95),
+        'latency_p99_s': _percentile(every, 0.99),
+        'per_route_p50_s': {route: statistics.median(v) for route, v in latencies.items() if v},
+        'cache': cache,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--database', help='Existing stand-in database to use')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = args.database or os.path.join(tmp, 'analytics.db')
+        if not args.database:
+            create_database(database, args.users, args.days)
+        app = create_app(database, workers=args.workers)
+        result = asyncio.run(run_load(app, args.users, args.requests, args.concurrency))
+
+    print(f"{result['requests']} requests in {result['elapsed_s']:.1f} s "
+          f"({result['requests_per_s']:.1f} req/s), errors {result['errors']}")
+    print(f"latency p50 {result['latency_p50_s'] * 1000:.0f} ms  "
+          f"p95 {result['latency_p95_s'] * 1000:.0f} ms  "
+          f"p99 {result['latency_p99_s'] * 1000:.0f} ms  cache {result['cache']}")
+
+    if args.output:
+        result['name'] = f'api/users={args.users}/concurrency={args.concurrency}'
+        write_results(args.output, 'api_load', [result])
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Energy Tracker Analytics Example
+Renders the example charts and prints the summary metrics for generated
+sample data. Run from src/ as ``python -m analytics``.
+"""
+
+from .sample_data import generate_example_usage
+
+if __name__ == '__main__':
+    generate_example_usage()
@@ -0,0 +1,168 @@
+"""
+Arrow Ingestion for Energy Tracker Analytics
+Reads check-in batches from Arrow IPC files (Feather v2) and streams into
+analytics frames. Uncompressed files are memory-mapped and their numeric,
+timestamp and dictionary columns become pandas columns without a copy, so a
+batch handed over by the Node side is never parsed or re-allocated. pyarrow
+is optional and only imported when these functions are used.
+"""
+
+import os
+from typing import Any, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .loader import CHECK_IN_COLUMNS, _to_datetime
+from .schema import to_analytics_frame
+
+# Arrow IPC file magic; anything else is read as an IPC stream
+_FILE_MAGIC = b'ARROW1'
+
+# CheckIn metrics stored as nullable int8 (1-7 scales)
+_CHECK_IN_METRICS = ['physical_energy', 'cognitive_clarity', 'mood17', 'stress']
+
+Source = Union[str, 'os.PathLike[str]', bytes, memoryview, Any]
+
+
+def _pyarrow():
+    """Import pyarrow, with a helpful message when it is missing."""
+    try:
+        import pyarrow
+        import pyarrow.feather  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            'Arrow ingestion requires pyarrow (pip install pyarrow)'
+        ) from exc
+    return pyarrow
+
+
+def check_in_schema():
+    """
+    Arrow schema of a check-in batch, using the analytics column names.
+
+    Returns:
+        pyarrow.Schema: check_in_id, dictionary-encoded user_id and window,
+        date as timestamp[ms] and the 1-7 metrics as int8 (mood17 and stress
+        nullable, as mood17 and stress17 are optional)
+    """
+    pa = _pyarrow()
+    labels = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('check_in_id', pa.string()),
+        ('user_id', labels),
+        ('window', labels),
+        ('date', pa.timestamp('ms')),
+        ('physical_energy', pa.int8()),
+        ('cognitive_clarity', pa.int8()),
+        ('mood17', pa.int8()),
+        ('stress', pa.int8()),
+    ])
+
+
+def check_ins_to_arrow(records: Iterable[Mapping[str, Any]]):
+    """
+    Convert CheckIn records to an Arrow table.
+
+    Args:
+        records: Mappings with the Prisma CheckIn fields (id, userId, window,
+            tsUtc, physical17, cognitive17, mood17, stress17), e.g. rows
+            serialized by the Node side; tsUtc holds datetimes, ISO strings
+            or epoch milliseconds and other fields are ignored
+
+    Returns:
+        pyarrow.Table: Table with check_in_schema()
+    """
+    pa = _pyarrow()
+    schema = check_in_schema()
+    frame = pd.DataFrame.from_records(list(records), columns=list(CHECK_IN_COLUMNS))
+    frame = frame.rename(columns=CHECK_IN_COLUMNS)
+
+    arrays = {
+        'check_in_id': pa.array(frame['check_in_id'], type=pa.string()),
+        'user_id': pa.array(frame['user_id'], type=pa.string()).dictionary_encode(),
+        'window': pa.array(frame['window'], type=pa.string()).dictionary_encode(),
+        'date': pa.array(_to_datetime(frame['date']).to_numpy('datetime64[ms]'),
+                         type=pa.timestamp('ms')),
+    }
+    for col in _CHECK_IN_METRICS:
+        values = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64)
+        arrays[col] = pa.array(values, type=pa.int8(), from_pandas=True)
+    return pa.Table.from_pydict(arrays, schema=schema)
+
+
+def write_arrow(data, path: str) -> None:
+    """
+    Write a frame or Arrow table as an uncompressed Feather v2 file.
+
+    DataFrames are converted to the analytics schema first, so labels are
+    stored as dictionaries in their canonical order. Files are written
+    uncompressed because compressed buffers cannot be memory-mapped.
+
+    Args:
+        data: pandas DataFrame or pyarrow Table
+        path: Output file
+    """
+    pa = _pyarrow()
+    if isinstance(data, pd.DataFrame):
+        data = pa.Table.from_pandas(to_analytics_frame(data), preserve_index=False)
+    pa.feather.write_feather(data, path, compression='uncompressed')
+
+
+def _read_table(source: Source, memory_map: bool):
+    """Read a source into a pyarrow Table without copying its buffers."""
+    pa = _pyarrow()
+    if isinstance(source, pa.Table):
+        return source
+    if isinstance(source, pa.RecordBatch):
+        return pa.Table.from_batches([source])
+    if isinstance(source, (list, tuple)):
+        return pa.Table.from_batches(source)
+
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        source = pa.memory_map(path) if memory_map else pa.OSFile(path)
+    else:
+        source = pa.BufferReader(pa.py_buffer(source))
+
+    with source:
+        magic = source.read(len(_FILE_MAGIC))
+        source.seek(0)
+        if magic == _FILE_MAGIC:
+            return pa.ipc.open_file(source).read_all()
+        return pa.ipc.open_stream(source).read_all()
+
+
+def read_arrow(
+    source: Source,
+    columns: Optional[List[str]] = None,
+    memory_map: bool = True
+) -> pd.DataFrame:
+    """
+    Read an Arrow check-in batch into a DataFrame for the analytics functions.
+
+    Columns without nulls keep their Arrow buffers: numbers and timestamps
+    are used in place (timestamps keep their unit, e.g. datetime64[ms]) and
+    dictionaries become categoricals. With a memory-mapped file only the pages of the requested
+    columns are ever read, and the frame keeps the mapping alive.
+
+    Args:
+        source: Path to an Arrow IPC file (Feather v2) or stream, bytes or a
+            buffer holding one, or a pyarrow Table, RecordBatch or list of
+            RecordBatches
+        columns: Columns to read (default: all)
+        memory_map: Memory-map files instead of reading them into memory
+
+    Returns:
+        pd.DataFrame: Frame in the schema the file was written with (see
+        write_arrow and check_ins_to_arrow)
+
+    Raises:
+        ImportError: If pyarrow is not installed
+        KeyError: If a requested column does not exist
+    """
+    table = _read_table(source, memory_map)
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True, self_destruct=False)
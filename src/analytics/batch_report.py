@@ -0,0 +1,347 @@
+"""
+Nightly Batch Report Runner for Energy Tracker Analytics
+Renders every user's dashboard images and summary in a process pool. Users
+are split into partitions; a worker loads each partition with one bulk call,
+runs all five analytics functions per user and writes PNG bytes plus a
+summary JSON to the output directory. Each rendered user's period averages
+are also stored as a one-user sketch next to the summary; the merged
+population sketch is written next to the reports for percentile lookups.
+Finished users are skipped on the next run, so an interrupted run can simply
+be restarted.
+
+Usage:
+    python -m analytics.batch_report OUTPUT_DIR [--dsn URL] [--user-ids IDS]
+        [--users 1000] [--days 90] [--workers 4] [--partition-size 100]
+        [--no-resume]
+
+Without --dsn, generated sample users are rendered (a demo run).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from .energy_analytics import (
+    calculate_summary_metrics,
+    plot_energy_correlations,
+    plot_history_chart,
+    plot_metric_trend,
+    plot_time_breakdown
+)
+from .loader import ConnectionPool, dsn_connector, energy_frame, load_user_frames, load_user_ids
+from .quantiles import PopulationSketch
+from .sample_data import generate_users_sample_data
+from .schema import to_analytics_frame
+
+HISTORY_METRICS = ['physical_energy', 'cognitive_clarity', 'mood']
+TREND_METRIC = 'physical_energy'
+
+# Written last; its presence marks a user's report as complete
+SUMMARY_FILE = 'summary.json'
+RUN_FILE = 'run.json'
+SKETCH_FILE = 'population.sketch'
+USER_SKETCH_FILE = 'user.sketch'
+
+
+def report_dir(output_dir: str, user_id: Any) -> str:
+    """Directory holding one user's report files."""
+    return os.path.join(output_dir, quote(str(user_id), safe=''))
+
+
+def is_complete(output_dir: str, user_id: Any) -> bool:
+    """Whether a user's report was fully written by an earlier run."""
+    return os.path.exists(os.path.join(report_dir(output_dir, user_id), SUMMARY_FILE))
+
+
+def json_default(value: Any) -> Any:
+    """Convert numpy and pandas scalars for json.dumps (use as its default)."""
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (datetime, date, pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def render_user_report(df: pd.DataFrame, buffer) -> Dict[str, bytes]:
+    """
+    Run all five analytics functions for one user.
+
+    Args:
+        df: The user's energy tracking data
+        buffer: FigureBuffer used to encode the figures
+
+    Returns:
+        dict: File contents keyed by file name (five PNGs and summary.json)
+    """
+    bar_chart, heatmap = plot_energy_correlations(df)
+    history = plot_history_chart(df, HISTORY_METRICS)
+    breakdown = plot_time_breakdown(df)
+    trend, description = plot_metric_trend(df, TREND_METRIC)
+
+    summary = calculate_summary_metrics(df)
+    summary['trend_description'] = description
+
+    return {
+        'correlations.png': buffer.encode(bar_chart),
+        'correlation_heatmap.png': buffer.encode(heatmap),
+        'history.png': buffer.encode(history),
+        'time_breakdown.png': buffer.encode(breakdown),
+        'trend.png': buffer.encode(trend),
+        SUMMARY_FILE: json.dumps(summary, default=json_default, sort_keys=True).encode(),
+    }
+
+
+def write_user_report(output_dir: str, user_id: Any, files: Dict[str, bytes]) -> None:
+    """Write a user's report files, the summary last."""
+    directory = report_dir(output_dir, user_id)
+    os.makedirs(directory, exist_ok=True)
+    for name in sorted(files, key=lambda name: name == SUMMARY_FILE):
+        _write_atomic(os.path.join(directory, name), files[name])
+
+
+def load_sample_partition(
+    user_ids: Sequence[str],
+    days: int = 90,
+    seed: int = 42,
+    start_date: Optional[datetime] = None
+) -> pd.DataFrame:
+    """
+    Load a partition of generated users ('user-{i}', see generate_bulk_sample_data).
+
+    Args:
+        user_ids: Users to load
+        days: Number of days of data per user
+        seed: Base random seed
+        start_date: Starting date for the data
+
+    Returns:
+        pd.DataFrame: Long-format tracking data with a user_id column
+    """
+    indices = [int(str(user_id).rsplit('-', 1)[1]) for user_id in user_ids]
+    return generate_users_sample_data(indices, days, start_date, seed)
+
+
+def load_db_partition(user_ids: Sequence[str], dsn: str) -> pd.DataFrame:
+    """
+    Load a partition of users from the Prisma database.
+
+    Bind the URL with functools.partial to get a picklable load_partition;
+    each call opens and closes its own connection.
+
+    Args:
+        user_ids: Users to load
+        dsn: Database URL, see loader.dsn_connector
+
+    Returns:
+        pd.DataFrame: Long-format tracking data with a user_id column (see
+        loader.energy_frame); pomodoro sessions and happy moments are not
+        loaded, so their summary fields read zero
+    """
+    connect, dialect = dsn_connector(dsn)
+    pool = ConnectionPool(connect, max_size=1)
+    try:
+        frames = load_user_frames(pool, user_ids, dialect=dialect)
+    finally:
+        pool.close()
+    return energy_frame(frames).assign(is_pomodoro=0, happy_moment=None)
+
+
+def _parse_user_ids(value: str) -> List[str]:
+    """Comma-separated user ids, or @path to a file with one id per line."""
+    if value.startswith('@'):
+        with open(value[1:]) as f:
+            return [line.strip() for line in f if line.strip()]
+    return [user_id for user_id in value.split(',') if user_id]
+
+
+def _run_partition(task) -> Dict[str, Any]:
+    """Load one partition and write the report of every user in it."""
+    load_partition, output_dir, user_ids = task
+    from .render import FigureBuffer
+
+    df = to_analytics_frame(load_partition(user_ids))
+    sketch = PopulationSketch()
+    buffer = FigureBuffer()
+    rendered = 0
+    failed = {}
+    seen = set()
+    for user_id, user_df in df.groupby('user_id', sort=False, observed=True):
+        seen.add(str(user_id))
+        try:
+            user_df = user_df.drop(columns='user_id').reset_index(drop=True)
+            files = render_user_report(user_df, buffer)
+            user_sketch = PopulationSketch().add_user(user_df)
+            files[USER_SKETCH_FILE] = user_sketch.to_bytes()
+            write_user_report(output_dir, user_id, files)
+            sketch.merge(user_sketch)
+            rendered += 1
+        except Exception as exc:
+            failed[str(user_id)] = f'{type(exc).__name__}: {exc}'
+    for user_id in user_ids:
+        if str(user_id) not in seen:
+            failed[str(user_id)] = 'no data'
+    return {'users': len(user_ids), 'rendered': rendered, 'failed': failed,
+            'sketch': sketch.to_bytes()}
+
+
+def _print_progress(done: int, total: int, elapsed: float) -> None:
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else float('nan')
+    print(f'[{done:>{len(str(total))}}/{total}] {rate:8.1f} users/s  eta {eta:6.0f} s',
+          file=sys.stderr, flush=True)
+
+
+def run_reports(
+    user_ids: Sequence[str],
+    output_dir: str,
+    load_partition: Callable[[Sequence[str]], pd.DataFrame],
+    workers: Optional[int] = None,
+    partition_size: int = 100,
+    max_tasks_per_child: Optional[int] = 10,
+    resume: bool = True,
+    progress: Optional[Callable[[int, int, float], None]] = _print_progress
+) -> Dict[str, Any]:
+    """
+    Render reports for many users in a process pool.
+
+    Memory per worker is bounded by partition_size (one partition is loaded
+    at a time) and by recycling workers after max_tasks_per_child partitions.
+    SKETCH_FILE merges the one-user sketches of every complete report: the
+    workers' sketches of the users rendered now and, on resume, the sketches
+    stored with the skipped users' reports. Each user is counted once, even
+    after a crash or failed renders.
+
+    Args:
+        user_ids: Users to report on
+        output_dir: Directory receiving one sub-directory per user
+        load_partition: Picklable callable loading a long-format frame with a
+            user_id column for a list of users
+        workers: Number of worker processes (default: CPU count); 1 runs
+            in-process
+        partition_size: Users loaded and rendered per task
+        max_tasks_per_child: Partitions a worker handles before it is replaced
+        resume: Skip users whose report is already complete
+        progress: Called as progress(done, total, elapsed_s) after each
+            partition, or None
+
+    Returns:
+        dict: users, skipped, rendered, failed ({user_id: error}),
+        elapsed_s and users_per_s
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    finished = [resume and is_complete(output_dir, u) for u in user_ids]
+    pending = [u for u, complete in zip(user_ids, finished) if not complete]
+    tasks = [
+        (load_partition, output_dir, pending[i:i + partition_size])
+        for i in range(0, len(pending), partition_size)
+    ]
+
+    stats = {'users': len(user_ids), 'skipped': len(user_ids) - len(pending),
+             'rendered': 0, 'failed': {}}
+    sketch = PopulationSketch()
+    for user_id, complete in zip(user_ids, finished):
+        path = os.path.join(report_dir(output_dir, user_id), USER_SKETCH_FILE)
+        if complete and os.path.exists(path):
+            with open(path, 'rb') as f:
+                sketch.merge(PopulationSketch.from_bytes(f.read()))
+    done = 0
+    start = time.perf_counter()
+
+    def collect(results):
+        nonlocal done
+        for result in results:
+            done += result['users']
+            stats['rendered'] += result['rendered']
+            stats['failed'].update(result['failed'])
+            sketch.merge(PopulationSketch.from_bytes(result['sketch']))
+            if progress is not None:
+                progress(done, len(pending), time.perf_counter() - start)
+
+    if workers == 1 or len(tasks) <= 1:
+        collect(map(_run_partition, tasks))
+    else:
+        with multiprocessing.Pool(workers, maxtasksperchild=max_tasks_per_child) as pool:
+            collect(pool.imap_unordered(_run_partition, tasks))
+
+    _write_atomic(os.path.join(output_dir, SKETCH_FILE), sketch.to_bytes())
+    stats['elapsed_s'] = time.perf_counter() - start
+    stats['users_per_s'] = done / stats['elapsed_s'] if stats['elapsed_s'] > 0 else None
+    with open(os.path.join(output_dir, RUN_FILE), 'w') as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('output_dir')
+    parser.add_argument('--dsn', help='Prisma database URL (postgresql://... or a SQLite '
+                                      'path); default: generated sample users')
+    parser.add_argument('--user-ids', type=_parse_user_ids,
+                        help='Comma-separated user ids or @file with one per line '
+                             '(default: every user with a check-in, or --users sample users)')
+    parser.add_argument('--users', type=int, default=1000, help='Number of sample users')
+    parser.add_argument('--days', type=int, default=90, help='Days of sample data')
+    parser.add_argument('--seed', type=int, default=42, help='Sample data seed')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--partition-size', type=int, default=100)
+    parser.add_argument('--max-tasks-per-child', type=int, default=10)
+    parser.add_argument('--no-resume', action='store_true', help='Re-render finished users')
+    args = parser.parse_args(argv)
+
+    if args.dsn:
+        user_ids = args.user_ids
+        if user_ids is None:
+            pool = ConnectionPool(dsn_connector(args.dsn)[0], max_size=1)
+            try:
+                user_ids = load_user_ids(pool)
+            finally:
+                pool.close()
+        load_partition = partial(load_db_partition, dsn=args.dsn)
+    else:
+        user_ids = args.user_ids or [f'user-{i}' for i in range(args.users)]
+        # Fixed start date so every worker generates the same calendar
+        start_date = datetime.combine(date.today() - timedelta(days=args.days),
+                                      datetime.min.time())
+        load_partition = partial(load_sample_partition, days=args.days, seed=args.seed,
+                                 start_date=start_date)
+
+    stats = run_reports(
+        user_ids,
+        args.output_dir,
+        load_partition,
+        workers=args.workers,
+        partition_size=args.partition_size,
+        max_tasks_per_child=args.max_tasks_per_child,
+        resume=not args.no_resume,
+    )
+    print(f"rendered {stats['rendered']}, skipped {stats['skipped']}, "
+          f"failed {len(stats['failed'])} in {stats['elapsed_s']:.1f} s "
+          f"({stats['users_per_s'] or 0:.1f} users/s)")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
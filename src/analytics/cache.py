@@ -0,0 +1,407 @@
+"""
+Result Cache for Energy Tracker Analytics
+Caches analytics outputs (computed results and encoded figures) keyed on a
+cheap fingerprint of the input frame, with a size-bounded in-memory LRU tier,
+an optional size-bounded on-disk tier and explicit per-user invalidation.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import pandas as pd
+
+
+def fingerprint(df: pd.DataFrame, user_id: Hashable = None, **params) -> str:
+    """
+    Cheap cache key for an analytics call.
+
+    The key covers the user, the latest check-in date, the row count and the
+    call parameters; it does not hash the frame contents, so an edit of an
+    existing check-in must be signalled with ResultCache.invalidate.
+
+    Args:
+        df: Input DataFrame with energy tracking data
+        user_id: User the data belongs to
+        **params: Call parameters (function name, target_metric, ...)
+
+    Returns:
+        str: Hex digest identifying the call
+    """
+    max_date = df['date'].max() if len(df) else None
+    return fingerprint_stats(user_id, max_date, len(df), **params)
+
+
+def fingerprint_stats(user_id: Hashable, max_date: Any, row_count: int, **params) -> str:
+    """
+    Cache key from precomputed input statistics, e.g. a MAX/COUNT query.
+
+    Args:
+        user_id: User the data belongs to
+        max_date: Latest check-in date (Timestamp, string or None)
+        row_count: Number of check-ins
+        **params: Call parameters
+
+    Returns:
+        str: Hex digest identifying the call (equal to fingerprint's for the
+        same frame)
+    """
+    if max_date is not None:
+        max_date = pd.Timestamp(max_date)
+    parts = (str(user_id), str(max_date), int(row_count),
+             sorted((k, repr(v)) for k, v in params.items()))
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of pickled results, grouped by user.
+
+    Values are stored pickled, so every hit returns a fresh copy that callers
+    may modify. The memory tier evicts least recently used entries once
+    max_bytes is exceeded; with a directory, entries are also written to disk
+    and memory misses fall back to it. The disk tier is pruned by file mtime,
+    which disk hits refresh, once it holds more than max_disk_bytes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 2**20,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 512 * 2**20
+    ):
+        """
+        Args:
+            max_bytes: Maximum total size of pickled values kept in memory
+            directory: Optional directory for the on-disk tier
+            max_disk_bytes: Maximum total size of the files in directory
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+        self._entries: 'OrderedDict[str, Tuple[str, bytes]]' = OrderedDict()
+        self._user_keys: Dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, user: str, key: str) -> str:
+        return os.path.join(self.directory, quote(user, safe=''), key + '.pkl')
+
+    def _disk_files(self, user_dir: Optional[str] = None) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of the cached files, optionally of one user directory."""
+        user_dirs = [user_dir] if user_dir else [
+            entry.path for entry in os.scandir(self.directory) if entry.is_dir()
+        ]
+        files = []
+        for path in user_dirs:
+            try:
+                entries = list(os.scandir(path))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.name.endswith('.pkl'):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, entry.path))
+        return files
+
+    def _write_disk(self, user: str, key: str, payload: bytes) -> None:
+        """Write an entry to the disk tier and prune it to max_disk_bytes (lock held)."""
+        path = self._disk_path(user, key)
+        try:
+            self._disk_bytes -= os.path.getsize(path)
+        except FileNotFoundError:
+            pass
+        if len(payload) > self.max_disk_bytes:
+            self._remove_disk(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        self._disk_bytes += len(payload)
+
+        if self._disk_bytes > self.max_disk_bytes:
+            # Recount, since other processes may share the directory
+            files = sorted(self._disk_files())
+            self._disk_bytes = sum(size for _, size, _ in files)
+            for _, size, old_path in files:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                if old_path != path and self._remove_disk(old_path):
+                    self._disk_bytes -= size
+
+    @staticmethod
+    def _remove_disk(path: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _store(self, user: str, key: str, payload: bytes) -> None:
+        """Insert into the memory tier and evict down to max_bytes (lock held)."""
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key)[1])
+            self._user_keys[user].discard(key)
+        if len(payload) > self.max_bytes:
+            return
+        self._entries[key] = (user, payload)
+        self._user_keys.setdefault(user, set()).add(key)
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes:
+            old_key, (old_user, old_payload) = self._entries.popitem(last=False)
+            self._bytes -= len(old_payload)
+            self._user_keys[old_user].discard(old_key)
+            self.evictions += 1
+
+    def get(self, key: str, user_id: Hashable = None) -> Tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Args:
+            key: Key from fingerprint
+            user_id: User the key belongs to (locates the on-disk entry)
+
+        Returns:
+            tuple: (found, value)
+        """
+        user = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, pickle.loads(entry[1])
+
+        if self.directory:
+            path = self._disk_path(user, key)
+            try:
+                with open(path, 'rb') as f:
+                    payload = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                try:
+                    # Mark the file recently used for disk pruning
+                    os.utime(path)
+                except FileNotFoundError:
+                    pass
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(user, key, payload)
+                return True, pickle.loads(payload)
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key: str, value: Any, user_id: Hashable = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Key from fingerprint
+            value: Picklable result
+            user_id: User the result belongs to
+        """
+        user = str(user_id)
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(user, key, payload)
+            # Under the lock, so invalidate cannot remove the user directory
+            # between makedirs and os.replace
+            if self.directory:
+                self._write_disk(user, key, payload)
+
+    def get_or_compute(
+        self,
+        compute: Callable[[], Any],
+        df: pd.DataFrame,
+        user_id: Hashable = None,
+        **params
+    ) -> Any:
+        """
+        Return the cached result of a call, computing and storing it on a miss.
+
+        Args:
+            compute: Zero-argument callable producing the result
+            df: Input DataFrame the result is derived from
+            user_id: User the data belongs to
+            **params: Parameters distinguishing the call (include the function name)
+
+        Returns:
+            The cached or freshly computed result
+        """
+        key = fingerprint(df, user_id, **params)
+        found, value = self.get(key, user_id)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value, user_id)
+        return value
+
+    def invalidate(self, user_id: Hashable) -> int:
+        """
+        Drop every cached result of a user, e.g. when a new check-in lands.
+
+        Args:
+            user_id: User whose results are stale
+
+        Returns:
+            int: Number of entries removed, counting an entry held in memory
+            and on disk once
+        """
+        user = str(user_id)
+        with self._lock:
+            keys = self._user_keys.pop(user, set())
+            for key in keys:
+                self._bytes -= len(self._entries.pop(key)[1])
+            if self.directory:
+                user_dir = os.path.join(self.directory, quote(user, safe=''))
+                files = self._disk_files(user_dir)
+                keys = keys | {os.path.basename(path)[:-len('.pkl')] for _, _, path in files}
+                self._disk_bytes = max(0, self._disk_bytes - sum(size for _, size, _ in files))
+                shutil.rmtree(user_dir, ignore_errors=True)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+            if self.directory:
+                shutil.rmtree(self.directory, ignore_errors=True)
+                os.makedirs(self.directory, exist_ok=True)
+                self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache counters.
+
+        Returns:
+            dict: hits (memory), disk_hits, misses, evictions, entries and
+            bytes held in memory, and disk_bytes held on disk
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'disk_bytes': self._disk_bytes,
+            }
+
+
+class CachedDashboard:
+    """
+    Cached versions of the analytics entry points for one dashboard.
+
+    Plot functions return encoded image bytes instead of figures, so cached
+    entries stay small and can be sent as-is.
+    """
+
+    def __init__(self, cache: Optional[ResultCache] = None, fmt: str = 'png'):
+        """
+        Args:
+            cache: Cache to use (default: a new in-memory ResultCache)
+            fmt: Image format for figures
+        """
+        self.cache = ResultCache() if cache is None else cache
+        self.fmt = fmt
+        self._local = threading.local()
+
+    def _encode(self, fig) -> bytes:
+        # One FigureBuffer per thread, so executor threads can share a dashboard
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            from .render import FigureBuffer
+            buffer = self._local.buffer = FigureBuffer()
+        return buffer.encode(fig, self.fmt)
+
+    def energy_correlations(
+        self,
+        df: pd.DataFrame,
+        user_id: Hashable,
+        target_metric: str = 'physical_energy',
+        category: Optional[Union[str, Sequence[str]]] = None
+    ) -> Tuple[bytes, bytes]:
+        """Cached plot_energy_correlations as (bar chart, heatmap) image bytes."""
+        from .energy_analytics import plot_energy_correlations
+
+        def compute():
+            bar_chart, heatmap = plot_energy_correlations(df, target_metric, category)
+            return self._encode(bar_chart), self._encode(heatmap)
+
+        return self.cache.get_or_compute(
+            compute, df, user_id, function='energy_correlations', fmt=self.fmt,
+            target_metric=target_metric, category=category
+        )
+
+    def history_chart(self, df: pd.DataFrame, user_id: Hashable, metrics_to_show: List[str]) -> bytes:
+        """Cached plot_history_chart as image bytes."""
+        from .energy_analytics import plot_history_chart
+
+        return self.cache.get_or_compute(
+            lambda: self._encode(plot_history_chart(df, metrics_to_show)), df, user_id,
+            function='history_chart', fmt=self.fmt, metrics=list(metrics_to_show)
+        )
+
+    def time_breakdown(self, df: pd.DataFrame, user_id: Hashable) -> bytes:
+        """Cached plot_time_breakdown as image bytes."""
+        from .energy_analytics import plot_time_breakdown
+
+        return self.cache.get_or_compute(
+            lambda: self._encode(plot_time_breakdown(df)), df, user_id,
+            function='time_breakdown', fmt=self.fmt
+        )
+
+    def metric_trend(
+        self,
+        df: pd.DataFrame,
+        user_id: Hashable,
+        metric: str,
+        periods: int = 4,
+        trend_weeks: int = 8
+    ) -> Tuple[bytes, str]:
+        """Cached plot_metric_trend as (image bytes, trend description)."""
+        from .energy_analytics import plot_metric_trend
+
+        def compute():
+            fig, description = plot_metric_trend(df, metric, periods, trend_weeks)
+            return self._encode(fig), description
+
+        return self.cache.get_or_compute(
+            compute, df, user_id, function='metric_trend', fmt=self.fmt,
+            metric=metric, periods=periods, trend_weeks=trend_weeks
+        )
+
+    def summary_metrics(self, df: pd.DataFrame, user_id: Hashable, period_days: int = 30) -> Dict:
+        """Cached calculate_summary_metrics."""
+        from .energy_analytics import calculate_summary_metrics
+
+        return self.cache.get_or_compute(
+            lambda: calculate_summary_metrics(df, period_days), df, user_id,
+            function='summary_metrics', period_days=period_days
+        )
@@ -0,0 +1,41 @@
+"""
+Energy Tracker Analytics Constants
+Shared colors, mood scale and metric names used across the analytics modules.
+"""
+
+# Constants
+PRIMARY_COLOR = '#953599'  # Deep Magenta/Purple
+BACKGROUND_COLOR = '#f8f5f2'
+COLOR_PALETTE = {
+    'physical_energy': '#FF9900',  # Orange
+    'cognitive_clarity': '#B47EB7',  # Light Purple
+    'mood': '#f2bf3f',  # Yellow/Gold
+    'stress': '#c45e99',  # Fuchsia
+}
+
+# Mood scale mapping (1-10, where 10 is most positive)
+MOOD_SCALE = {
+    'Joyful': 10,
+    'Content': 8,
+    'Calm': 7,
+    'Confused': 5,
+    'Annoyed': 4,
+    'Anxious': 3,
+    'Sad': 3,
+    'Scared': 2,
+    'Angry': 1,
+    'Exhausted': 1
+}
+
+# Metrics shown in the core correlation heatmap
+CORE_METRICS = ['physical_energy', 'cognitive_clarity', 'mood_numeric', 'stress',
+                'caffeine', 'hydration']
+
+# Factor categories for filtering correlations; custom trackers form 'custom'
+FACTOR_CATEGORIES = {
+    'core': ['physical_energy', 'cognitive_clarity', 'mood_numeric', 'stress'],
+    'intake': ['caffeine', 'hydration'],
+    'social': ['socializing'],
+    'work': ['hours_worked', 'is_pomodoro'],
+}
+CUSTOM_CATEGORY = 'custom'
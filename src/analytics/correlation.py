@@ -0,0 +1,375 @@
+"""
+Energy Tracker Correlation Engine
+Computes pairwise-complete Pearson correlations for one or many users at once
+from grouped sums, sums of squares and cross-products, with sample sizes and
+two-sided p-values, including lagged correlations over daily means.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+_lgamma = np.vectorize(math.lgamma, otypes=[np.float64])
+
+# Rows per block in pairwise_correlation
+PAIRWISE_BLOCK_ROWS = 65536
+
+# Variances below this fraction of the sum of squares are rounding noise of a
+# constant column and count as zero
+VARIANCE_RTOL = 1e-10
+
+
+def group_codes(
+    df: pd.DataFrame,
+    user_col: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode the user column of a long-format frame as dense integer codes.
+
+    Args:
+        df: Input DataFrame with energy tracking data
+        user_col: Column holding the user id (None treats the frame as one user)
+
+    Returns:
+        tuple: (codes per row, unique user ids in code order)
+    """
+    if user_col is None:
+        return np.zeros(len(df), dtype=np.intp), np.array([None], dtype=object)
+
+    codes, uniques = pd.factorize(df[user_col], sort=True)
+    return codes.astype(np.intp, copy=False), np.asarray(uniques)
+
+
+def _grouped_gram(
+    a: np.ndarray,
+    b: np.ndarray,
+    starts: np.ndarray
+) -> np.ndarray:
+    """
+    Sum the row-wise outer products of a and b within each group.
+
+    Rows must already be sorted by group; starts holds the first row of each
+    group. The result has shape (n_groups, a.shape[1], b.shape[1]).
+    """
+    out = np.empty((len(starts), a.shape[1], b.shape[1]))
+    for i in range(a.shape[1]):
+        out[:, i, :] = np.add.reduceat(a[:, i, None] * b, starts, axis=0)
+    return out
+
+
+def grouped_moments(
+    values: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int
+) -> Dict[str, np.ndarray]:
+    """
+    Compute pairwise-complete sums for every group in a single vectorized pass.
+
+    For each group and column pair (i, j) only rows where both columns are
+    present contribute, which mirrors pandas' pairwise ``corr``.
+
+    Args:
+        values: 2-D float array (rows x columns), NaN marks a missing value
+        codes: Group code per row in the range [0, n_groups)
+        n_groups: Number of groups
+
+    Returns:
+        dict: Arrays of shape (n_groups, k, k):
+            n   - rows where both i and j are present
+            sx  - sum of x_i over those rows
+            sxx - sum of x_i squared over those rows
+            sxy - sum of x_i * x_j over those rows
+        Sums are taken over values shifted by each group's per-column mean,
+        which is returned as ``shift`` (shape (n_groups, k)); correlations are
+        shift invariant.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    k = values.shape[1]
+    moments = {
+        name: np.zeros((n_groups, k, k))
+        for name in ('n', 'sx', 'sxx', 'sxy')
+    }
+    moments['shift'] = np.zeros((n_groups, k))
+    if len(values) == 0:
+        return moments
+
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    present = sorted_codes[starts]
+
+    sorted_values = values[order]
+    mask = ~np.isnan(sorted_values)
+    z = np.where(mask, sorted_values, 0.0)
+    # Shift each group's columns by their means so the raw sums stay well
+    # conditioned and a column that is constant within a group stays near zero
+    shift = np.add.reduceat(z, starts, axis=0) / np.maximum(
+        np.add.reduceat(mask, starts, axis=0), 1
+    )
+    moments['shift'][present] = shift
+    z -= np.repeat(shift, np.diff(np.r_[starts, len(z)]), axis=0)
+    z[~mask] = 0.0
+    m = mask.astype(np.float64)
+
+    moments['n'][present] = _grouped_gram(m, m, starts)
+    moments['sx'][present] = _grouped_gram(z, m, starts)
+    moments['sxx'][present] = _grouped_gram(z * z, m, starts)
+    moments['sxy'][present] = _grouped_gram(z, z, starts)
+    return moments
+
+
+def correlations_from_moments(moments: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Turn grouped pairwise moments into Pearson correlation matrices.
+
+    Pairs with fewer than two complete rows or zero variance are NaN,
+    matching ``DataFrame.corr``; variances within VARIANCE_RTOL of the sum of
+    squares are rounding noise of a constant column and count as zero.
+
+    Args:
+        moments: Output of grouped_moments
+
+    Returns:
+        np.ndarray: Correlation matrices of shape (n_groups, k, k)
+    """
+    n, sx, sxx, sxy = (moments[key] for key in ('n', 'sx', 'sxx', 'sxy'))
+    sx_t = np.swapaxes(sx, 1, 2)
+    var = n * sxx - sx ** 2
+    var[var <= VARIANCE_RTOL * n * sxx] = 0.0
+    cov = n * sxy - sx * sx_t
+    denom = var * np.swapaxes(var, 1, 2)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.sqrt(denom)
+    corr[(n < 2) | ~(denom > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def grouped_correlations(
+    values: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int
+) -> np.ndarray:
+    """
+    Compute one pairwise-complete correlation matrix per group.
+
+    Args:
+        values: 2-D float array (rows x columns), NaN marks a missing value
+        codes: Group code per row in the range [0, n_groups)
+        n_groups: Number of groups
+
+    Returns:
+        np.ndarray: Correlation matrices of shape (n_groups, k, k)
+    """
+    return correlations_from_moments(grouped_moments(values, codes, n_groups))
+
+
+def pairwise_correlation(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute pairwise-complete r, n and p-value matrices for one group.
+
+    The moments come from four masked matrix products (mask'mask, z'mask,
+    (z*z)'mask and z'z), so the whole matrix costs one BLAS pass over the
+    data instead of a loop over column pairs. Rows are processed in blocks of
+    PAIRWISE_BLOCK_ROWS, so the temporaries stay small for long histories.
+
+    Args:
+        values: 2-D float array (rows x columns), NaN marks a missing value
+
+    Returns:
+        dict: Arrays of shape (k, k):
+            r - Pearson correlation over rows where both columns are present
+                (NaN for fewer than two rows or zero variance)
+            n - number of those rows
+            p - two-sided p-value of r (NaN where r is NaN or n < 3)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    k = values.shape[1]
+    blocks = [values[start:start + PAIRWISE_BLOCK_ROWS]
+              for start in range(0, len(values), PAIRWISE_BLOCK_ROWS)]
+
+    # Shift each column by its mean so the raw sums stay well conditioned
+    totals, counts = np.zeros(k), np.zeros(k)
+    for block in blocks:
+        mask = ~np.isnan(block)
+        totals += np.where(mask, block, 0.0).sum(axis=0)
+        counts += mask.sum(axis=0)
+    shift = totals / np.maximum(counts, 1)
+
+    moments = {key: np.zeros((1, k, k)) for key in ('n', 'sx', 'sxx', 'sxy')}
+    moments['shift'] = shift[None]
+    for block in blocks:
+        mask = ~np.isnan(block)
+        m = mask.astype(np.float64)
+        z = np.where(mask, block - shift, 0.0)
+        moments['n'][0] += m.T @ m
+        moments['sx'][0] += z.T @ m
+        moments['sxy'][0] += z.T @ z
+        z *= z
+        moments['sxx'][0] += z.T @ m
+    r = correlations_from_moments(moments)[0]
+    n = np.rint(moments['n'][0]).astype(np.int64)
+    return {'r': r, 'n': n, 'p': correlation_p_values(r, n)}
+
+
+def _betacf(a: np.ndarray, b: np.ndarray, x: np.ndarray, max_iter: int = 300) -> np.ndarray:
+    """Continued fraction of the incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = 1.0 / np.where(np.abs(d) < tiny, tiny, d)
+    h = d.copy()
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / np.where(np.abs(d) < tiny, tiny, d)
+            c = 1.0 + aa / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            delta = d * c
+            h *= delta
+        if np.all(np.abs(delta - 1.0) < 1e-15):
+            break
+    return h
+
+
+def _betainc(a: np.ndarray, b: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Regularized incomplete beta function I_x(a, b), elementwise."""
+    # The continued fraction converges fast below (a + 1) / (a + b + 2)
+    flip = x > (a + 1.0) / (a + b + 2.0)
+    a, b, x = np.where(flip, b, a), np.where(flip, a, b), np.where(flip, 1.0 - x, x)
+    with np.errstate(divide='ignore'):
+        log_front = (_lgamma(a + b) - _lgamma(a) - _lgamma(b)
+                     + a * np.log(x) + b * np.log1p(-x))
+    result = np.exp(log_front) * _betacf(a, b, x) / a
+    result = np.where(x <= 0.0, 0.0, result)
+    return np.where(flip, 1.0 - result, result)
+
+
+def correlation_p_values(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """
+    Two-sided p-values of Pearson correlations.
+
+    Uses the t-test with n - 2 degrees of freedom, evaluated as
+    I_{1-r^2}((n - 2) / 2, 1 / 2) without a per-pair Python loop.
+
+    Args:
+        r: Correlations, any shape
+        n: Sample sizes, broadcastable to r
+
+    Returns:
+        np.ndarray: p-values (NaN where r is NaN or n < 3)
+    """
+    r = np.asarray(r, dtype=np.float64)
+    dof = np.broadcast_to(np.asarray(n, dtype=np.float64), r.shape) - 2.0
+    p = np.full(r.shape, np.nan)
+    valid = (dof > 0) & ~np.isnan(r)
+    if valid.any():
+        x = np.clip(1.0 - r[valid] ** 2, 0.0, 1.0)
+        p[valid] = np.clip(_betainc(dof[valid] / 2.0, np.full(x.shape, 0.5), x), 0.0, 1.0)
+    return p
+
+
+def grouped_daily_means(
+    dates: np.ndarray,
+    values: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int
+) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    Average values per group and calendar day on one shared calendar.
+
+    Args:
+        dates: Timestamp per row
+        values: 2-D float array (rows x columns), NaN marks a missing value
+        codes: Group code per row in the range [0, n_groups)
+        n_groups: Number of groups
+
+    Returns:
+        tuple: (days from the first to the last day of any group, daily
+        means of shape (n_groups, days, columns) with NaN on days a group
+        has no value)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]')
+    if len(days) == 0:
+        return pd.DatetimeIndex([]), np.empty((n_groups, 0, values.shape[1]))
+    start = days.min()
+    n_days = int((days.max() - start).astype(np.int64)) + 1
+    flat = codes * n_days + (days - start).astype(np.intp)
+
+    mask = ~np.isnan(values)
+    size = n_groups * n_days
+    means = np.empty((size, values.shape[1]))
+    for j in range(values.shape[1]):
+        sums = np.bincount(flat, weights=np.where(mask[:, j], values[:, j], 0.0), minlength=size)
+        counts = np.bincount(flat, weights=mask[:, j], minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[:, j] = np.where(counts > 0, sums / counts, np.nan)
+    calendar = pd.date_range(pd.Timestamp(start), periods=n_days, freq='D')
+    return calendar, means.reshape(n_groups, n_days, values.shape[1])
+
+
+def lagged_correlations(
+    factors: np.ndarray,
+    target: np.ndarray,
+    max_lag: int
+) -> Dict[str, np.ndarray]:
+    """
+    Correlate each factor lagged by 0..max_lag days with the target.
+
+    At lag l, factor values on day t - l are paired with the target on day t,
+    using only days where both are present. Each lag is one pass over shifted
+    views of the daily arrays, vectorized over groups and factors.
+
+    Args:
+        factors: Daily values of shape (groups, days, factors), NaN when missing
+        target: Daily target values of shape (groups, days)
+        max_lag: Largest lag in days
+
+    Returns:
+        dict: Arrays of shape (groups, max_lag + 1, factors):
+            r - Pearson correlation (NaN for fewer than two pairs or zero
+                variance, within VARIANCE_RTOL)
+            n - number of complete pairs
+            p - two-sided p-value of r
+    """
+    x = np.asarray(factors, dtype=np.float64)
+    y = np.asarray(target, dtype=np.float64)
+    n_groups, n_days, k = x.shape
+
+    # Shift each group's columns by their means so the raw sums stay well conditioned
+    fx, fy = ~np.isnan(x), ~np.isnan(y)
+    x_shift = np.where(fx, x, 0.0).sum(axis=1) / np.maximum(fx.sum(axis=1), 1)
+    y_shift = np.where(fy, y, 0.0).sum(axis=1) / np.maximum(fy.sum(axis=1), 1)
+    zx = np.where(fx, x - x_shift[:, None, :], 0.0)
+    zy = np.where(fy, y - y_shift[:, None], 0.0)
+    fx, fy = fx.astype(np.float64), fy.astype(np.float64)
+
+    shape = (n_groups, max_lag + 1, k)
+    n, sx, sy, sxx, syy, sxy = (np.zeros(shape) for _ in range(6))
+    for lag in range(min(max_lag, n_days - 1) + 1):
+        xa, ma = zx[:, :n_days - lag], fx[:, :n_days - lag]
+        yb, mb = zy[:, lag:], fy[:, lag:]
+        n[:, lag] = np.einsum('gtk,gt->gk', ma, mb)
+        sx[:, lag] = np.einsum('gtk,gt->gk', xa, mb)
+        sy[:, lag] = np.einsum('gtk,gt->gk', ma, yb)
+        sxx[:, lag] = np.einsum('gtk,gtk,gt->gk', xa, xa, mb)
+        syy[:, lag] = np.einsum('gtk,gt,gt->gk', ma, yb, yb)
+        sxy[:, lag] = np.einsum('gtk,gt->gk', xa, yb)
+
+    var_x, var_y = n * sxx - sx ** 2, n * syy - sy ** 2
+    # Daily means of a constant may differ from it by an ulp, so compare with
+    # the raw (unshifted) sums of squares
+    xs, ys = x_shift[:, None, :], y_shift[:, None, None]
+    var_x[var_x <= VARIANCE_RTOL * n * (sxx + 2 * xs * sx + n * xs ** 2)] = 0.0
+    var_y[var_y <= VARIANCE_RTOL * n * (syy + 2 * ys * sy + n * ys ** 2)] = 0.0
+    denom = var_x * var_y
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = np.clip((n * sxy - sx * sy) / np.sqrt(denom), -1.0, 1.0)
+    r[(n < 2) | ~(denom > 0)] = np.nan
+    n = np.rint(n).astype(np.int64)
+    return {'r': r, 'n': n, 'p': correlation_p_values(r, n)}
@@ -0,0 +1,256 @@
+"""
+Custom Tracker Engine for Energy Tracker Analytics
+Parses CheckInCustomTrackerValue strings once, by tracker unit type, into
+sparse columns aligned to check-in rows. Columns are stored compressed
+(values grouped by tracker), so memory and correlation cost grow with the
+number of recorded values rather than check-ins x trackers.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence
+
+from .correlation import VARIANCE_RTOL, correlation_p_values
+
+UNIT_TYPES = ('number', 'scale', 'boolean', 'string')
+NUMERIC_UNIT_TYPES = ('number', 'scale', 'boolean')
+
+TRUE_VALUES = ('true', '1', 'yes', 'y', 'on')
+FALSE_VALUES = ('false', '0', 'no', 'n', 'off')
+
+
+def _parse_booleans(values: pd.Series) -> np.ndarray:
+    """1.0 / 0.0 for boolean-like strings, NaN otherwise."""
+    text = values.astype(str).str.strip().str.lower()
+    return np.where(text.isin(TRUE_VALUES), 1.0,
+                    np.where(text.isin(FALSE_VALUES), 0.0, np.nan))
+
+
+def _infer_unit_types(codes: np.ndarray, values: pd.Series, n_trackers: int) -> np.ndarray:
+    """Unit type per tracker when no tracker metadata is given."""
+    total = np.bincount(codes, minlength=n_trackers)
+    numeric = np.bincount(codes, weights=~np.isnan(pd.to_numeric(values, errors='coerce')
+                                                    .to_numpy(dtype=np.float64)),
+                          minlength=n_trackers)
+    boolean = np.bincount(codes, weights=~np.isnan(_parse_booleans(values)), minlength=n_trackers)
+    return np.where(numeric == total, 'number', np.where(boolean == total, 'boolean', 'string'))
+
+
+def _unique_names(labels: Sequence[str], tracker_ids: Sequence[str]) -> List[str]:
+    """Tracker labels, with the tracker id appended to repeated labels."""
+    counts = pd.Series(labels).value_counts()
+    return [
+        f'{label} ({tracker_id})' if counts[label] > 1 else label
+        for label, tracker_id in zip(labels, tracker_ids)
+    ]
+
+
+class CustomTrackerMatrix:
+    """
+    Typed sparse custom-tracker columns aligned to the rows of a check-in frame.
+
+    Values are kept in compressed sparse column form: the entries of column j
+    are rows[indptr[j]:indptr[j + 1]] and data[indptr[j]:indptr[j + 1]].
+    Numeric, scale and boolean trackers hold floats (booleans as 1.0 / 0.0);
+    string trackers hold codes into string_categories.
+    """
+
+    def __init__(
+        self,
+        n_rows: int,
+        trackers: pd.DataFrame,
+        indptr: np.ndarray,
+        rows: np.ndarray,
+        data: np.ndarray,
+        string_categories: pd.Index
+    ):
+        """
+        Args:
+            n_rows: Number of check-in rows the columns are aligned to
+            trackers: One row per column with tracker_id, name and unit_type
+            indptr: Column offsets into rows and data, length columns + 1
+            rows: Check-in row of each stored value
+            data: Stored values
+            string_categories: Labels referenced by string tracker codes
+        """
+        self.n_rows = n_rows
+        self.trackers = trackers.reset_index(drop=True)
+        self.indptr = indptr
+        self.rows = rows
+        self.data = data
+        self.string_categories = string_categories
+        self._positions = {name: i for i, name in enumerate(self.trackers['name'])}
+
+    @classmethod
+    def from_values(
+        cls,
+        values: pd.DataFrame,
+        check_in_ids: Sequence,
+        trackers: Optional[pd.DataFrame] = None
+    ) -> 'CustomTrackerMatrix':
+        """
+        Parse raw tracker values and pivot them against check-ins.
+
+        Args:
+            values: Frame with check_in_id, tracker_id and the raw string
+                value, e.g. load_user_frames(...)['custom_values']
+            check_in_ids: Check-in id of each row of the frame the columns
+                are aligned to, e.g. check_ins['check_in_id']
+            trackers: Optional tracker metadata with tracker_id, label and
+                unit_type (see load_custom_trackers); without it names are
+                the tracker ids and unit types are inferred from the values
+
+        Returns:
+            CustomTrackerMatrix: Values of check-ins not in check_in_ids and
+            unparseable values are dropped; a repeated (check-in, tracker)
+            pair keeps its last value
+        """
+        check_in_index = pd.Index(np.asarray(check_in_ids))
+        row = check_in_index.get_indexer(values['check_in_id'])
+        codes, tracker_ids = pd.factorize(values['tracker_id'], sort=True)
+        tracker_ids = np.asarray(tracker_ids, dtype=object)
+        raw = values['value'].reset_index(drop=True)
+
+        if trackers is not None:
+            meta = trackers.drop_duplicates('tracker_id').set_index('tracker_id')
+            meta = meta.reindex(tracker_ids)
+            labels = meta['label'].fillna(pd.Series(tracker_ids, index=meta.index)).tolist()
+            unit_types = meta['unit_type'].fillna('string').to_numpy(dtype=object)
+            unknown = set(unit_types) - set(UNIT_TYPES)
+            if unknown:
+                raise ValueError(f'Unknown tracker unit types: {sorted(unknown)}')
+        else:
+            labels = [str(t) for t in tracker_ids]
+            unit_types = _infer_unit_types(codes, raw, len(tracker_ids)).astype(object)
+
+        # Parse each unit type once over all of its values
+        entry_types = unit_types[codes]
+        data = np.full(len(raw), np.nan)
+        numeric = np.isin(entry_types, ('number', 'scale'))
+        data[numeric] = pd.to_numeric(raw[numeric], errors='coerce').to_numpy(dtype=np.float64)
+        boolean = entry_types == 'boolean'
+        data[boolean] = _parse_booleans(raw[boolean])
+        string = entry_types == 'string'
+        string_codes, string_categories = pd.factorize(raw[string], sort=True)
+        data[string] = np.where(string_codes >= 0, string_codes, np.nan)
+
+        keep = (row >= 0) & ~np.isnan(data)
+        row, codes, data = row[keep], codes[keep], data[keep]
+
+        # Sort by (tracker, row) and keep the last value of repeated pairs
+        order = np.lexsort((row, codes))
+        row, codes, data = row[order], codes[order], data[order]
+        last = np.r_[(codes[1:] != codes[:-1]) | (row[1:] != row[:-1]), True]
+        row, codes, data = row[last], codes[last], data[last]
+
+        indptr = np.zeros(len(tracker_ids) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(codes, minlength=len(tracker_ids)), out=indptr[1:])
+
+        frame = pd.DataFrame({
+            'tracker_id': tracker_ids,
+            'name': _unique_names(labels, [str(t) for t in tracker_ids]),
+            'unit_type': unit_types,
+        })
+        return cls(len(check_in_index), frame, indptr, row.astype(np.intp), data,
+                   pd.Index(string_categories))
+
+    @property
+    def names(self) -> List[str]:
+        """Column names (tracker labels)."""
+        return list(self._positions)
+
+    @property
+    def numeric_names(self) -> List[str]:
+        """Names of the number, scale and boolean trackers."""
+        numeric = self.trackers['unit_type'].isin(NUMERIC_UNIT_TYPES)
+        return self.trackers.loc[numeric, 'name'].tolist()
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored values."""
+        return len(self.data)
+
+    def column(self, name: str) -> pd.arrays.SparseArray:
+        """
+        One tracker as a sparse array over the check-in rows.
+
+        Raises:
+            KeyError: If there is no tracker with that name
+        """
+        j = self._positions[name]
+        start, stop = self.indptr[j], self.indptr[j + 1]
+        rows, data = self.rows[start:stop], self.data[start:stop]
+        if self.trackers.at[j, 'unit_type'] == 'string':
+            values = np.full(self.n_rows, np.nan, dtype=object)
+            values[rows] = self.string_categories[data.astype(np.intp)]
+            return pd.arrays.SparseArray(values, fill_value=np.nan)
+        values = np.full(self.n_rows, np.nan)
+        values[rows] = data
+        return pd.arrays.SparseArray(values, fill_value=np.nan)
+
+    def to_frame(self, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        """
+        All trackers as a DataFrame of sparse columns.
+
+        Args:
+            index: Row index to use (default: a RangeIndex)
+
+        Returns:
+            pd.DataFrame: One sparse column per tracker
+        """
+        return pd.DataFrame({name: self.column(name) for name in self.names}, index=index)
+
+    def correlations(
+        self,
+        target: np.ndarray,
+        min_periods: int = 2
+    ) -> pd.DataFrame:
+        """
+        Pearson correlation of every numeric tracker with a dense target.
+
+        Each tracker uses only rows where both it and the target are
+        present. Sums are taken over the stored values only, so the cost is
+        linear in the number of values however many trackers there are.
+
+        Args:
+            target: Target metric per check-in row, NaN when missing
+            min_periods: Minimum complete pairs for a correlation
+
+        Returns:
+            pd.DataFrame: Indexed by numeric tracker name with r, n
+            (complete pairs) and p (two-sided p-value); r is NaN for too few
+            pairs or zero variance
+        """
+        target = np.asarray(target, dtype=np.float64)
+        if len(target) != self.n_rows:
+            raise ValueError(f'Target has {len(target)} rows, trackers have {self.n_rows}')
+
+        k = len(self.trackers)
+        column = np.repeat(np.arange(k), np.diff(self.indptr))
+        y = target[self.rows]
+        ok = ~np.isnan(y) & self.trackers['unit_type'].isin(NUMERIC_UNIT_TYPES).to_numpy()[column]
+        x = np.where(ok, self.data, 0.0)
+        y = np.where(ok, y, 0.0)
+
+        n = np.bincount(column, weights=ok, minlength=k)
+        safe_n = np.maximum(n, 1)
+        # Center per column before the second pass to keep the sums accurate
+        dx = np.where(ok, x - (np.bincount(column, weights=x, minlength=k) / safe_n)[column], 0.0)
+        dy = np.where(ok, y - (np.bincount(column, weights=y, minlength=k) / safe_n)[column], 0.0)
+        sxx = np.bincount(column, weights=dx * dx, minlength=k)
+        syy = np.bincount(column, weights=dy * dy, minlength=k)
+        sxy = np.bincount(column, weights=dx * dy, minlength=k)
+        # A constant tracker or target leaves only rounding noise of its mean
+        sxx[sxx <= VARIANCE_RTOL * np.bincount(column, weights=x * x, minlength=k)] = 0.0
+        syy[syy <= VARIANCE_RTOL * np.bincount(column, weights=y * y, minlength=k)] = 0.0
+
+        denom = sxx * syy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = np.clip(sxy / np.sqrt(denom), -1.0, 1.0)
+        r[(n < min_periods) | ~(denom > 0)] = np.nan
+
+        result = pd.DataFrame(
+            {'r': r, 'n': n.astype(np.int64), 'p': correlation_p_values(r, n)},
+            index=pd.Index(self.trackers['name'], name='tracker')
+        )
+        return result.loc[self.numeric_names]
@@ -0,0 +1,216 @@
+"""
+Daily Aggregate Store for Energy Tracker Analytics
+Keeps one row per user per day with sum/count/min/max of each metric in
+memory-mapped, column-major NumPy files, so history and trend charts read
+days instead of raw check-ins.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Hashable, Iterable, List, Optional
+from urllib.parse import quote, unquote
+
+from .constants import CORE_METRICS
+from .schema import mood_values
+
+# Metrics aggregated by default
+DAILY_METRICS = CORE_METRICS + ['hours_worked']
+
+STATS = ('sum', 'count', 'min', 'max')
+
+_META_FILE = 'meta.json'
+_VERSION = 1
+
+
+def aggregate_daily(
+    df: pd.DataFrame,
+    metrics: Iterable[str] = DAILY_METRICS
+) -> pd.DataFrame:
+    """
+    Aggregate raw check-ins into daily sum/count/min/max per metric.
+
+    Args:
+        df: Input DataFrame with energy tracking data for one user
+        metrics: Metrics to aggregate ('mood_numeric' is derived from mood)
+
+    Returns:
+        pd.DataFrame: One row per tracked day (DatetimeIndex named 'date')
+        with columns '<metric>_<stat>'
+    """
+    metrics = list(metrics)
+    columns = {}
+    for metric in metrics:
+        if metric == 'mood_numeric':
+            columns[metric] = mood_values(df)
+        else:
+            columns[metric] = df[metric].to_numpy(dtype=np.float64)
+
+    days = pd.DatetimeIndex(df['date']).normalize()
+    grouped = pd.DataFrame(columns, index=days).groupby(level=0).agg(list(STATS))
+    grouped.columns = [f'{metric}_{stat}' for metric, stat in grouped.columns]
+    grouped.index.name = 'date'
+    return grouped
+
+
+def _combine(existing: pd.DataFrame, new: pd.DataFrame, metrics: List[str]) -> pd.DataFrame:
+    """Merge two daily aggregate frames, combining rows for the same day."""
+    both = pd.concat([existing, new])
+    if not both.index.has_duplicates:
+        return both.sort_index()
+
+    grouped = both.groupby(level=0)
+    parts = {}
+    for metric in metrics:
+        parts[f'{metric}_sum'] = grouped[f'{metric}_sum'].sum()
+        parts[f'{metric}_count'] = grouped[f'{metric}_count'].sum()
+        parts[f'{metric}_min'] = grouped[f'{metric}_min'].min()
+        parts[f'{metric}_max'] = grouped[f'{metric}_max'].max()
+    return pd.DataFrame(parts)[existing.columns]
+
+
+class DailyAggregateStore:
+    """
+    Directory of per-user daily aggregates.
+
+    Each user is stored as a single column-major ``.npy`` file whose first
+    column is the day number (days since 1970-01-01) followed by
+    '<metric>_<stat>' columns. Files are replaced atomically on update and
+    opened with ``mmap_mode='r'`` on read.
+    """
+
+    def __init__(self, root: str, metrics: Optional[Iterable[str]] = None):
+        """
+        Args:
+            root: Directory holding the store (created if missing)
+            metrics: Metrics to aggregate (default: DAILY_METRICS); must match
+                the metrics of an existing store
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        meta_path = os.path.join(root, _META_FILE)
+
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if metrics is not None and list(metrics) != meta['metrics']:
+                raise ValueError('Store was created with different metrics')
+            self.metrics = meta['metrics']
+        else:
+            self.metrics = list(DAILY_METRICS if metrics is None else metrics)
+            with open(meta_path, 'w') as f:
+                json.dump({'version': _VERSION, 'metrics': self.metrics}, f)
+
+        self.columns = [f'{m}_{s}' for m in self.metrics for s in STATS]
+
+    def _path(self, user_id: Hashable) -> str:
+        return os.path.join(self.root, quote(str(user_id), safe='') + '.npy')
+
+    def users(self) -> List[str]:
+        """
+        List the users present in the store.
+
+        Returns:
+            list: User ids as strings
+        """
+        return sorted(
+            unquote(name[:-4]) for name in os.listdir(self.root) if name.endswith('.npy')
+        )
+
+    def load(self, user_id: Hashable) -> pd.DataFrame:
+        """
+        Read a user's daily aggregates.
+
+        Args:
+            user_id: User to read
+
+        Returns:
+            pd.DataFrame: One row per tracked day with '<metric>_<stat>'
+            columns (empty if the user is unknown)
+        """
+        path = self._path(user_id)
+        if not os.path.exists(path):
+            return pd.DataFrame(
+                columns=self.columns, index=pd.DatetimeIndex([], name='date'), dtype=np.float64
+            )
+
+        data = np.load(path, mmap_mode='r')
+        index = pd.DatetimeIndex(
+            data[:, 0].astype('datetime64[D]').astype('datetime64[ns]'), name='date'
+        )
+        return pd.DataFrame(data[:, 1:], index=index, columns=self.columns, copy=False)
+
+    def _write(self, user_id: Hashable, daily: pd.DataFrame) -> None:
+        days = daily.index.values.astype('datetime64[D]').astype(np.float64)
+        data = np.asfortranarray(np.column_stack([days, daily[self.columns].to_numpy()]))
+        path = self._path(user_id)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, path)
+
+    def update(self, df: pd.DataFrame, user_col: Optional[str] = 'user_id',
+               user_id: Optional[Hashable] = None) -> None:
+        """
+        Fold new check-ins into the store.
+
+        Days already present are combined (sums and counts added, min/max
+        widened), new days are inserted in order.
+
+        Args:
+            df: New check-ins; either a long-format frame with a user column
+                or a single user's rows together with user_id
+            user_col: Column holding the user id (ignored when user_id is set)
+            user_id: Id of the user the rows belong to
+        """
+        if user_id is not None:
+            groups = [(user_id, df)]
+        else:
+            groups = df.groupby(user_col, sort=False)
+
+        for uid, user_df in groups:
+            new = aggregate_daily(user_df, self.metrics)
+            existing = self.load(uid)
+            merged = new if existing.empty else _combine(existing, new, self.metrics)
+            self._write(uid, merged)
+
+    def daily_means(
+        self,
+        user_id: Hashable,
+        metrics: Optional[Iterable[str]] = None,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """
+        Daily means of a user's metrics on a continuous calendar.
+
+        The result matches ``df.set_index('date')[metrics].resample('D').mean()``
+        on the raw check-ins: untracked days between the first and last
+        tracked day are NaN.
+
+        Args:
+            user_id: User to read
+            metrics: Metrics to return (default: all stored metrics); 'mood'
+                is accepted as an alias for 'mood_numeric'
+            start: Optional first day (inclusive)
+            end: Optional last day (inclusive)
+
+        Returns:
+            pd.DataFrame: Daily means indexed by date
+        """
+        metrics = ['mood_numeric' if m == 'mood' else m
+                   for m in (self.metrics if metrics is None else metrics)]
+        for metric in metrics:
+            if metric not in self.metrics:
+                raise KeyError(metric)
+
+        daily = self.load(user_id).loc[start:end]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = pd.DataFrame({
+                metric: daily[f'{metric}_sum'].to_numpy() / daily[f'{metric}_count'].to_numpy()
+                for metric in metrics
+            }, index=daily.index)
+        if means.empty:
+            return means
+        return means.asfreq('D')
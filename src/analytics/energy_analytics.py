@@ -3,341 +3,805 @@ Energy Tracker Analytics Module
 Provides data processing and visualization functions for the analytics dashboard.
 """
 
+import os
+import sys
+
+if __name__ == '__main__' and not __package__:
+    # Run as a file (python energy_analytics.py): the relative imports below
+    # need the analytics package, so run its example module instead
+    import runpy
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    runpy.run_module('analytics', run_name='__main__')
+    sys.exit()
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Optional, Tuple, Union
-import plotly.express as px
-import plotly.graph_objects as go
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from datetime import datetime, timedelta
 
-# Constants
-PRIMARY_COLOR = '#953599'  # Deep Magenta/Purple
-BACKGROUND_COLOR = '#f8f5f2'
-COLOR_PALETTE = {
-    'physical_energy': '#FF9900',  # Orange
-    'cognitive_clarity': '#B47EB7',  # Light Purple
-    'mood': '#f2bf3f',  # Yellow/Gold
-    'stress': '#c45e99',  # Fuchsia
-}
-
-# Mood scale mapping (1-10, where 10 is most positive)
-MOOD_SCALE = {
-    'Joyful': 10,
-    'Content': 8,
-    'Calm': 7,
-    'Confused': 5,
-    'Annoyed': 4,
-    'Anxious': 3,
-    'Sad': 3,
-    'Scared': 2,
-    'Angry': 1,
-    'Exhausted': 1
-}
+from .correlation import (
+    group_codes,
+    grouped_correlations,
+    grouped_daily_means,
+    lagged_correlations,
+    pairwise_correlation
+)
+from .profiling import phase, profiled
+from .schema import happy_flags, mood_codes, mood_values
+from .streaks import day_streaks, longest_true_runs
+from .timeframe import FrameLike, TimeIndexedFrame, as_frame
+from .trend import TREND_WINDOWS, TREND_METRICS, describe_trend, window_trends
+from .constants import (
+    BACKGROUND_COLOR,
+    COLOR_PALETTE,
+    CORE_METRICS,
+    CUSTOM_CATEGORY,
+    FACTOR_CATEGORIES,
+    MOOD_SCALE,
+    PRIMARY_COLOR
+)
 
-def plot_energy_correlations(
+# Hydration milestone: this many consecutive entries at or above the goal
+HYDRATION_GOAL = 7
+HYDRATION_STREAK_ENTRIES = 7
+
+# Happy-moment milestone and the energy level counted as a high-energy day
+HAPPY_MILESTONE = 50
+HIGH_ENERGY_LEVEL = 6
+
+# matplotlib and seaborn are only imported when a plot_* function renders, so
+# compute-only callers never pay for them.
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+    from .custom_trackers import CustomTrackerMatrix
+    from .time_cube import TimeBreakdownCube
+
+@contextmanager
+def no_copy_mode(enabled: bool = True) -> Iterator[None]:
+    """
+    Run analytics calls under pandas copy-on-write.
+
+    The analytics functions never deep-copy or modify their input: derived
+    values such as mood_numeric live in side arrays and period filters read
+    only the columns they use. Copy-on-write additionally keeps the frame
+    slices that are taken (e.g. TimeIndexedFrame windows) lazy, and
+    guarantees a write to one can never reach the caller's frame.
+
+    Args:
+        enabled: Whether copy-on-write is on inside the block
+    """
+    with pd.option_context('mode.copy_on_write', enabled):
+        yield
+
+def _numeric_columns(
+    df: pd.DataFrame,
+    exclude: Tuple[str, ...] = ()
+) -> Dict[str, np.ndarray]:
+    """
+    Collect the numeric columns used for correlations as float arrays.
+
+    Accepts raw and typed (small-int) frames and adds ``mood_numeric`` from
+    the mood column if the frame does not carry it, without copying the frame.
+    """
+    # Checked on dtypes: select_dtypes would build (and copy) a sub-frame
+    columns = {
+        col: df[col].to_numpy(dtype=np.float64)
+        for col, dtype in df.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        and col not in exclude
+    }
+    if 'mood_numeric' not in columns and 'mood' in df.columns:
+        with phase('mood', len(df)):
+            columns['mood_numeric'] = mood_codes(df['mood'])
+    return columns
+
+def _daily_means(
+    df: pd.DataFrame,
+    metrics: List[str],
+    mask: Optional[np.ndarray] = None
+) -> pd.DataFrame:
+    """
+    Daily means of the given metrics on a continuous calendar.
+
+    Reads only the metric columns (mood_numeric is derived from mood if
+    needed) and optionally only the rows selected by a boolean mask.
+    """
+    dates = df['date'].to_numpy()
+    with phase('mood', len(df)):
+        columns = {
+            metric: mood_values(df) if metric == 'mood_numeric' else df[metric].to_numpy()
+            for metric in metrics
+        }
+    if mask is not None:
+        dates = dates[mask]
+        columns = {metric: values[mask] for metric, values in columns.items()}
+    with phase('resample', len(dates)):
+        daily_avg = pd.DataFrame(columns, index=pd.DatetimeIndex(dates)).resample('D').mean()
+    daily_avg.index.name = 'date'
+    return daily_avg
+
+def _recent_rows(
+    df: FrameLike,
+    span: timedelta,
+    normalize: bool = False
+) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+    """
+    Rows dated at most span before the latest date (from its midnight if
+    normalize).
+
+    A TimeIndexedFrame is binary-searched and returns a zero-copy slice with
+    no mask; a plain frame is returned with a boolean row mask.
+    """
+    if isinstance(df, TimeIndexedFrame):
+        return df.last(days=span / timedelta(days=1), normalize=normalize), None
+    latest = df['date'].max()
+    if normalize:
+        latest = latest.normalize()
+    return df, (df['date'] >= latest - span).to_numpy()
+
+def _correlation_values(
+    df: pd.DataFrame,
+    target_metric: str,
+    user_col: Optional[str] = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Stack all numeric columns used for correlations into one float matrix.
+
+    Returns:
+        tuple: (column names, values of shape rows x columns)
+    """
+    exclude = (user_col,) if user_col else ()
+    columns = _numeric_columns(df, exclude=exclude)
+    for metric in [target_metric] + CORE_METRICS:
+        if metric not in columns:
+            raise KeyError(metric)
+
+    names = list(columns)
+    return names, np.column_stack([columns[name] for name in names])
+
+def _correlation_matrices(
     df: pd.DataFrame,
+    target_metric: str,
+    user_col: Optional[str] = None
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute per-user correlation matrices over all numeric columns at once.
+
+    Returns:
+        tuple: (column names, user ids, rows per user, correlation matrices)
+    """
+    names, values = _correlation_values(df, target_metric, user_col)
+    codes, user_ids = group_codes(df, user_col)
+    counts = np.bincount(codes, minlength=len(user_ids))
+    with phase('correlation', len(values)):
+        corr = grouped_correlations(values, codes, len(user_ids))
+    return names, user_ids, counts, corr
+
+@profiled
+def compute_energy_correlations(
+    df: FrameLike,
     target_metric: str = 'physical_energy',
-    category: Optional[str] = None
-) -> Tuple[plt.Figure, plt.Figure]:
+    category: Optional[Union[str, Sequence[str]]] = None,
+    trackers: Optional['CustomTrackerMatrix'] = None
+) -> Dict[str, Union[str, pd.Series, pd.DataFrame]]:
     """
-    Generate correlation analysis visualizations for energy levels.
+    Compute correlation results for a single user's energy tracking data.
     
     Args:
         df: Input DataFrame with energy tracking data
-        target_metric: Metric to correlate against (default: physical_energy)
-        category: Optional filter for specific factor categories
+        target_metric: Metric to correlate against (default: physical_energy;
+            'mood' means mood_numeric)
+        category: Optional filter for specific factor categories (a key of
+            FACTOR_CATEGORIES, or 'custom' for custom trackers), or a list of
+            them to keep the factors of any
+        trackers: Optional custom tracker columns aligned to the rows of df
+            (of df.frame for a TimeIndexedFrame), correlated pairwise against target_metric without densifying
         
     Returns:
-        tuple: (bar_chart_figure, heatmap_figure)
+        dict: target_metric, correlations (Series of pairwise-complete r
+        sorted ascending, target excluded) with matching counts (complete
+        pairs) and p_values (two-sided), and core_matrix, core_counts and
+        core_p_values (DataFrames over CORE_METRICS)
     """
-    # Convert mood to numerical scale
-    df = df.copy()
-    if 'mood' in df.columns:
-        df['mood_numeric'] = df['mood'].map(MOOD_SCALE)
-    
-    # Select numerical columns for correlation
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-    if category:
-        # Filter columns by category if specified
-        # TODO: Implement category filtering logic
-        pass
-    
-    # Calculate correlations
-    correlations = df[numeric_cols].corr()[target_metric].sort_values()
-    correlations = correlations.drop(target_metric)
-    
-    # Create bar chart
-    fig_bar, ax_bar = plt.subplots(figsize=(10, 6))
-    bars = ax_bar.barh(
-        range(len(correlations)),
-        correlations,
-        color=[PRIMARY_COLOR if x > 0 else '#2a9d8f' for x in correlations]
+    categories = [category] if isinstance(category, str) else list(category or [])
+    unknown = [c for c in categories if c not in FACTOR_CATEGORIES and c != CUSTOM_CATEGORY]
+    if unknown:
+        raise ValueError(f"Unknown factor category: {', '.join(unknown)}")
+
+    df = as_frame(df)
+    target_metric = 'mood_numeric' if target_metric == 'mood' else target_metric
+    names, values = _correlation_values(df, target_metric)
+    with phase('correlation', len(values)):
+        stats = pairwise_correlation(values)
+    matrix, counts, p_values = (
+        pd.DataFrame(stats[key], index=names, columns=names) for key in ('r', 'n', 'p')
     )
+
+    factors = pd.DataFrame({
+        'r': matrix[target_metric],
+        'n': counts[target_metric],
+        'p': p_values[target_metric],
+    }).drop(target_metric)
+
+    # Filter factors by category if specified, keeping the union of the categories
+    if categories:
+        factors = factors[factors.index.isin([
+            factor for c in categories if c != CUSTOM_CATEGORY for factor in FACTOR_CATEGORIES[c]
+        ])]
+
+    if trackers is not None and (not categories or CUSTOM_CATEGORY in categories):
+        target = mood_values(df) if target_metric == 'mood_numeric' \
+            else df[target_metric].to_numpy(dtype=np.float64)
+        with phase('tracker_correlation', len(target)):
+            tracker_factors = trackers.correlations(target).rename_axis(None)
+        factors = pd.concat([factors, tracker_factors])
+
+    factors = factors.sort_values('r')
+    return {
+        'target_metric': target_metric,
+        'correlations': factors['r'].rename(target_metric),
+        'counts': factors['n'].astype(np.int64).rename(target_metric),
+        'p_values': factors['p'].rename(target_metric),
+        'core_matrix': matrix.loc[CORE_METRICS, CORE_METRICS],
+        'core_counts': counts.loc[CORE_METRICS, CORE_METRICS],
+        'core_p_values': p_values.loc[CORE_METRICS, CORE_METRICS],
+    }
+
+@profiled
+def compute_batch_correlations(
+    df: FrameLike,
+    user_col: str = 'user_id',
+    target_metric: str = 'physical_energy'
+) -> Dict[str, Union[str, List[str], np.ndarray, pd.DataFrame]]:
+    """
+    Compute correlation results for many users in one vectorized pass.
+
+    The input is a long-format frame with one row per check-in and a user id
+    column. Per-user matrices are built from grouped sums, sums of squares and
+    cross-products, so the cost does not grow with a Python loop over users.
     
-    # Customize bar chart
-    ax_bar.set_yticks(range(len(correlations)))
-    ax_bar.set_yticklabels(correlations.index)
-    ax_bar.set_xlabel('Correlation Coefficient')
-    ax_bar.set_title(f'Correlation with {target_metric.replace("_", " ").title()}')
-    
-    # Add correlation values
-    for i, v in enumerate(correlations):
-        ax_bar.text(
-            v + (0.01 if v >= 0 else -0.01),
-            i,
-            f'{v:.2f}',
-            va='center',
-            ha='left' if v >= 0 else 'right'
-        )
-    
-    # Create heatmap for core metrics
-    core_metrics = ['physical_energy', 'cognitive_clarity', 'mood_numeric', 'stress', 
-                   'caffeine', 'hydration']
-    core_corr = df[core_metrics].corr()
-    
-    fig_heat, ax_heat = plt.subplots(figsize=(8, 6))
-    sns.heatmap(
-        core_corr,
-        annot=True,
-        cmap='RdYlBu_r',
-        center=0,
-        ax=ax_heat,
-        fmt='.2f'
+    Args:
+        df: Long-format DataFrame with energy tracking data for many users
+        user_col: Column holding the user id
+        target_metric: Metric to correlate against (default: physical_energy)
+        
+    Returns:
+        dict: target_metric, user_ids, counts (rows per user), correlations
+        (DataFrame of users x factors), core_metrics and core_matrices
+        (array of shape users x len(CORE_METRICS) x len(CORE_METRICS))
+    """
+    names, user_ids, counts, corr = _correlation_matrices(as_frame(df), target_metric, user_col)
+
+    target_idx = names.index(target_metric)
+    factor_idx = [i for i in range(len(names)) if i != target_idx]
+    core_idx = [names.index(metric) for metric in CORE_METRICS]
+
+    correlations = pd.DataFrame(
+        corr[:, factor_idx, target_idx],
+        index=pd.Index(user_ids, name=user_col),
+        columns=[names[i] for i in factor_idx]
     )
-    ax_heat.set_title('Core Metrics Correlation Matrix')
-    
-    plt.close('all')  # Clear matplotlib memory
-    return fig_bar, fig_heat
+    return {
+        'target_metric': target_metric,
+        'user_ids': user_ids,
+        'counts': counts,
+        'correlations': correlations,
+        'core_metrics': list(CORE_METRICS),
+        'core_matrices': corr[:, core_idx][:, :, core_idx],
+    }
 
-def plot_history_chart(
-    df: pd.DataFrame,
-    metrics_to_show: List[str]
-) -> plt.Figure:
+def _lagged_stats(
+    df: FrameLike,
+    target_metric: str,
+    max_lag: int,
+    factors: Optional[List[str]],
+    user_col: Optional[str] = None
+) -> Tuple[str, List[str], np.ndarray, Dict[str, np.ndarray]]:
     """
-    Generate multi-line chart showing historical trends of selected metrics.
+    Lagged correlation arrays for every user over daily means.
+
+    Returns:
+        tuple: (resolved target, factor names, user ids, lagged_correlations output)
+    """
+    if max_lag < 0:
+        raise ValueError(f'max_lag must be non-negative, got {max_lag}')
+    df = as_frame(df)
+    columns = _numeric_columns(df, exclude=(user_col,) if user_col else ())
+    target_metric = 'mood_numeric' if target_metric == 'mood' else target_metric
+    if factors is None:
+        factors = [col for col in columns if col != target_metric]
+    else:
+        factors = ['mood_numeric' if m == 'mood' else m for m in factors]
+    for metric in [target_metric] + factors:
+        if metric not in columns:
+            raise KeyError(metric)
+
+    codes, user_ids = group_codes(df, user_col)
+    values = np.column_stack([columns[m] for m in [target_metric] + factors])
+    with phase('resample', len(values)):
+        _, daily = grouped_daily_means(df['date'].to_numpy(), values, codes, len(user_ids))
+    with phase('correlation', len(values)):
+        stats = lagged_correlations(daily[:, :, 1:], daily[:, :, 0], max_lag)
+    return target_metric, factors, user_ids, stats
+
+@profiled
+def compute_lagged_correlations(
+    df: FrameLike,
+    target_metric: str = 'physical_energy',
+    max_lag: int = 7,
+    factors: Optional[List[str]] = None
+) -> Dict[str, Union[str, np.ndarray, pd.DataFrame]]:
+    """
+    Correlate daily factor means with the target metric 0..max_lag days later.
+    
+    Lag 1 answers e.g. whether yesterday's caffeine predicts today's
+    physical_energy. Days without check-ins are skipped pairwise.
     
     Args:
         df: Input DataFrame with energy tracking data
-        metrics_to_show: List of metrics to display
+        target_metric: Metric to predict ('mood' is mapped to 'mood_numeric')
+        max_lag: Largest lag in days
+        factors: Factors to lag (default: every other numeric column)
         
     Returns:
-        matplotlib.Figure: The generated figure
+        dict: target_metric, lags, and correlations, counts (complete day
+        pairs) and p_values as DataFrames indexed by lag with one column per
+        factor
+    """
+    target_metric, factors, _, stats = _lagged_stats(df, target_metric, max_lag, factors)
+    lags = np.arange(max_lag + 1)
+    index = pd.Index(lags, name='lag')
+    frames = {
+        key: pd.DataFrame(stats[key][0], index=index, columns=factors)
+        for key in ('r', 'n', 'p')
+    }
+    return {
+        'target_metric': target_metric,
+        'lags': lags,
+        'correlations': frames['r'],
+        'counts': frames['n'],
+        'p_values': frames['p'],
+    }
+
+@profiled
+def compute_batch_lagged_correlations(
+    df: FrameLike,
+    user_col: str = 'user_id',
+    target_metric: str = 'physical_energy',
+    max_lag: int = 7,
+    factors: Optional[List[str]] = None
+) -> Dict[str, Union[str, np.ndarray, pd.DataFrame]]:
     """
-    df = df.copy()
+    Compute lagged correlations for many users in one vectorized pass.
     
-    # Convert mood to numerical if present
-    if 'mood' in metrics_to_show:
-        df['mood_numeric'] = df['mood'].map(MOOD_SCALE)
-        metrics_to_show[metrics_to_show.index('mood')] = 'mood_numeric'
+    Daily means of all users are laid out on one calendar, so every lag is a
+    single computation over users x days x factors.
     
-    # Calculate daily averages
-    daily_avg = df.set_index('date')[metrics_to_show].resample('D').mean()
+    Args:
+        df: Long-format DataFrame with energy tracking data for many users
+        user_col: Column holding the user id
+        target_metric: Metric to predict ('mood' is mapped to 'mood_numeric')
+        max_lag: Largest lag in days
+        factors: Factors to lag (default: every other numeric column)
+        
+    Returns:
+        dict: target_metric, user_ids, lags, and correlations, counts and
+        p_values as DataFrames indexed by (user, lag) with one column per factor
+    """
+    target_metric, factors, user_ids, stats = _lagged_stats(
+        df, target_metric, max_lag, factors, user_col
+    )
+    lags = np.arange(max_lag + 1)
+    index = pd.MultiIndex.from_product([user_ids, lags], names=[user_col, 'lag'])
+    frames = {
+        key: pd.DataFrame(stats[key].reshape(-1, len(factors)), index=index, columns=factors)
+        for key in ('r', 'n', 'p')
+    }
+    return {
+        'target_metric': target_metric,
+        'user_ids': user_ids,
+        'lags': lags,
+        'correlations': frames['r'],
+        'counts': frames['n'],
+        'p_values': frames['p'],
+    }
+
+@profiled
+def plot_energy_correlations(
+    df: FrameLike,
+    target_metric: str = 'physical_energy',
+    category: Optional[Union[str, Sequence[str]]] = None,
+    trackers: Optional['CustomTrackerMatrix'] = None
+) -> Tuple['Figure', 'Figure']:
+    """
+    Generate correlation analysis visualizations for energy levels.
     
-    # Create the plot
-    fig, ax = plt.subplots(figsize=(12, 6))
+    Args:
+        df: Input DataFrame with energy tracking data
+        target_metric: Metric to correlate against (default: physical_energy)
+        category: Optional filter for specific factor categories (one or a list)
+        trackers: Optional custom tracker columns aligned to the rows of df
+        
+    Returns:
+        tuple: (bar_chart_figure, heatmap_figure)
+    """
+    from .render import render_energy_correlations
+
+    results = compute_energy_correlations(df, target_metric, category, trackers)
+    with phase('figure'):
+        return render_energy_correlations(results)
+
+@profiled
+def compute_history_chart(
+    df: Optional[FrameLike],
+    metrics_to_show: List[str],
+    daily: Optional[pd.DataFrame] = None
+) -> Dict[str, Union[List[str], pd.DataFrame, Optional[Tuple]]]:
+    """
+    Compute daily averages of selected metrics for the history chart.
     
-    for metric in metrics_to_show:
-        display_name = metric.replace('_numeric', '').replace('_', ' ').title()
-        color = COLOR_PALETTE.get(metric.replace('_numeric', ''), PRIMARY_COLOR)
+    Args:
+        df: Input DataFrame with energy tracking data (unused when daily is given)
+        metrics_to_show: List of metrics to display ('mood' is mapped to
+            'mood_numeric'); the list is not modified
+        daily: Optional precomputed daily means, e.g. from
+            DailyAggregateStore.daily_means, used instead of resampling df
         
-        line = ax.plot(
-            daily_avg.index,
-            daily_avg[metric],
-            label=display_name,
-            color=color,
-            linewidth=2
-        )
-    
-    # Add markers for significant changes in primary metric
-    if metrics_to_show[0] in daily_avg.columns:
-        primary_metric = daily_avg[metrics_to_show[0]]
+    Returns:
+        dict: metrics (resolved column names), daily (DataFrame of daily
+        means), peak and low ((date, value) of the first metric, or None)
+    """
+    metrics = ['mood_numeric' if m == 'mood' else m for m in metrics_to_show]
+    
+    # Calculate daily averages
+    if daily is not None:
+        daily_avg = daily[metrics]
+    else:
+        daily_avg = _daily_means(as_frame(df), metrics)
+    
+    # Find significant changes in primary metric
+    peak = low = None
+    if metrics and metrics[0] in daily_avg.columns:
+        primary_metric = daily_avg[metrics[0]]
         max_idx = primary_metric.idxmax()
         min_idx = primary_metric.idxmin()
-        
-        ax.scatter(max_idx, primary_metric[max_idx], color='gold', 
-                  marker='*', s=200, label='Peak', zorder=5)
-        ax.scatter(min_idx, primary_metric[min_idx], color='red',
-                  marker='o', s=100, label='Low', zorder=5)
+        peak = (max_idx, primary_metric[max_idx])
+        low = (min_idx, primary_metric[min_idx])
+    
+    return {
+        'metrics': metrics,
+        'daily': daily_avg,
+        'peak': peak,
+        'low': low,
+    }
+
+@profiled
+def plot_history_chart(
+    df: Optional[FrameLike],
+    metrics_to_show: List[str],
+    daily: Optional[pd.DataFrame] = None
+) -> 'Figure':
+    """
+    Generate multi-line chart showing historical trends of selected metrics.
     
-    # Customize the plot
-    ax.set_title('Energy Metrics Over Time')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Score')
-    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
-    ax.grid(True, alpha=0.3)
+    Args:
+        df: Input DataFrame with energy tracking data (unused when daily is given)
+        metrics_to_show: List of metrics to display
+        daily: Optional precomputed daily means (see compute_history_chart)
+        
+    Returns:
+        matplotlib.Figure: The generated figure
+    """
+    from .render import render_history_chart
+
+    results = compute_history_chart(df, metrics_to_show, daily)
+    with phase('figure'):
+        return render_history_chart(results)
+
+@profiled
+def compute_time_breakdown(
+    df: Optional[FrameLike],
+    start: Optional[Union[str, datetime]] = None,
+    end: Optional[Union[str, datetime]] = None,
+    cube: Optional['TimeBreakdownCube'] = None,
+    user_id: Optional[str] = None
+) -> Dict[str, Union[pd.Series, float]]:
+    """
+    Compute time spent per category.
     
-    plt.tight_layout()
-    return fig
+    Args:
+        df: Input DataFrame with energy tracking data (unused when cube is given)
+        start: Optional first calendar day included
+        end: Optional first calendar day excluded
+        cube: Optional precomputed TimeBreakdownCube; the range is then
+            answered from its prefix sums without reading any rows
+        user_id: User to read from a multi-user cube
+        
+    Returns:
+        dict: hours_by_category (Series indexed by category) and total_hours
+    """
+    if cube is not None:
+        time_by_category = cube.breakdown(user_id, start, end)
+    else:
+        if start is not None or end is not None:
+            start = None if start is None else pd.Timestamp(start).normalize()
+            end = None if end is None else pd.Timestamp(end).normalize()
+            df = TimeIndexedFrame.wrap(df).window(start, end)
+        # Calculate total hours per category
+        time_by_category = as_frame(df).groupby(
+            'time_category', observed=True
+        )['hours_worked'].sum()
+    return {
+        'hours_by_category': time_by_category,
+        'total_hours': float(time_by_category.sum()),
+    }
 
-def plot_time_breakdown(df: pd.DataFrame) -> plt.Figure:
+@profiled
+def plot_time_breakdown(
+    df: Optional[FrameLike],
+    start: Optional[Union[str, datetime]] = None,
+    end: Optional[Union[str, datetime]] = None,
+    cube: Optional['TimeBreakdownCube'] = None,
+    user_id: Optional[str] = None
+) -> 'Figure':
     """
     Generate donut chart showing time spent breakdown by category.
     
     Args:
-        df: Input DataFrame with energy tracking data
+        df: Input DataFrame with energy tracking data (unused when cube is given)
+        start: Optional first calendar day included
+        end: Optional first calendar day excluded
+        cube: Optional precomputed TimeBreakdownCube (see compute_time_breakdown)
+        user_id: User to read from a multi-user cube
         
     Returns:
         matplotlib.Figure: The generated figure
     """
-    # Calculate total hours per category
-    time_by_category = df.groupby('time_category')['hours_worked'].sum()
-    total_hours = time_by_category.sum()
-    
-    # Create color palette
-    n_categories = len(time_by_category)
-    colors = [PRIMARY_COLOR] + [plt.cm.Purples(i/n_categories) 
-                               for i in range(1, n_categories)]
-    
-    # Create donut chart
-    fig, ax = plt.subplots(figsize=(10, 10))
-    wedges, texts, autotexts = ax.pie(
-        time_by_category,
-        labels=time_by_category.index,
-        colors=colors,
-        autopct='%1.1f%%',
-        pctdistance=0.85,
-        wedgeprops=dict(width=0.5)
-    )
+    from .render import render_time_breakdown
+
+    results = compute_time_breakdown(df, start, end, cube, user_id)
+    with phase('figure'):
+        return render_time_breakdown(results)
+
+@profiled
+def compute_trend_table(
+    df: Optional[FrameLike],
+    metrics: Optional[List[str]] = None,
+    windows: Tuple[int, ...] = TREND_WINDOWS,
+    daily: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Compute trends of several metrics over several windows in one pass.
     
-    # Add center text
-    ax.text(0, 0, f'Total\n{total_hours:.1f}\nhours',
-            ha='center', va='center', fontsize=12)
+    Windows are whole calendar days ending on the last tracked day
+    (7 * weeks + 1 days). All (metric, window) fits come from one daily
+    matrix using closed-form least squares, see trend.window_trends.
     
-    plt.title('Time Allocation by Category')
-    return fig
+    Args:
+        df: Input DataFrame with energy tracking data (unused when daily is given)
+        metrics: Metrics to analyze (default: TREND_METRICS); 'mood' is
+            mapped to 'mood_numeric'
+        windows: Window lengths in weeks
+        daily: Optional precomputed daily means, e.g. from
+            DailyAggregateStore.daily_means
+        
+    Returns:
+        pd.DataFrame: One row per (metric, weeks) with slope (points per
+        day), change, days (fitted days) and description
+    """
+    metrics = ['mood_numeric' if m == 'mood' else m
+               for m in (TREND_METRICS if metrics is None else metrics)]
+    windows = tuple(windows)
+    span = timedelta(days=7 * max(windows, default=0))
+    
+    if daily is not None:
+        daily_avg = daily[metrics].asfreq('D')
+        daily_avg = daily_avg.loc[daily_avg.index.max() - span:]
+    else:
+        # Only the rows of the longest window are read
+        frame, mask = _recent_rows(df, span, normalize=True)
+        daily_avg = _daily_means(frame, metrics, mask)
+    
+    with phase('trend_fit', len(daily_avg)):
+        fit = window_trends(daily_avg.to_numpy(), windows)
+    rows = [
+        {
+            'metric': metric,
+            'weeks': weeks,
+            'slope': float(fit['slope'][i, j]),
+            'change': float(fit['change'][i, j]),
+            'days': int(fit['days'][i, j]),
+            'description': describe_trend(metric, fit['change'][i, j], weeks),
+        }
+        for i, weeks in enumerate(windows)
+        for j, metric in enumerate(metrics)
+    ]
+    return pd.DataFrame(rows, columns=['metric', 'weeks', 'slope', 'change', 'days',
+                                       'description'])
 
-def plot_metric_trend(
-    df: pd.DataFrame,
+@profiled
+def compute_metric_trend(
+    df: Optional[FrameLike],
     metric: str,
     periods: int = 4,
-    trend_weeks: int = 8
-) -> Tuple[plt.Figure, str]:
+    trend_weeks: int = 8,
+    daily: Optional[pd.DataFrame] = None
+) -> Dict[str, Union[str, float, pd.Series, np.ndarray]]:
     """
-    Generate trend analysis for a specific metric.
+    Compute trend analysis for a specific metric.
+    
+    A single-metric, single-window view over trend.window_trends that also
+    returns the series needed to draw the chart.
     
     Args:
-        df: Input DataFrame with energy tracking data
+        df: Input DataFrame with energy tracking data (unused when daily is given)
         metric: Metric to analyze
         periods: Number of periods for rolling average
         trend_weeks: Number of weeks to analyze
+        daily: Optional precomputed daily means, e.g. from
+            DailyAggregateStore.daily_means; the window then starts
+            trend_weeks before the last tracked day
         
     Returns:
-        tuple: (matplotlib.Figure, trend_description)
+        dict: metric (resolved column name), daily, rolling and trend values,
+        slope, change and a human-readable description
     """
-    df = df.copy()
-    
     # Convert mood to numerical if needed
     if metric == 'mood':
-        df['mood_numeric'] = df['mood'].map(MOOD_SCALE)
         metric = 'mood_numeric'
     
-    # Filter to trend_weeks
-    start_date = df['date'].max() - timedelta(weeks=trend_weeks)
-    mask = df['date'] >= start_date
-    df_trend = df[mask].copy()
-    
-    # Calculate daily average and rolling mean
-    daily_avg = df_trend.set_index('date')[metric].resample('D').mean()
-    rolling_avg = daily_avg.rolling(window=7, min_periods=1).mean()
-    
-    # Calculate trend
-    x = np.arange(len(rolling_avg))
-    z = np.polyfit(x, rolling_avg.fillna(method='ffill'), 1)
-    p = np.poly1d(z)
-    
-    # Create visualization
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    ax.plot(daily_avg.index, daily_avg, alpha=0.5, color='gray', label='Daily')
-    ax.plot(rolling_avg.index, rolling_avg, color=PRIMARY_COLOR, 
-            linewidth=2, label='7-day Average')
-    ax.plot(rolling_avg.index, p(x), '--', color='black', 
-            label='Trend', alpha=0.8)
-    
-    ax.set_title(f'{metric.replace("_", " ").title()} Trend Analysis')
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Score')
-    ax.legend()
-    
-    # Generate trend description
-    change = p(len(x)-1) - p(0)
-    direction = "improved" if change > 0 else "declined"
-    description = (f"{metric.replace('_', ' ').title()} has {direction} "
-                  f"by {abs(change):.1f} points over {trend_weeks} weeks")
+    if daily is not None:
+        daily_avg = daily[metric].asfreq('D')
+    else:
+        # Filter to trend_weeks and calculate daily average
+        frame, mask = _recent_rows(df, timedelta(weeks=trend_weeks))
+        daily_avg = _daily_means(frame, [metric], mask)[metric]
+    
+    # Fit the window on the rolling mean
+    with phase('trend_fit', len(daily_avg)):
+        fit = window_trends(daily_avg.to_numpy()[:, None], [trend_weeks])
+    start = fit['starts'][0]
+    daily_avg = daily_avg.iloc[start:]
+    rolling_avg = pd.Series(fit['rolling'][0, start:, 0], index=daily_avg.index, name=metric)
+    x = np.arange(start, start + len(daily_avg))
+    slope = float(fit['slope'][0, 0])
+    change = float(fit['change'][0, 0])
+    
+    return {
+        'metric': metric,
+        'daily': daily_avg,
+        'rolling': rolling_avg,
+        'trend': slope * x + fit['intercept'][0, 0],
+        'slope': slope,
+        'change': change,
+        'description': describe_trend(metric, change, trend_weeks),
+    }
+
+@profiled
+def plot_metric_trend(
+    df: Optional[FrameLike],
+    metric: str,
+    periods: int = 4,
+    trend_weeks: int = 8,
+    daily: Optional[pd.DataFrame] = None
+) -> Tuple['Figure', str]:
+    """
+    Generate trend analysis for a specific metric.
     
-    return fig, description
+    Args:
+        df: Input DataFrame with energy tracking data (unused when daily is given)
+        metric: Metric to analyze
+        periods: Number of periods for rolling average
+        trend_weeks: Number of weeks to analyze
+        daily: Optional precomputed daily means (see compute_metric_trend)
+        
+    Returns:
+        tuple: (matplotlib.Figure, trend_description)
+    """
+    from .render import render_metric_trend
 
+    results = compute_metric_trend(df, metric, periods, trend_weeks, daily)
+    with phase('figure'):
+        return render_metric_trend(results), results['description']
+
+@profiled
 def calculate_summary_metrics(
-    df: pd.DataFrame,
+    df: FrameLike,
     period_days: int = 30
 ) -> Dict[str, Union[int, float, str, datetime]]:
     """
     Calculate summary metrics and milestones.
     
     Args:
-        df: Input DataFrame with energy tracking data
+        df: Input DataFrame with energy tracking data, or a TimeIndexedFrame
+            whose period is found by binary search
         period_days: Number of days to analyze
         
     Returns:
         dict: Dictionary containing calculated metrics and milestones
     """
-    # Filter to specified period
-    df = df.copy()
-    start_date = df['date'].max() - timedelta(days=period_days)
-    df_period = df[df['date'] >= start_date]
+    # Filter to specified period (a zero-copy slice for a TimeIndexedFrame);
+    # only the columns used are read, into side arrays
+    df_period, mask = _recent_rows(df, timedelta(days=period_days))
+    df = as_frame(df)
+
+    def period_values(values):
+        return values if mask is None else values[mask]
+
+    is_pomodoro = period_values(df_period['is_pomodoro'].to_numpy()) == 1
     
     # Calculate basic metrics
     metrics = {
-        'happy_moments_count': df_period['happy_moment'].notna().sum(),
-        'pomodoro_usage_pct': (
-            (df_period['is_pomodoro'] == 1).sum() / len(df_period) * 100
-        ),
-        'best_pomodoro_day': df_period[df_period['is_pomodoro'] == 1]['date'].max(),
+        'happy_moments_count': period_values(happy_flags(df_period)).sum(),
+        'pomodoro_usage_pct': is_pomodoro.sum() / len(is_pomodoro) * 100,
+        'best_pomodoro_day': period_values(df_period['date'].array)[is_pomodoro].max(),
     }
     
     # Calculate streaks and milestones
-    dates = pd.date_range(df['date'].min(), df['date'].max(), freq='D')
-    tracking_days = df['date'].dt.date.unique()
-    
-    # Consecutive tracking days
-    current_streak = 0
-    max_streak = 0
-    
-    for date in dates:
-        if date.date() in tracking_days:
-            current_streak += 1
-            max_streak = max(max_streak, current_streak)
-        else:
-            current_streak = 0
-    
-    metrics['consecutive_tracking_days'] = max_streak
+    with phase('streaks', len(df)):
+        streaks = day_streaks(df['date'].to_numpy())
+    metrics['consecutive_tracking_days'] = int(streaks['longest_streak'][0])
+    metrics['current_streak'] = int(streaks['current_streak'][0])
+    metrics['longest_streak_start'] = pd.Timestamp(streaks['longest_streak_start'][0])
+    metrics['longest_streak_end'] = pd.Timestamp(streaks['longest_streak_end'][0])
     
     # High energy days
-    metrics['high_energy_days'] = len(
-        df_period[df_period['physical_energy'] >= 6]
-    )
-    
-    # Most used mood
-    metrics['most_used_mood'] = df_period['mood'].mode().iloc[0]
+    metrics['high_energy_days'] = int(np.count_nonzero(
+        period_values(df_period['physical_energy'].to_numpy()) >= HIGH_ENERGY_LEVEL
+    ))
+    
+    # Most used mood (alphabetically first on ties, for raw and categorical
+    # moods; None without mood labels, e.g. for check-ins loaded from Prisma)
+    mood_counts = period_values(df_period['mood']).value_counts() \
+        if 'mood' in df.columns else pd.Series(dtype=np.int64)
+    metrics['most_used_mood'] = min(
+        mood_counts.index[mood_counts == mood_counts.max()]
+    ) if len(mood_counts) else None
     
     # Hydration milestone
-    hydration_streak = (
-        df_period['hydration']
-        .rolling(window=7, min_periods=7)
-        .apply(lambda x: (x >= 7).all())
+    longest_hydration = longest_true_runs(
+        period_values(df_period['hydration'].to_numpy()) >= HYDRATION_GOAL
+    )
+    metrics['longest_hydration_run'] = int(longest_hydration[0])
+    metrics['milestone_hydration'] = bool(
+        longest_hydration[0] >= HYDRATION_STREAK_ENTRIES
     )
-    metrics['milestone_hydration'] = bool(hydration_streak.any())
     
     # Happy moments milestone
-    total_happy = df['happy_moment'].notna().sum()
-    metrics['milestone_happy'] = total_happy >= 50
+    has_happy = happy_flags(df)
+    total_happy = has_happy.sum()
+    metrics['milestone_happy'] = total_happy >= HAPPY_MILESTONE
     if metrics['milestone_happy']:
-        happy_dates = df[df['happy_moment'].notna()]['date']
-        milestone_date = happy_dates.iloc[49]  # 50th happy moment
+        milestone_date = df['date'].iloc[np.flatnonzero(has_happy)[HAPPY_MILESTONE - 1]]
         metrics['time_since_happy_milestone'] = (
             df['date'].max() - milestone_date
         ).days
     
     return metrics
+
+@profiled
+def compute_batch_streaks(
+    df: FrameLike,
+    user_col: str = 'user_id'
+) -> pd.DataFrame:
+    """
+    Compute tracking and hydration streaks for many users in one pass.
+    
+    Args:
+        df: Long-format DataFrame with energy tracking data for many users,
+            in chronological order within each user
+        user_col: Column holding the user id
+        
+    Returns:
+        pd.DataFrame: One row per user with current_streak, longest_streak,
+        longest_streak_start, longest_streak_end and longest_hydration_run
+    """
+    df = as_frame(df)
+    codes, user_ids = group_codes(df, user_col)
+    streaks = day_streaks(df['date'].to_numpy(), codes, len(user_ids))
+    streaks['longest_hydration_run'] = longest_true_runs(
+        (df['hydration'] >= HYDRATION_GOAL).to_numpy(), codes, len(user_ids)
+    )
+    return pd.DataFrame(streaks, index=pd.Index(user_ids, name=user_col))
@@ -0,0 +1,406 @@
+"""
+Bulk Loader for Energy Tracker Analytics
+Pulls CheckIn, TimeEntry, SleepHygiene and CheckInCustomTrackerValue rows for
+a set of users straight from the Prisma database and maps them into typed,
+categorical-encoded analytics frames; energy_frame adapts them to the input of
+the compute_* analytics functions.
+"""
+
+import queue
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from .schema import to_analytics_frame
+
+# Prisma CheckIn columns and their analytics names
+CHECK_IN_COLUMNS = {
+    'id': 'check_in_id',
+    'userId': 'user_id',
+    'window': 'window',
+    'tsUtc': 'date',
+    'physical17': 'physical_energy',
+    'cognitive17': 'cognitive_clarity',
+    # 1-7 scale, kept apart from the 1-10 MOOD_SCALE values in mood_numeric
+    'mood17': 'mood17',
+    'stress17': 'stress',
+}
+
+# SleepHygiene flags, joined one-to-one onto check-ins
+SLEEP_HYGIENE_COLUMNS = {
+    'consistentSchedule': 'sleep_consistent_schedule',
+    'noScreens': 'sleep_no_screens',
+    'relaxingRoutine': 'sleep_relaxing_routine',
+    'optimalEnvironment': 'sleep_optimal_environment',
+    'noCaffeine': 'sleep_no_caffeine',
+}
+
+_CHECK_IN_QUERY = (
+    'SELECT ' + ', '.join(f'c."{col}"' for col in CHECK_IN_COLUMNS) + ', '
+    + ', '.join(f's."{col}"' for col in SLEEP_HYGIENE_COLUMNS) + ' '
+    'FROM "CheckIn" c LEFT JOIN "SleepHygiene" s ON s."checkInId" = c."id" '
+    'WHERE c."userId" {users} ORDER BY c."userId", c."tsUtc"'
+)
+
+_TIME_ENTRY_QUERY = (
+    'SELECT t."checkInId", c."userId", c."tsUtc", tc."label", t."hours" '
+    'FROM "TimeEntry" t JOIN "CheckIn" c ON c."id" = t."checkInId" '
+    'JOIN "TimeCategory" tc ON tc."id" = t."categoryId" '
+    'WHERE c."userId" {users} ORDER BY c."userId", c."tsUtc"'
+)
+
+_CUSTOM_VALUE_QUERY = (
+    'SELECT v."checkInId", c."userId", c."tsUtc", v."trackerId", v."value" '
+    'FROM "CheckInCustomTrackerValue" v JOIN "CheckIn" c ON c."id" = v."checkInId" '
+    'WHERE c."userId" {users} ORDER BY c."userId", c."tsUtc"'
+)
+
+_CUSTOM_TRACKER_QUERY = (
+    'SELECT t."id", t."userId", t."label", t."unitType", t."maxValue" '
+    'FROM "CustomTracker" t WHERE t."userId" {users} ORDER BY t."userId", t."id"'
+)
+
+_USER_ID_QUERY = (
+    'SELECT DISTINCT c."userId" FROM "CheckIn" c WHERE c."userId" IS NOT NULL '
+    'ORDER BY c."userId"'
+)
+
+DIALECTS = ('postgres', 'sqlite')
+
+
+def _connect_postgres(dsn: str) -> Any:
+    # Optional dependency, only needed for Postgres URLs
+    import psycopg2
+    return psycopg2.connect(dsn)
+
+
+def dsn_connector(dsn: str) -> Tuple[Callable[[], Any], str]:
+    """
+    Connection factory and dialect for a database URL.
+
+    Args:
+        dsn: postgres:// or postgresql:// URL (connected with psycopg2), or
+            a SQLite file path, optionally written as sqlite:///path
+
+    Returns:
+        tuple: (picklable zero-argument connect callable, dialect)
+    """
+    if dsn.startswith(('postgres://', 'postgresql://')):
+        return partial(_connect_postgres, dsn), 'postgres'
+    if dsn.startswith('sqlite:///'):
+        dsn = dsn[len('sqlite:///'):]
+    return partial(sqlite3.connect, dsn, check_same_thread=False), 'sqlite'
+
+
+class ConnectionPool:
+    """
+    Minimal thread-safe pool of DB-API connections.
+
+    Connections are created lazily by the ``connect`` callable, handed out by
+    ``connection()`` and returned to the pool afterwards, after a rollback
+    ends any transaction the borrower left open (e.g. the one a Postgres
+    named cursor starts). A connection that raised is closed instead of
+    being reused.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = 4):
+        """
+        Args:
+            connect: Zero-argument callable returning a new DB-API connection
+            max_size: Maximum number of open connections
+        """
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrow a connection, blocking while all connections are in use.
+
+        Yields:
+            A DB-API connection
+        """
+        if self._closed:
+            raise RuntimeError('Connection pool is closed')
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+                conn.rollback()
+            except BaseException:
+                conn.close()
+                raise
+            # Checked under the lock, so close() cannot drain the queue
+            # between the check and the put
+            with self._lock:
+                if not self._closed:
+                    self._idle.put(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Close every idle connection and refuse further borrowing.
+
+        Connections borrowed at the time are closed when they are returned.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def _user_filter(dialect: str, user_ids: Sequence[str]):
+    """SQL fragment and parameters selecting the given users."""
+    if dialect == 'postgres':
+        return '= ANY(%s)', [list(user_ids)]
+    placeholders = ', '.join('?' * len(user_ids))
+    return f'IN ({placeholders})', list(user_ids)
+
+
+def _stream_query(
+    conn: Any,
+    sql: str,
+    params: Sequence[Any],
+    dialect: str,
+    chunk_size: int
+) -> Iterator[List[tuple]]:
+    """Run a query and yield its rows in chunks of at most chunk_size."""
+    if dialect == 'postgres':
+        # A named cursor keeps the result set on the server
+        cursor = conn.cursor(name='analytics_bulk_load')
+        cursor.itersize = chunk_size
+    else:
+        cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _read_frame(
+    conn: Any,
+    sql: str,
+    params: Sequence[Any],
+    columns: List[str],
+    dialect: str,
+    chunk_size: int
+) -> pd.DataFrame:
+    """Stream a query into one DataFrame, one chunk of rows at a time."""
+    chunks = [
+        pd.DataFrame.from_records(rows, columns=columns)
+        for rows in _stream_query(conn, sql, params, dialect, chunk_size)
+    ]
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=object) for col in columns})
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _to_datetime(values: pd.Series) -> pd.Series:
+    """Parse tsUtc values (timestamps, ISO strings or epoch ms) as naive UTC."""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_datetime(values, unit='ms')
+    parsed = pd.to_datetime(values, utc=True, format='ISO8601')
+    return parsed.dt.tz_localize(None).astype('datetime64[ns]')
+
+
+def _typed_check_ins(frame: pd.DataFrame) -> pd.DataFrame:
+    """Rename Prisma columns and convert check-ins to analytics dtypes."""
+    frame = frame.rename(columns={**CHECK_IN_COLUMNS, **SLEEP_HYGIENE_COLUMNS})
+    frame['date'] = _to_datetime(frame['date'])
+    frame['user_id'] = frame['user_id'].astype('category')
+    frame['window'] = frame['window'].astype('category')
+    frame['physical_energy'] = frame['physical_energy'].astype(np.int64)
+    frame['cognitive_clarity'] = frame['cognitive_clarity'].astype(np.int64)
+    for col in ('mood17', 'stress'):
+        frame[col] = pd.to_numeric(frame[col], errors='coerce').astype(np.float64)
+    for col in SLEEP_HYGIENE_COLUMNS.values():
+        frame[col] = frame[col].astype('boolean').fillna(False).astype(bool)
+    return to_analytics_frame(frame)
+
+
+def load_user_frames(
+    pool: ConnectionPool,
+    user_ids: Sequence[str],
+    dialect: str = 'postgres',
+    chunk_size: int = 10000
+) -> Dict[str, pd.DataFrame]:
+    """
+    Load analytics frames for a set of users in bulk.
+
+    Each table is read with one streamed query (a server-side cursor on
+    Postgres) covering every requested user, and the rows are converted to
+    the analytics schema (see schema.to_analytics_frame) with categorical ids
+    and labels.
+
+    Args:
+        pool: Connection pool for the Prisma database
+        user_ids: Users to load
+        dialect: 'postgres' or 'sqlite' (for local stand-ins)
+        chunk_size: Rows fetched per round trip
+
+    Returns:
+        dict: DataFrames keyed by name:
+            check_ins - one row per CheckIn with physical_energy,
+                cognitive_clarity, mood17 (1-7 scale, not the 1-10
+                mood_numeric scale), stress and the sleep_* hygiene flags.
+                It has no mood, caffeine, hydration or socializing columns,
+                so it does not feed compute_energy_correlations or other
+                CORE_METRICS analytics as is; pass the frames through
+                energy_frame first
+            time_entries - check_in_id, user_id, date, time_category,
+                hours_worked
+            custom_values - check_in_id, user_id, date, tracker_id and the
+                raw string value
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f'Unsupported dialect: {dialect}')
+
+    users, params = _user_filter(dialect, list(user_ids))
+
+    with pool.connection() as conn:
+        check_ins = _read_frame(
+            conn, _CHECK_IN_QUERY.format(users=users), params,
+            list(CHECK_IN_COLUMNS) + list(SLEEP_HYGIENE_COLUMNS), dialect, chunk_size
+        )
+        time_entries = _read_frame(
+            conn, _TIME_ENTRY_QUERY.format(users=users), params,
+            ['check_in_id', 'user_id', 'date', 'time_category', 'hours_worked'],
+            dialect, chunk_size
+        )
+        custom_values = _read_frame(
+            conn, _CUSTOM_VALUE_QUERY.format(users=users), params,
+            ['check_in_id', 'user_id', 'date', 'tracker_id', 'value'], dialect, chunk_size
+        )
+
+    time_entries['date'] = _to_datetime(time_entries['date'])
+    time_entries['hours_worked'] = time_entries['hours_worked'].astype(np.float64)
+    custom_values['date'] = _to_datetime(custom_values['date'])
+    time_entries = to_analytics_frame(time_entries)
+    for col in ('user_id', 'tracker_id'):
+        custom_values[col] = custom_values[col].astype('category')
+
+    return {
+        'check_ins': _typed_check_ins(check_ins),
+        'time_entries': time_entries,
+        'custom_values': custom_values,
+    }
+
+
+def load_user_ids(pool: ConnectionPool) -> List[str]:
+    """
+    Ids of every user with at least one check-in.
+
+    Args:
+        pool: Connection pool for the Prisma database
+
+    Returns:
+        list: User ids in sorted order
+    """
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(_USER_ID_QUERY)
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def load_custom_trackers(
+    pool: ConnectionPool,
+    user_ids: Sequence[str],
+    dialect: str = 'postgres'
+) -> pd.DataFrame:
+    """
+    Load the CustomTracker definitions of a set of users.
+
+    Args:
+        pool: Connection pool for the Prisma database
+        user_ids: Users to load
+        dialect: 'postgres' or 'sqlite' (for local stand-ins)
+
+    Returns:
+        pd.DataFrame: tracker_id, user_id, label, unit_type ('number',
+        'scale', 'boolean' or 'string') and max_value, as used by
+        CustomTrackerMatrix.from_values
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f'Unsupported dialect: {dialect}')
+
+    users, params = _user_filter(dialect, list(user_ids))
+    with pool.connection() as conn:
+        trackers = _read_frame(
+            conn, _CUSTOM_TRACKER_QUERY.format(users=users), params,
+            ['tracker_id', 'user_id', 'label', 'unit_type', 'max_value'], dialect, 10000
+        )
+    trackers['max_value'] = pd.to_numeric(trackers['max_value'], errors='coerce')
+    return trackers
+
+
+def energy_frame(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Adapt loaded frames to the input of the compute_* analytics functions.
+
+    The Prisma schema has no mood labels and no caffeine or hydration
+    intake, so the check-ins are completed as follows:
+
+    - mood_numeric is mood17 mapped linearly from 1-7 onto the 1-10
+      MOOD_SCALE range (correlations are unaffected by the rescaling)
+    - caffeine and hydration are all-missing columns, so they take part
+      in the CORE_METRICS matrices with NaN correlations and zero counts
+    - hours_worked is the total TimeEntry hours of each check-in and
+      time_category the category with the most of them, so a breakdown of
+      this frame attributes every hour of a check-in to that category
+      (compute_time_breakdown on frames['time_entries'] splits them exactly)
+
+    The result feeds compute_energy_correlations, compute_lagged_correlations,
+    compute_history_chart, compute_time_breakdown and compute_trend_table /
+    compute_metric_trend one user at a time (select a user_id first).
+    calculate_summary_metrics also needs is_pomodoro and happy_moment
+    columns, which are not loaded.
+
+    Args:
+        frames: Result of load_user_frames
+
+    Returns:
+        pd.DataFrame: One row per check-in, in the check-in order
+    """
+    check_ins = frames['check_ins']
+    time_entries = frames['time_entries']
+    hours = time_entries.groupby('check_in_id', observed=True)['hours_worked'].sum()
+    # Stable sort: ties go to the category listed first
+    by_category = time_entries.groupby(
+        ['check_in_id', 'time_category'], observed=True
+    )['hours_worked'].sum().sort_values(ascending=False, kind='stable').reset_index()
+    main_category = by_category.drop_duplicates('check_in_id').set_index(
+        'check_in_id'
+    )['time_category']
+    return check_ins.assign(
+        mood_numeric=1 + (check_ins['mood17'] - 1) * 1.5,
+        caffeine=np.nan,
+        hydration=np.nan,
+        hours_worked=check_ins['check_in_id'].map(hours).fillna(0.0).astype(np.float64),
+        time_category=check_ins['check_in_id'].map(main_category),
+    )
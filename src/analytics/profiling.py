@@ -0,0 +1,403 @@
+"""
+Profiling Hooks for Energy Tracker Analytics
+Per-phase wall time, input row counts and allocated bytes of analytics calls
+(mood mapping, resample, correlation, figure build, savefig, ...), reported
+to a pluggable sink: an in-memory histogram, a Prometheus text exposition
+file or a logging callback. Profiling is off by default; the disabled path
+is one global check per call or phase.
+
+Timing is per thread. Memory tracking uses tracemalloc's process-wide peak,
+so it is single-threaded: only phases on the thread that enabled it are
+measured, and a phase that overlapped a profiled phase on another thread
+reports no allocation.
+"""
+
+import abc
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+TOTAL_PHASE = 'total'
+
+
+class PhaseRecord(NamedTuple):
+    """One measured phase of an analytics call."""
+    call: str
+    phase: str
+    seconds: float
+    rows: Optional[int]
+    allocated_bytes: Optional[int]
+
+
+logger = logging.getLogger(__name__)
+
+_sink: Optional['Sink'] = None
+_track_memory = False
+_started_tracemalloc = False
+_state = threading.local()
+_NULL = nullcontext()
+
+# Memory tracking: the thread that enabled it, and profiled phases running
+# (and started so far) on other threads, which spoil its process-wide peaks
+_memory_thread: Optional[int] = None
+_other_lock = threading.Lock()
+_other_active = 0
+_other_started = 0
+
+
+class Sink(abc.ABC):
+    """Receives phase records."""
+
+    @abc.abstractmethod
+    def record(self, record: PhaseRecord) -> None:
+        """Handle one phase record."""
+
+
+def enable(sink: 'Sink', track_memory: bool = False) -> None:
+    """
+    Start profiling analytics calls.
+
+    Args:
+        sink: Where phase records go
+        track_memory: Also record the peak bytes allocated in each phase
+            (starts tracemalloc, which slows allocation-heavy code down).
+            Single-threaded: only phases on the calling thread are measured
+    """
+    global _sink, _track_memory, _started_tracemalloc, _memory_thread
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _track_memory = track_memory
+    _memory_thread = threading.get_ident() if track_memory else None
+    _sink = sink
+
+
+def disable() -> None:
+    """Stop profiling (and tracemalloc, if enable started it)."""
+    global _sink, _track_memory, _started_tracemalloc, _memory_thread
+    _sink = None
+    _track_memory = False
+    _memory_thread = None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def enabled() -> bool:
+    """Whether a sink is installed."""
+    return _sink is not None
+
+
+@contextmanager
+def profiling(sink: 'Sink', track_memory: bool = False) -> Iterator['Sink']:
+    """Profile analytics calls inside a with block."""
+    enable(sink, track_memory)
+    try:
+        yield sink
+    finally:
+        disable()
+
+
+def _stack() -> List[list]:
+    stack = getattr(_state, 'stack', None)
+    if stack is None:
+        stack = _state.stack = []
+    return stack
+
+
+def _other_thread_phase(delta: int) -> None:
+    global _other_active, _other_started
+    with _other_lock:
+        _other_active += delta
+        _other_started += delta > 0
+
+
+@contextmanager
+def _measure(call: Optional[str], name: str, rows: Optional[int],
+             default_call: str = 'unknown') -> Iterator[None]:
+    stack = _stack()
+    if call is None:
+        call = stack[-1][0] if stack else default_call
+    # Frame: [call, start bytes, peak bytes seen by nested phases]
+    frame = [call, 0, 0]
+    memory = other = False
+    if _track_memory and tracemalloc.is_tracing():
+        memory = threading.get_ident() == _memory_thread
+        other = not memory
+    if memory:
+        with _other_lock:
+            overlapped, started = _other_active > 0, _other_started
+        frame[1] = frame[2] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    elif other:
+        _other_thread_phase(1)
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        allocated = None
+        if memory:
+            peak = max(tracemalloc.get_traced_memory()[1], frame[2])
+            if stack:
+                stack[-1][2] = max(stack[-1][2], peak)
+            with _other_lock:
+                overlapped |= _other_active > 0 or _other_started != started
+            if not overlapped:
+                allocated = peak - frame[1]
+        elif other:
+            _other_thread_phase(-1)
+        sink = _sink
+        if sink is not None:
+            try:
+                sink.record(PhaseRecord(call, name, seconds, rows, allocated))
+            except Exception:
+                # Profiling must never fail the analytics call
+                logger.exception('Profiling sink %r failed', sink)
+
+
+def phase(name: str, rows: Optional[int] = None, default_call: str = 'unknown'):
+    """
+    Context manager timing one phase of the current analytics call.
+
+    Args:
+        name: Phase name, e.g. 'resample'
+        rows: Input rows the phase processes
+        default_call: Call to attribute the phase to outside profiled calls
+
+    Returns:
+        A context manager (a shared no-op when profiling is disabled)
+    """
+    if _sink is None:
+        return _NULL
+    return _measure(None, name, rows, default_call)
+
+
+def _rows(data: Any) -> Optional[int]:
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+def profiled(fn: Callable) -> Callable:
+    """
+    Decorator recording an analytics entry point as a call.
+
+    The whole call is recorded as phase 'total' with the length of the first
+    argument as its row count; phases inside it are attributed to it.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _sink is None:
+            return fn(*args, **kwargs)
+        data = args[0] if args else next(iter(kwargs.values()), None)
+        with _measure(name, TOTAL_PHASE, _rows(data)):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+class HistogramSink(Sink):
+    """
+    In-memory latency histograms with row and allocation totals per
+    (call, phase).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Args:
+            buckets: Increasing upper bounds (seconds) of the histogram buckets
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop everything recorded so far."""
+        self.series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def record(self, record: PhaseRecord) -> None:
+        key = (record.call, record.phase)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {
+                    'counts': [0] * (len(self.buckets) + 1), 'count': 0, 'seconds': 0.0,
+                    'rows': 0, 'allocated_bytes': 0, 'max_allocated_bytes': 0,
+                }
+            series['counts'][bisect.bisect_left(self.buckets, record.seconds)] += 1
+            series['count'] += 1
+            series['seconds'] += record.seconds
+            series['rows'] += record.rows or 0
+            if record.allocated_bytes is not None:
+                series['allocated_bytes'] += record.allocated_bytes
+                series['max_allocated_bytes'] = max(series['max_allocated_bytes'],
+                                                    record.allocated_bytes)
+
+    def quantile(self, call: str, phase: str, q: float) -> float:
+        """
+        Upper bucket bound at quantile q of a phase's wall times.
+
+        Returns:
+            float: Seconds (inf beyond the last bucket, NaN if unrecorded)
+        """
+        series = self.series.get((call, phase))
+        if series is None:
+            return float('nan')
+        target, seen = q * series['count'], 0
+        for bound, count in zip(self.buckets + (float('inf'),), series['counts']):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        One dict per (call, phase) with count, total and mean seconds, p50
+        and p95 bucket bounds, rows and allocated bytes.
+        """
+        with self._lock:
+            items = sorted(self.series.items())
+        return [
+            {
+                'call': call, 'phase': phase, 'count': s['count'],
+                'seconds': s['seconds'], 'mean_seconds': s['seconds'] / s['count'],
+                'p50_seconds': self.quantile(call, phase, 0.5),
+                'p95_seconds': self.quantile(call, phase, 0.95),
+                'rows': s['rows'], 'allocated_bytes': s['allocated_bytes'],
+                'max_allocated_bytes': s['max_allocated_bytes'],
+            }
+            for (call, phase), s in items
+        ]
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class PrometheusFileSink(HistogramSink):
+    """
+    Histogram sink that writes the Prometheus text exposition format to a
+    file, e.g. for the node_exporter textfile collector.
+
+    The file is replaced atomically on flush, at most every flush_interval
+    seconds as records arrive, and on explicit flush() calls.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 10.0,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        prefix: str = 'analytics'
+    ):
+        """
+        Args:
+            path: Output file (conventionally ending in .prom); '{pid}' is
+                replaced by the writing process id, so forked workers
+                inheriting the sink write separate files
+            flush_interval: Minimum seconds between automatic writes
+            buckets: Histogram bucket upper bounds in seconds
+            prefix: Metric name prefix
+        """
+        super().__init__(buckets)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.prefix = prefix
+        self._last_flush = float('-inf')
+        self._flush_lock = threading.Lock()
+
+    def record(self, record: PhaseRecord) -> None:
+        super().record(record)
+        with self._flush_lock:
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._write()
+
+    def render(self) -> str:
+        """The current histograms in the text exposition format."""
+        name = f'{self.prefix}_phase'
+        lines = [
+            f'# HELP {name}_seconds Wall time of analytics call phases.',
+            f'# TYPE {name}_seconds histogram',
+        ]
+        with self._lock:
+            items = sorted((key, dict(s, counts=list(s['counts'])))
+                           for key, s in self.series.items())
+        for (call, phase), s in items:
+            labels = f'call="{_label(call)}",phase="{_label(phase)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, s['counts']):
+                cumulative += count
+                lines.append(f'{name}_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_seconds_bucket{{{labels},le="+Inf"}} {s["count"]}')
+            lines.append(f'{name}_seconds_sum{{{labels}}} {s["seconds"]!r}')
+            lines.append(f'{name}_seconds_count{{{labels}}} {s["count"]}')
+        for metric, key, help_text in (
+            ('rows_total', 'rows', 'Input rows processed by analytics call phases.'),
+            ('allocated_bytes_total', 'allocated_bytes',
+             'Peak bytes allocated by analytics call phases, summed over calls.'),
+        ):
+            lines += [f'# HELP {name}_{metric} {help_text}', f'# TYPE {name}_{metric} counter']
+            for (call, phase), s in items:
+                labels = f'call="{_label(call)}",phase="{_label(phase)}"'
+                lines.append(f'{name}_{metric}{{{labels}}} {s[key]}')
+        return '\n'.join(lines) + '\n'
+
+    def flush(self) -> None:
+        """Write the file now."""
+        with self._flush_lock:
+            self._write()
+
+    def _write(self) -> None:
+        """Write the file (flush lock held)."""
+        self._last_flush = time.monotonic()
+        path = self.path.replace('{pid}', str(os.getpid()))
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+class LoggingSink(Sink):
+    """Hands each record to a callback, or logs it."""
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[PhaseRecord], None]] = None,
+        logger: Optional[logging.Logger] = None,
+        level: int = logging.DEBUG
+    ):
+        """
+        Args:
+            callback: Called with every PhaseRecord; when None, records are
+                logged instead
+            logger: Logger to use (default: this module's logger)
+            level: Log level of the records
+        """
+        self.callback = callback
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def record(self, record: PhaseRecord) -> None:
+        if self.callback is not None:
+            self.callback(record)
+        else:
+            self.logger.log(
+                self.level, '%s/%s %.3f ms rows=%s allocated=%s', record.call, record.phase,
+                record.seconds * 1000, record.rows, record.allocated_bytes
+            )
@@ -0,0 +1,326 @@
+"""
+Population Percentiles for Energy Tracker Analytics
+A mergeable t-digest quantile sketch and a per-metric population sketch of
+user averages, so "your energy is higher than 70% of users" is a lookup in a
+few hundred centroids instead of a sort over every user. Sketches built in
+separate processes merge exactly like sketches built in one, and serialize
+to a few kilobytes.
+"""
+
+import struct
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Union
+
+PERCENTILE_METRICS = ['physical_energy', 'stress', 'hydration']
+DEFAULT_COMPRESSION = 100.0
+
+_DIGEST_HEADER = struct.Struct('<4sdddI')
+_DIGEST_MAGIC = b'TDG1'
+_SKETCH_MAGIC = b'PSK1'
+
+
+def _k_scale(q: np.ndarray, compression: float) -> np.ndarray:
+    """t-digest k1 scale function; centroids span at most one unit of k."""
+    return compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+
+class TDigest:
+    """
+    Merging t-digest over float values.
+
+    Centroids are small near both tails and larger in the middle, so the
+    extreme quantiles stay accurate. Compression is vectorized: points are
+    sorted, equal means combined and neighbours merged while they stay
+    within one unit of the k1 scale function.
+    """
+
+    def __init__(
+        self,
+        compression: float = DEFAULT_COMPRESSION,
+        means: Optional[np.ndarray] = None,
+        weights: Optional[np.ndarray] = None,
+        min_value: float = np.inf,
+        max_value: float = -np.inf
+    ):
+        """
+        Args:
+            compression: Size parameter; about compression / 2 to compression
+                centroids are kept
+            means: Centroid means in increasing order
+            weights: Centroid weights
+            min_value: Smallest value seen
+            max_value: Largest value seen
+        """
+        self.compression = float(compression)
+        self.means = np.zeros(0) if means is None else np.asarray(means, dtype=np.float64)
+        self.weights = np.zeros(0) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.min = float(min_value)
+        self.max = float(max_value)
+
+    @classmethod
+    def from_values(
+        cls,
+        values: Iterable[float],
+        compression: float = DEFAULT_COMPRESSION
+    ) -> 'TDigest':
+        """Build a digest from raw values (NaNs are ignored)."""
+        return cls(compression).update(values)
+
+    @property
+    def count(self) -> float:
+        """Total weight of all values added."""
+        return float(self.weights.sum())
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray) -> None:
+        """Merge extra centroids into this digest and compress."""
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        if len(means) == 0:
+            return
+
+        # Combine equal means, then sort
+        means, inverse = np.unique(means, return_inverse=True)
+        weights = np.bincount(inverse, weights=weights)
+
+        # Group neighbours by the k-scale position of their left edge
+        total = weights.sum()
+        left = np.concatenate([[0.0], np.cumsum(weights)[:-1]]) / total
+        k = _k_scale(left, self.compression)
+        buckets = np.floor(k - k[0]).astype(np.intp)
+        _, buckets = np.unique(buckets, return_inverse=True)
+        merged_weights = np.bincount(buckets, weights=weights)
+        self.means = np.bincount(buckets, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+
+    def update(self, values: Iterable[float]) -> 'TDigest':
+        """
+        Add raw values.
+
+        Returns:
+            TDigest: self, for chaining
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._absorb(values, np.ones(len(values)))
+        return self
+
+    def merge(self, *others: 'TDigest') -> 'TDigest':
+        """
+        Merge other digests into this one.
+
+        Returns:
+            TDigest: self, for chaining
+        """
+        others = [other for other in others if len(other.means)]
+        if others:
+            self.min = min([self.min] + [other.min for other in others])
+            self.max = max([self.max] + [other.max for other in others])
+            self._absorb(np.concatenate([other.means for other in others]),
+                         np.concatenate([other.weights for other in others]))
+        return self
+
+    def _knots(self):
+        """Cumulative weights at each centroid centre, anchored at min and max."""
+        centres = np.cumsum(self.weights) - self.weights / 2
+        return (np.concatenate([[0.0], centres, [self.count]]),
+                np.concatenate([[self.min], self.means, [self.max]]))
+
+    def cdf(self, x: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Approximate fraction of values at or below x (mid-rank for ties).
+
+        Args:
+            x: Value or array of values
+
+        Returns:
+            Fraction in [0, 1] (NaN for an empty digest)
+        """
+        if not len(self.means):
+            return np.full(np.shape(x), np.nan)[()] if np.ndim(x) else np.nan
+        ranks, values = self._knots()
+        result = np.interp(x, values, ranks) / self.count
+        result = np.where(np.asarray(x) < self.min, 0.0,
+                          np.where(np.asarray(x) > self.max, 1.0, result))
+        return result[()] if np.ndim(result) == 0 else result
+
+    def quantile(self, q: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Approximate value at quantile q.
+
+        Args:
+            q: Quantile or array of quantiles in [0, 1]
+
+        Returns:
+            Value(s) (NaN for an empty digest)
+        """
+        if not len(self.means):
+            return np.full(np.shape(q), np.nan)[()] if np.ndim(q) else np.nan
+        ranks, values = self._knots()
+        result = np.interp(np.asarray(q, dtype=np.float64) * self.count, ranks, values)
+        return result[()] if np.ndim(result) == 0 else result
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact little-endian byte string."""
+        header = _DIGEST_HEADER.pack(_DIGEST_MAGIC, self.compression, self.min, self.max,
+                                     len(self.means))
+        return header + self.means.astype('<f8').tobytes() + self.weights.astype('<f8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TDigest':
+        """
+        Deserialize a digest written by to_bytes.
+
+        Raises:
+            ValueError: If the data is not a serialized digest
+        """
+        magic, compression, min_value, max_value, size = _DIGEST_HEADER.unpack_from(data)
+        if magic != _DIGEST_MAGIC:
+            raise ValueError('Not a serialized TDigest')
+        offset = _DIGEST_HEADER.size
+        means = np.frombuffer(data, dtype='<f8', count=size, offset=offset)
+        weights = np.frombuffer(data, dtype='<f8', count=size, offset=offset + 8 * size)
+        return cls(compression, means.copy(), weights.copy(), min_value, max_value)
+
+    def __len__(self) -> int:
+        return len(self.means)
+
+
+class PopulationSketch:
+    """
+    One t-digest per metric over users' average values.
+
+    Each user contributes the mean of each metric over the same period
+    calculate_summary_metrics analyzes, so percentiles compare users rather
+    than check-ins.
+    """
+
+    def __init__(
+        self,
+        metrics: Optional[List[str]] = None,
+        period_days: int = 30,
+        compression: float = DEFAULT_COMPRESSION
+    ):
+        """
+        Args:
+            metrics: Metrics to sketch (default: PERCENTILE_METRICS)
+            period_days: Trailing days averaged per user
+            compression: t-digest compression
+        """
+        self.metrics = list(PERCENTILE_METRICS if metrics is None else metrics)
+        self.period_days = period_days
+        self.digests = {metric: TDigest(compression) for metric in self.metrics}
+
+    def user_values(self, df: pd.DataFrame) -> Dict[str, float]:
+        """
+        A user's period averages, as added to the sketch.
+
+        Args:
+            df: One user's energy tracking data
+
+        Returns:
+            dict: Mean of each metric over the last period_days
+        """
+        start_date = df['date'].max() - timedelta(days=self.period_days)
+        period = (df['date'] >= start_date).to_numpy()
+        return {
+            metric: float(np.nanmean(df[metric].to_numpy(dtype=np.float64)[period]))
+            if period.any() else np.nan
+            for metric in self.metrics
+        }
+
+    def add_user(self, df: pd.DataFrame) -> 'PopulationSketch':
+        """Add one user's period averages."""
+        for metric, value in self.user_values(df).items():
+            self.digests[metric].update([value])
+        return self
+
+    def add_users(self, df: pd.DataFrame, user_col: str = 'user_id') -> 'PopulationSketch':
+        """
+        Add the period averages of every user in a long-format frame at once.
+
+        Args:
+            df: Long-format DataFrame with a user id column
+            user_col: Column holding the user id
+        """
+        if df.empty:
+            return self
+        codes, uniques = pd.factorize(df[user_col])
+        dates = df['date'].to_numpy()
+        last = pd.Series(dates).groupby(codes).transform('max').to_numpy()
+        period = dates >= last - np.timedelta64(self.period_days, 'D')
+        for metric in self.metrics:
+            values = df[metric].to_numpy(dtype=np.float64)
+            valid = period & ~np.isnan(values)
+            sums = np.bincount(codes[valid], weights=values[valid], minlength=len(uniques))
+            counts = np.bincount(codes[valid], minlength=len(uniques))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.digests[metric].update(sums / counts)
+        return self
+
+    def merge(self, *others: 'PopulationSketch') -> 'PopulationSketch':
+        """Merge sketches built elsewhere (e.g. by other worker processes)."""
+        for other in others:
+            for metric in self.metrics:
+                self.digests[metric].merge(other.digests[metric])
+        return self
+
+    def percentile(self, metric: str, value: float) -> float:
+        """
+        Percentage of users whose average is below value (ties count half).
+
+        Raises:
+            KeyError: If the metric is not sketched
+        """
+        return float(self.digests[metric].cdf(value)) * 100
+
+    def user_percentiles(self, df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Where one user's period averages fall in the population.
+
+        Args:
+            df: One user's energy tracking data
+
+        Returns:
+            dict: Percentile (0-100) per metric
+        """
+        return {
+            metric: self.percentile(metric, value)
+            for metric, value in self.user_values(df).items()
+        }
+
+    def to_bytes(self) -> bytes:
+        """Serialize all digests to a compact byte string."""
+        parts = [_SKETCH_MAGIC, struct.pack('<iI', self.period_days, len(self.metrics))]
+        for metric in self.metrics:
+            name, digest = metric.encode(), self.digests[metric].to_bytes()
+            parts += [struct.pack('<HI', len(name), len(digest)), name, digest]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PopulationSketch':
+        """
+        Deserialize a sketch written by to_bytes.
+
+        Raises:
+            ValueError: If the data is not a serialized sketch
+        """
+        if data[:4] != _SKETCH_MAGIC:
+            raise ValueError('Not a serialized PopulationSketch')
+        period_days, n_metrics = struct.unpack_from('<iI', data, 4)
+        offset = 12
+        digests = {}
+        for _ in range(n_metrics):
+            name_size, digest_size = struct.unpack_from('<HI', data, offset)
+            offset += 6
+            name = data[offset:offset + name_size].decode()
+            offset += name_size
+            digests[name] = TDigest.from_bytes(data[offset:offset + digest_size])
+            offset += digest_size
+        sketch = cls(list(digests), period_days)
+        sketch.digests = digests
+        return sketch
@@ -0,0 +1,277 @@
+"""
+Energy Tracker Chart Rendering
+Turns the results of the compute_* functions into matplotlib figures on their
+own Agg canvases, outside pyplot and its global backend, and encodes figures
+to PNG/SVG bytes.
+"""
+
+import io
+import matplotlib
+import numpy as np
+import seaborn as sns
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from typing import Dict, Iterator, Tuple
+
+from .constants import COLOR_PALETTE, PRIMARY_COLOR
+from .profiling import phase
+
+# p-value thresholds and their markers, strictest first
+SIGNIFICANCE_LEVELS = ((0.001, '***'), (0.01, '**'), (0.05, '*'))
+
+
+def significance_stars(p: float) -> str:
+    """'***', '**', '*' or '' for a p-value (NaN gives '')."""
+    for level, stars in SIGNIFICANCE_LEVELS:
+        if p < level:
+            return stars
+    return ''
+
+
+def _subplots(figsize: Tuple[float, float]) -> Tuple[Figure, Axes]:
+    """
+    A figure with one axes, attached to an Agg canvas.
+
+    pyplot never tracks the figure, so it needs no closing and is freed with
+    its last reference, and the process-wide backend is left alone.
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def render_energy_correlations(results: Dict) -> Tuple[Figure, Figure]:
+    """
+    Render correlation results as a bar chart and a core metrics heatmap.
+
+    Bars of correlations that are not significant (p >= 0.05) are faded and
+    every label carries its significance stars and sample size.
+
+    Args:
+        results: Output of compute_energy_correlations
+
+    Returns:
+        tuple: (bar_chart_figure, heatmap_figure)
+    """
+    correlations = results['correlations']
+    target_metric = results['target_metric']
+    p_values = results['p_values']
+    counts = results['counts']
+
+    # Create bar chart
+    fig_bar, ax_bar = _subplots(figsize=(10, 6))
+    ax_bar.barh(
+        range(len(correlations)),
+        correlations,
+        color=[
+            to_rgba(PRIMARY_COLOR if x > 0 else '#2a9d8f', 1.0 if p < 0.05 else 0.35)
+            for x, p in zip(correlations, p_values)
+        ]
+    )
+
+    # Customize bar chart
+    ax_bar.set_yticks(range(len(correlations)))
+    ax_bar.set_yticklabels(correlations.index)
+    ax_bar.set_xlabel('Correlation Coefficient')
+    ax_bar.set_title(f'Correlation with {target_metric.replace("_", " ").title()}')
+
+    # Add correlation values
+    for i, (v, p, n) in enumerate(zip(correlations, p_values, counts)):
+        ax_bar.text(
+            v + (0.01 if v >= 0 else -0.01),
+            i,
+            f'{v:.2f}{significance_stars(p)} (n={n})',
+            va='center',
+            ha='left' if v >= 0 else 'right'
+        )
+
+    # Create heatmap for core metrics
+    core_matrix = results['core_matrix']
+    labels = [
+        [f'{r:.2f}{significance_stars(p)}' for r, p in zip(r_row, p_row)]
+        for r_row, p_row in zip(core_matrix.to_numpy(), results['core_p_values'].to_numpy())
+    ]
+    fig_heat, ax_heat = _subplots(figsize=(8, 6))
+    sns.heatmap(
+        core_matrix,
+        annot=np.array(labels),
+        cmap='RdYlBu_r',
+        center=0,
+        ax=ax_heat,
+        fmt=''
+    )
+    ax_heat.set_title('Core Metrics Correlation Matrix (* p<.05, ** p<.01, *** p<.001)')
+
+    return fig_bar, fig_heat
+
+
+def render_history_chart(results: Dict) -> Figure:
+    """
+    Render daily metric averages as a multi-line chart.
+
+    Args:
+        results: Output of compute_history_chart
+
+    Returns:
+        matplotlib.Figure: The generated figure
+    """
+    daily_avg = results['daily']
+
+    fig, ax = _subplots(figsize=(12, 6))
+
+    for metric in results['metrics']:
+        display_name = metric.replace('_numeric', '').replace('_', ' ').title()
+        color = COLOR_PALETTE.get(metric.replace('_numeric', ''), PRIMARY_COLOR)
+
+        ax.plot(
+            daily_avg.index,
+            daily_avg[metric],
+            label=display_name,
+            color=color,
+            linewidth=2
+        )
+
+    # Add markers for significant changes in primary metric
+    if results['peak'] is not None:
+        ax.scatter(*results['peak'], color='gold',
+                   marker='*', s=200, label='Peak', zorder=5)
+        ax.scatter(*results['low'], color='red',
+                   marker='o', s=100, label='Low', zorder=5)
+
+    # Customize the plot
+    ax.set_title('Energy Metrics Over Time')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Score')
+    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    ax.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    return fig
+
+
+def render_time_breakdown(results: Dict) -> Figure:
+    """
+    Render hours per category as a donut chart.
+
+    Args:
+        results: Output of compute_time_breakdown
+
+    Returns:
+        matplotlib.Figure: The generated figure
+    """
+    time_by_category = results['hours_by_category']
+
+    # Create color palette
+    n_categories = len(time_by_category)
+    purples = matplotlib.colormaps['Purples']
+    colors = [PRIMARY_COLOR] + [purples(i/n_categories)
+                               for i in range(1, n_categories)]
+
+    # Create donut chart
+    fig, ax = _subplots(figsize=(10, 10))
+    ax.pie(
+        time_by_category,
+        labels=time_by_category.index,
+        colors=colors,
+        autopct='%1.1f%%',
+        pctdistance=0.85,
+        wedgeprops=dict(width=0.5)
+    )
+
+    # Add center text
+    ax.text(0, 0, f'Total\n{results["total_hours"]:.1f}\nhours',
+            ha='center', va='center', fontsize=12)
+
+    ax.set_title('Time Allocation by Category')
+    return fig
+
+
+def render_metric_trend(results: Dict) -> Figure:
+    """
+    Render a metric's daily values, rolling average and linear trend.
+
+    Args:
+        results: Output of compute_metric_trend
+
+    Returns:
+        matplotlib.Figure: The generated figure
+    """
+    daily_avg = results['daily']
+    rolling_avg = results['rolling']
+
+    fig, ax = _subplots(figsize=(12, 6))
+
+    ax.plot(daily_avg.index, daily_avg, alpha=0.5, color='gray', label='Daily')
+    ax.plot(rolling_avg.index, rolling_avg, color=PRIMARY_COLOR,
+            linewidth=2, label='7-day Average')
+    ax.plot(rolling_avg.index, results['trend'], '--', color='black',
+            label='Trend', alpha=0.8)
+
+    ax.set_title(f'{results["metric"].replace("_", " ").title()} Trend Analysis')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Score')
+    ax.legend()
+
+    return fig
+
+
+class FigureBuffer:
+    """
+    Reusable in-memory buffer for encoding figures to image bytes.
+
+    Keeping one buffer per worker avoids allocating a new BytesIO for every
+    request; each encode call rewinds and truncates it first.
+    """
+
+    def __init__(self):
+        self._buffer = io.BytesIO()
+
+    def _write(self, fig: Figure, fmt: str, **savefig_kwargs) -> None:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        with phase('savefig', default_call='encode'):
+            fig.savefig(self._buffer, format=fmt, **savefig_kwargs)
+
+    def encode(self, fig: Figure, fmt: str = 'png', **savefig_kwargs) -> bytes:
+        """
+        Encode a figure to bytes.
+
+        Args:
+            fig: Figure to encode
+            fmt: Image format understood by savefig ('png' or 'svg')
+            **savefig_kwargs: Extra arguments forwarded to savefig
+
+        Returns:
+            bytes: The encoded image
+        """
+        self._write(fig, fmt, **savefig_kwargs)
+        return self._buffer.getvalue()
+
+    def stream(
+        self,
+        fig: Figure,
+        fmt: str = 'png',
+        chunk_size: int = 64 * 1024,
+        **savefig_kwargs
+    ) -> Iterator[bytes]:
+        """
+        Encode a figure and yield the bytes in chunks.
+
+        Args:
+            fig: Figure to encode
+            fmt: Image format understood by savefig ('png' or 'svg')
+            chunk_size: Maximum size of each yielded chunk
+            **savefig_kwargs: Extra arguments forwarded to savefig
+
+        Yields:
+            bytes: Consecutive chunks of the encoded image
+        """
+        self._write(fig, fmt, **savefig_kwargs)
+        view = self._buffer.getbuffer()
+        try:
+            for start in range(0, len(view), chunk_size):
+                yield bytes(view[start:start + chunk_size])
+        finally:
+            view.release()
@@ -6,8 +6,25 @@ Provides functions to generate realistic test data for the analytics dashboard.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, Optional
 import random
 
+MOODS = ['Calm', 'Content', 'Joyful', 'Sad', 'Annoyed', 'Anxious',
+         'Confused', 'Angry', 'Scared', 'Exhausted']
+TIME_CATEGORIES = ['Work', 'Family', 'Hobby', 'Exercise', 'Social', 'Rest']
+HAPPY_ACTIVITIES = [
+    'morning run in the park',
+    'coffee with friends',
+    'completed a project',
+    'family dinner',
+    'meditation session',
+    'achieved workout goal',
+    'learned something new',
+    'helped a colleague',
+    'enjoyed nature walk',
+    'had a productive day'
+]
+
 def generate_sample_data(
     days: int = 90,
     start_date: datetime = None,
@@ -39,9 +56,8 @@ def generate_sample_data(
         dates.extend([current_date] * entries_today)
     
     # Define possible moods and time categories
-    moods = ['Calm', 'Content', 'Joyful', 'Sad', 'Annoyed', 'Anxious', 
-             'Confused', 'Angry', 'Scared', 'Exhausted']
-    time_categories = ['Work', 'Family', 'Hobby', 'Exercise', 'Social', 'Rest']
+    moods = MOODS
+    time_categories = TIME_CATEGORIES
     
     # Generate base metrics with some correlation
     n_entries = len(dates)
@@ -73,18 +89,7 @@ def generate_sample_data(
     
     # Generate happy moments (70% chance of having one)
     happy_moments = []
-    happy_activities = [
-        'morning run in the park',
-        'coffee with friends',
-        'completed a project',
-        'family dinner',
-        'meditation session',
-        'achieved workout goal',
-        'learned something new',
-        'helped a colleague',
-        'enjoyed nature walk',
-        'had a productive day'
-    ]
+    happy_activities = HAPPY_ACTIVITIES
     
     for _ in range(n_entries):
         if random.random() < 0.7:
@@ -102,11 +107,154 @@ def generate_sample_data(
     
     return df
 
+def _generate_user_arrays(
+    rng: np.random.Generator,
+    days: int,
+    start_date: datetime
+) -> Dict[str, np.ndarray]:
+    """
+    Generate one user's tracking data as column arrays.
+
+    Mirrors the distributions of generate_sample_data with whole-array draws.
+    """
+    days = max(days, 0)
+    entries_per_day = rng.integers(1, 5, size=days)
+    n_entries = int(entries_per_day.sum())
+    day_offsets = np.repeat(np.arange(days, dtype='timedelta64[D]'), entries_per_day)
+
+    base_energy = rng.normal(5, 1, n_entries)
+    cognitive = base_energy * 0.7 + rng.normal(0, 1, n_entries)
+    stress = 5 - (base_energy * 0.5 + rng.normal(0, 0.5, n_entries))
+
+    has_happy = rng.random(n_entries) < 0.7
+    happy_moments = np.full(n_entries, None, dtype=object)
+    happy_moments[has_happy] = np.array(HAPPY_ACTIVITIES, dtype=object)[
+        rng.integers(0, len(HAPPY_ACTIVITIES), size=int(has_happy.sum()))
+    ]
+
+    return {
+        'date': np.datetime64(start_date, 'ns') + day_offsets,
+        'physical_energy': np.clip(base_energy, 1, 7).round(),
+        'cognitive_clarity': np.clip(cognitive, 1, 7).round(),
+        'mood': np.array(MOODS, dtype=object)[rng.integers(0, len(MOODS), size=n_entries)],
+        'stress': np.clip(stress, 1, 4).round(),
+        'caffeine': rng.integers(0, 7, size=n_entries),
+        'hydration': rng.integers(0, 11, size=n_entries),
+        'socializing': rng.integers(0, 2, size=n_entries),
+        'hours_worked': rng.uniform(0.5, 8.0, n_entries).round(1),
+        'time_category': np.array(TIME_CATEGORIES, dtype=object)[
+            rng.integers(0, len(TIME_CATEGORIES), size=n_entries)
+        ],
+        'is_pomodoro': rng.integers(0, 2, size=n_entries),
+        'happy_moment': happy_moments,
+    }
+
+def iter_bulk_sample_data(
+    days: int = 90,
+    start_date: Optional[datetime] = None,
+    seed: int = 42,
+    n_users: int = 1,
+    users_per_chunk: int = 1000
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream sample tracking data for many users in chunks.
+    
+    Every user draws from its own generator seeded with (seed, user index),
+    so a user's data is identical whatever the chunk size or user count.
+    
+    Args:
+        days: Number of days of data per user
+        start_date: Starting date for the data (defaults to days ago from today)
+        seed: Base random seed for reproducibility
+        n_users: Number of users to generate
+        users_per_chunk: Number of users per yielded DataFrame
+        
+    Yields:
+        pd.DataFrame: Long-format tracking data with a user_id column,
+        ordered by user and date
+    """
+    if start_date is None:
+        start_date = datetime.now() - timedelta(days=days)
+    
+    for chunk_start in range(0, n_users, users_per_chunk):
+        user_range = range(chunk_start, min(chunk_start + users_per_chunk, n_users))
+        yield generate_users_sample_data(user_range, days, start_date, seed)
+
+def generate_users_sample_data(
+    users: Iterable[int],
+    days: int = 90,
+    start_date: Optional[datetime] = None,
+    seed: int = 42
+) -> pd.DataFrame:
+    """
+    Generate sample tracking data for specific users.
+    
+    User i gets the same rows ('user-{i}') as in generate_bulk_sample_data,
+    so any subset of users can be regenerated independently.
+    
+    Args:
+        users: User indices to generate
+        days: Number of days of data per user
+        start_date: Starting date for the data (defaults to days ago from today)
+        seed: Base random seed for reproducibility
+        
+    Returns:
+        pd.DataFrame: Long-format tracking data with a user_id column,
+        ordered by user and date
+    """
+    if start_date is None:
+        start_date = datetime.now() - timedelta(days=days)
+    
+    parts = []
+    user_ids = []
+    for user in users:
+        rng = np.random.default_rng([seed, user])
+        arrays = _generate_user_arrays(rng, days, start_date)
+        parts.append(arrays)
+        user_ids.append(np.full(len(arrays['date']), f'user-{user}', dtype=object))
+    if not parts:
+        parts.append(_generate_user_arrays(np.random.default_rng(seed), 0, start_date))
+        user_ids.append(np.empty(0, dtype=object))
+    
+    data = {'user_id': np.concatenate(user_ids)}
+    for column in parts[0]:
+        data[column] = np.concatenate([part[column] for part in parts])
+    return pd.DataFrame(data)
+
+def generate_bulk_sample_data(
+    days: int = 90,
+    start_date: Optional[datetime] = None,
+    seed: int = 42,
+    n_users: int = 1,
+    users_per_chunk: int = 1000
+) -> pd.DataFrame:
+    """
+    Generate sample tracking data for many users with vectorized draws.
+    
+    Produces the same columns and distributions as generate_sample_data plus
+    a user_id column, using numpy.random.Generator instead of per-row
+    random calls.
+    
+    Args:
+        days: Number of days of data per user
+        start_date: Starting date for the data (defaults to days ago from today)
+        seed: Base random seed for reproducibility
+        n_users: Number of users to generate
+        users_per_chunk: Number of users generated per internal chunk
+        
+    Returns:
+        pd.DataFrame: Long-format tracking data for all users
+    """
+    chunks = list(iter_bulk_sample_data(days, start_date, seed, n_users, users_per_chunk))
+    if not chunks:
+        return generate_users_sample_data([], days, start_date, seed)
+    return pd.concat(chunks, ignore_index=True)
+
 def generate_example_usage():
     """
     Generate example usage of the analytics functions using sample data.
     """
-    from energy_analytics import (
+    from .energy_analytics import (
         plot_energy_correlations,
         plot_history_chart,
         plot_time_breakdown,
@@ -145,4 +293,13 @@ def generate_example_usage():
 
 if __name__ == "__main__":
     # Generate example visualizations and metrics
-    generate_example_usage()
+    if __package__:
+        generate_example_usage()
+    else:
+        # Run as a file (python sample_data.py): generate_example_usage imports
+        # relatively, so run the package's example module instead
+        import os
+        import runpy
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        runpy.run_module('analytics', run_name='__main__')
@@ -0,0 +1,164 @@
+"""
+Analytics Frame Schema for Energy Tracker
+Canonical compact dtypes for analytics frames: ordered categoricals for mood,
+time_category and happy_moment, a precomputed mood_numeric code, small-int
+metric columns and a boolean happy-moment flag. Frames are converted once at
+ingest; the analytics functions accept raw and typed frames alike.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, List, Mapping
+
+from .constants import MOOD_SCALE
+
+# Fixed category orders; labels outside these lists are appended in sorted order
+MOOD_CATEGORIES = list(MOOD_SCALE)
+TIME_CATEGORIES = ['Work', 'Family', 'Hobby', 'Exercise', 'Social', 'Rest']
+
+# Metrics stored as int8 when every value is a whole number
+SMALL_INT_COLUMNS = ['physical_energy', 'cognitive_clarity', 'stress', 'caffeine',
+                     'hydration', 'socializing', 'is_pomodoro']
+
+HAPPY_FLAG = 'has_happy_moment'
+
+
+def _categories(values: pd.Series, fixed: Iterable[str]) -> List[str]:
+    """Fixed categories followed by any other observed labels, sorted."""
+    fixed = list(fixed)
+    known = set(fixed)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        observed = values.cat.categories
+    else:
+        observed = values.dropna().unique()
+    return fixed + sorted(str(v) for v in observed if v not in known)
+
+
+def _as_category(values: pd.Series, fixed: Iterable[str] = ()) -> pd.Series:
+    """Convert a label column to a categorical with the given leading order."""
+    return values.astype(pd.CategoricalDtype(_categories(values, fixed)))
+
+
+def _as_small_int(values: pd.Series) -> pd.Series:
+    """Downcast a whole-numbered metric column to int8; other columns pass through."""
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return values
+    array = values.to_numpy()
+    if array.dtype == np.int8:
+        return values
+    if np.isnan(array.astype(np.float64)).any():
+        return values
+    if len(array) and (array.min() < -128 or array.max() > 127 or not np.all(array == np.round(array))):
+        return values
+    return values.astype(np.int8)
+
+
+def mood_codes(mood: pd.Series) -> np.ndarray:
+    """
+    Numeric mood scale values for a mood label column.
+
+    Args:
+        mood: Mood labels, as strings or categorical
+
+    Returns:
+        np.ndarray: float64 MOOD_SCALE values (NaN for missing or unknown moods)
+    """
+    if isinstance(mood.dtype, pd.CategoricalDtype):
+        # One lookup per category instead of one per row
+        lookup = np.array(
+            [MOOD_SCALE.get(c, np.nan) for c in mood.cat.categories] + [np.nan],
+            dtype=np.float64
+        )
+        return lookup[mood.cat.codes.to_numpy()]
+    return mood.map(MOOD_SCALE).to_numpy(dtype=np.float64)
+
+
+def mood_values(df: pd.DataFrame) -> np.ndarray:
+    """
+    The mood_numeric column of a frame, derived from mood if absent.
+
+    Args:
+        df: Analytics frame, raw or typed
+
+    Returns:
+        np.ndarray: float64 mood scale values
+    """
+    if 'mood_numeric' in df.columns:
+        return df['mood_numeric'].to_numpy(dtype=np.float64)
+    return mood_codes(df['mood'])
+
+
+def row_values(row: Mapping, metrics: Iterable[str]) -> np.ndarray:
+    """
+    Metric values of a single check-in mapping.
+
+    Args:
+        row: Mapping of metric name to value; ``mood_numeric`` falls back to
+            mapping ``mood`` through MOOD_SCALE
+        metrics: Metrics to extract
+
+    Returns:
+        np.ndarray: float64 values (NaN for missing metrics)
+    """
+    values = []
+    for metric in metrics:
+        value = row.get(metric)
+        if value is None and metric == 'mood_numeric':
+            value = MOOD_SCALE.get(row.get('mood'))
+        values.append(np.nan if value is None else float(value))
+    return np.array(values)
+
+
+def happy_flags(df: pd.DataFrame) -> np.ndarray:
+    """
+    Whether each row has a happy moment.
+
+    Args:
+        df: Analytics frame, raw or typed
+
+    Returns:
+        np.ndarray: Boolean array, one value per row
+    """
+    if HAPPY_FLAG in df.columns:
+        return df[HAPPY_FLAG].to_numpy(dtype=bool)
+    return df['happy_moment'].notna().to_numpy()
+
+
+def to_analytics_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a frame to the canonical analytics schema.
+
+    Labels become categoricals (mood in MOOD_SCALE order, time_category in
+    TIME_CATEGORIES order, happy_moment in sorted order, user_id as is), a
+    mood_numeric column is added from mood, whole-numbered metrics become
+    int8 and has_happy_moment flags rows with a happy moment. Missing columns
+    are skipped and converting a typed frame again is a no-op.
+
+    Args:
+        df: Analytics frame with string labels, e.g. from generate_sample_data
+
+    Returns:
+        pd.DataFrame: New frame with compact dtypes; the input is not modified
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col == 'mood':
+            values = _as_category(values, MOOD_CATEGORIES)
+        elif col == 'time_category':
+            values = _as_category(values, TIME_CATEGORIES)
+        elif col in ('happy_moment', 'user_id') and not pd.api.types.is_numeric_dtype(values):
+            values = _as_category(values)
+        elif col in SMALL_INT_COLUMNS:
+            values = _as_small_int(values)
+        columns[col] = values
+
+    if 'mood' in columns and 'mood_numeric' not in columns:
+        codes = mood_codes(columns['mood'])
+        columns['mood_numeric'] = pd.Series(codes, index=df.index)
+        if not np.isnan(codes).any():
+            columns['mood_numeric'] = columns['mood_numeric'].astype(np.int8)
+    if 'happy_moment' in columns and HAPPY_FLAG not in columns:
+        columns[HAPPY_FLAG] = columns['happy_moment'].notna()
+
+    return pd.DataFrame(columns, index=df.index)
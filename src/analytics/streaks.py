@@ -0,0 +1,120 @@
+"""
+Energy Tracker Streak Engine
+Run-length based streak and milestone computations that work on whole arrays
+for one or many users at once.
+"""
+
+import numpy as np
+from typing import Dict, Optional
+
+
+def _group_starts(sorted_codes: np.ndarray) -> np.ndarray:
+    """Index of the first element of each group in a sorted code array."""
+    return np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+
+
+def longest_true_runs(
+    flags: np.ndarray,
+    codes: Optional[np.ndarray] = None,
+    n_groups: int = 1
+) -> np.ndarray:
+    """
+    Length of the longest run of consecutive True values per group.
+
+    Rows keep their order within a group, so the flags should already be in
+    chronological order.
+
+    Args:
+        flags: Boolean array, one value per row
+        codes: Group code per row (default: a single group)
+        n_groups: Number of groups
+
+    Returns:
+        np.ndarray: Longest run length for each group (0 if no True value)
+    """
+    flags = np.asarray(flags, dtype=bool)
+    if codes is None:
+        codes = np.zeros(len(flags), dtype=np.intp)
+    longest = np.zeros(n_groups, dtype=np.int64)
+    if len(flags) == 0:
+        return longest
+
+    order = np.argsort(codes, kind='stable')
+    f, c = flags[order], codes[order]
+
+    # A new run starts whenever the group or the flag value changes
+    new_run = np.r_[True, (c[1:] != c[:-1]) | (f[1:] != f[:-1])]
+    run_lengths = np.diff(np.r_[np.flatnonzero(new_run), len(f)])
+    run_lengths = np.where(f[new_run], run_lengths, 0)
+    run_codes = c[new_run]
+
+    starts = _group_starts(run_codes)
+    longest[run_codes[starts]] = np.maximum.reduceat(run_lengths, starts)
+    return longest
+
+
+def day_streaks(
+    days: np.ndarray,
+    codes: Optional[np.ndarray] = None,
+    n_groups: int = 1
+) -> Dict[str, np.ndarray]:
+    """
+    Streaks of consecutive tracked calendar days per group.
+
+    Args:
+        days: datetime64 array of entry dates (any resolution, any order,
+            duplicates allowed)
+        codes: Group code per entry (default: a single group)
+        n_groups: Number of groups
+
+    Returns:
+        dict: Arrays with one value per group:
+            current_streak - length of the streak ending on the group's last
+                tracked day
+            longest_streak - length of the longest streak
+            longest_streak_start / longest_streak_end - datetime64[D] bounds
+                of the longest streak (the most recent one on ties, NaT if
+                the group has no entries)
+    """
+    days = np.asarray(days).astype('datetime64[D]')
+    if codes is None:
+        codes = np.zeros(len(days), dtype=np.intp)
+    result = {
+        'current_streak': np.zeros(n_groups, dtype=np.int64),
+        'longest_streak': np.zeros(n_groups, dtype=np.int64),
+        'longest_streak_start': np.full(n_groups, np.datetime64('NaT'), dtype='datetime64[D]'),
+        'longest_streak_end': np.full(n_groups, np.datetime64('NaT'), dtype='datetime64[D]'),
+    }
+    valid = ~np.isnat(days)
+    days, codes = days[valid], codes[valid]
+    if len(days) == 0:
+        return result
+
+    # Unique (group, day) pairs in sorted order
+    day_numbers = days.astype(np.int64)
+    order = np.lexsort((day_numbers, codes))
+    c, d = codes[order], day_numbers[order]
+    keep = np.r_[True, (c[1:] != c[:-1]) | (d[1:] != d[:-1])]
+    c, d = c[keep], d[keep]
+
+    # A new streak starts whenever the group changes or a day is skipped
+    new_run = np.r_[True, (c[1:] != c[:-1]) | (np.diff(d) != 1)]
+    run_starts = np.flatnonzero(new_run)
+    run_ends = np.r_[run_starts[1:], len(d)] - 1
+    run_lengths = run_ends - run_starts + 1
+    run_codes = c[run_starts]
+
+    group_starts = _group_starts(run_codes)
+    group_ends = np.r_[group_starts[1:], len(run_codes)] - 1
+    groups = run_codes[group_starts]
+
+    # Longest run per group, preferring the most recent one on ties
+    n_runs = len(run_lengths)
+    ranked = run_lengths * n_runs + np.arange(n_runs)
+    best = np.maximum.reduceat(ranked, group_starts) % n_runs
+
+    result['current_streak'][groups] = run_lengths[group_ends]
+    result['longest_streak'][groups] = run_lengths[best]
+    result['longest_streak_start'][groups] = d[run_starts[best]].astype('datetime64[D]')
+    result['longest_streak_end'][groups] = d[run_ends[best]].astype('datetime64[D]')
+    return result
@@ -0,0 +1,244 @@
+"""
+Streaming Statistics for Energy Tracker Analytics
+Keeps per-user running counts, means and co-moments of the core metrics so
+dashboard correlations can be updated per check-in instead of recomputed.
+"""
+
+import struct
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Mapping, Optional
+
+from .correlation import group_codes, grouped_moments
+from .constants import CORE_METRICS
+from .schema import mood_values, row_values
+
+_MAGIC = b'ETCA'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBHH')
+
+
+class CorrelationAccumulator:
+    """
+    Running pairwise-complete statistics for one user's core metrics.
+
+    For every metric pair (i, j) the accumulator tracks the number of rows
+    where both values are present, the mean of x_i over those rows, the sum of
+    squared deviations of x_i and the co-moment of x_i and x_j. Updates use
+    Welford's algorithm, so each new check-in costs O(k^2) regardless of how
+    long the user's history is.
+    """
+
+    def __init__(self, metrics: Optional[Iterable[str]] = None):
+        """
+        Args:
+            metrics: Metrics to track (default: CORE_METRICS)
+        """
+        self.metrics = list(CORE_METRICS if metrics is None else metrics)
+        k = len(self.metrics)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+
+    def update(self, row: Mapping) -> 'CorrelationAccumulator':
+        """
+        Add a single check-in.
+
+        Args:
+            row: Mapping of metric name to value; ``mood_numeric`` falls back
+                to mapping ``mood`` through MOOD_SCALE
+
+        Returns:
+            CorrelationAccumulator: self, for chaining
+        """
+        x = row_values(row, self.metrics)
+        present = ~np.isnan(x)
+        pair = present[:, None] & present[None, :]
+        if not pair.any():
+            return self
+
+        x = np.where(present, x, 0.0)
+        self.n += pair
+        delta = np.where(pair, x[:, None] - self.mean, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean += np.where(pair, delta / self.n, 0.0)
+        delta_after = np.where(pair, x[:, None] - self.mean, 0.0)
+        self.m2 += delta * delta_after
+        self.comoment += delta * delta_after.T
+        return self
+
+    def update_frame(self, df: pd.DataFrame) -> 'CorrelationAccumulator':
+        """
+        Add a batch of check-ins in one vectorized step.
+
+        Args:
+            df: DataFrame with energy tracking data for this user
+
+        Returns:
+            CorrelationAccumulator: self, for chaining
+        """
+        values = _frame_values(df, self.metrics)
+        moments = grouped_moments(values, np.zeros(len(values), dtype=np.intp), 1)
+        return self.merge(_from_moments(self.metrics, moments, 0))
+
+    def merge(self, other: 'CorrelationAccumulator') -> 'CorrelationAccumulator':
+        """
+        Combine another accumulator over the same metrics into this one.
+
+        Args:
+            other: Accumulator built from a disjoint set of check-ins
+
+        Returns:
+            CorrelationAccumulator: self, for chaining
+        """
+        if other.metrics != self.metrics:
+            raise ValueError('Cannot merge accumulators over different metrics')
+
+        n = self.n + other.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = np.where(n > 0, other.n / n, 0.0)
+            weight = np.where(n > 0, self.n * other.n / n, 0.0)
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * fraction
+        self.m2 = self.m2 + other.m2 + delta ** 2 * weight
+        self.comoment = self.comoment + other.comoment + delta * delta.T * weight
+        self.n = n
+        return self
+
+    @property
+    def count(self) -> pd.Series:
+        """Number of check-ins with a value for each metric."""
+        return pd.Series(np.diag(self.n), index=self.metrics)
+
+    @property
+    def means(self) -> pd.Series:
+        """Mean of each metric over the check-ins where it is present."""
+        return pd.Series(np.where(np.diag(self.n) > 0, np.diag(self.mean), np.nan),
+                         index=self.metrics)
+
+    @property
+    def variances(self) -> pd.Series:
+        """Sample variance of each metric."""
+        n = np.diag(self.n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variances = np.diag(self.m2) / (n - 1)
+        return pd.Series(np.where(n > 1, variances, np.nan), index=self.metrics)
+
+    def correlations(self) -> pd.DataFrame:
+        """
+        Pairwise-complete Pearson correlation matrix of the tracked metrics.
+
+        Returns:
+            pd.DataFrame: Correlations, NaN where fewer than two rows overlap
+            or a metric is constant
+        """
+        denom = self.m2 * self.m2.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(denom)
+        corr[(self.n < 2) | ~(denom > 0)] = np.nan
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.metrics, columns=self.metrics)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summary statistics for each tracked metric.
+
+        Returns:
+            dict: {metric: {'count', 'mean', 'std'}}
+        """
+        stds = np.sqrt(self.variances)
+        return {
+            metric: {
+                'count': int(self.count[metric]),
+                'mean': float(self.means[metric]),
+                'std': float(stds[metric]),
+            }
+            for metric in self.metrics
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the accumulator to a compact binary blob.
+
+        Returns:
+            bytes: Header, metric names and the four state matrices
+        """
+        names = '\n'.join(self.metrics).encode('utf-8')
+        header = _HEADER.pack(_MAGIC, _VERSION, len(self.metrics), len(names))
+        state = np.stack([self.n, self.mean, self.m2, self.comoment]).astype('<f8')
+        return header + names + state.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'CorrelationAccumulator':
+        """
+        Restore an accumulator serialized with to_bytes.
+
+        Args:
+            data: Bytes produced by to_bytes
+
+        Returns:
+            CorrelationAccumulator: The restored accumulator
+        """
+        magic, version, k, name_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('Unrecognized accumulator payload')
+
+        offset = _HEADER.size
+        names = data[offset:offset + name_len].decode('utf-8')
+        acc = cls(names.split('\n') if k else [])
+        state = np.frombuffer(data, dtype='<f8', count=4 * k * k, offset=offset + name_len)
+        acc.n, acc.mean, acc.m2, acc.comoment = state.reshape(4, k, k).copy()
+        return acc
+
+
+def _frame_values(df: pd.DataFrame, metrics: Iterable[str]) -> np.ndarray:
+    """Stack the requested metrics of a frame into a float matrix."""
+    columns = []
+    for metric in metrics:
+        if metric == 'mood_numeric':
+            columns.append(mood_values(df))
+        else:
+            columns.append(df[metric].to_numpy(dtype=np.float64))
+    return np.column_stack(columns) if columns else np.empty((len(df), 0))
+
+
+def _from_moments(
+    metrics: Iterable[str],
+    moments: Dict[str, np.ndarray],
+    group: int
+) -> CorrelationAccumulator:
+    """Build an accumulator from one group of grouped_moments output."""
+    acc = CorrelationAccumulator(metrics)
+    n, sx = moments['n'][group], moments['sx'][group]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centered = np.where(n > 0, sx / n, 0.0)
+    acc.n = n.copy()
+    acc.mean = np.where(n > 0, moments['shift'][group][:, None] + centered, 0.0)
+    acc.m2 = moments['sxx'][group] - sx * centered
+    acc.comoment = moments['sxy'][group] - sx * centered.T
+    return acc
+
+
+def accumulators_from_frame(
+    df: pd.DataFrame,
+    user_col: str = 'user_id',
+    metrics: Optional[Iterable[str]] = None
+) -> Dict[object, CorrelationAccumulator]:
+    """
+    Seed one accumulator per user from a long-format history frame.
+
+    Args:
+        df: Long-format DataFrame with energy tracking data for many users
+        user_col: Column holding the user id
+        metrics: Metrics to track (default: CORE_METRICS)
+
+    Returns:
+        dict: {user_id: CorrelationAccumulator}
+    """
+    metrics = list(CORE_METRICS if metrics is None else metrics)
+    codes, user_ids = group_codes(df, user_col)
+    moments = grouped_moments(_frame_values(df, metrics), codes, len(user_ids))
+    return {
+        user_id: _from_moments(metrics, moments, i)
+        for i, user_id in enumerate(user_ids)
+    }
@@ -0,0 +1,367 @@
+"""
+Incremental Summary Metrics for Energy Tracker Analytics
+A per-user summary that is updated from a stream of check-in, HappyMoment and
+PomodoroSession events instead of rescanning the history, and returns the
+same dict as energy_analytics.calculate_summary_metrics. Only the rows of the
+trailing period are kept, with running counters, so an event costs O(1)
+amortized; the state can be snapshotted to disk and restored.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from collections import Counter, deque
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+
+from .energy_analytics import (
+    HAPPY_MILESTONE,
+    HIGH_ENERGY_LEVEL,
+    HYDRATION_GOAL,
+    HYDRATION_STREAK_ENTRIES
+)
+from .schema import HAPPY_FLAG
+
+_VERSION = 1
+
+# Window row fields
+_DATE, _HAPPY, _POMODORO, _HIGH_ENERGY, _MOOD, _HYDRATED, _SEQ = range(7)
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT
+
+
+def _row_happy(row: Mapping) -> bool:
+    """Happy-moment flag of a check-in mapping (see schema.happy_flags)."""
+    if HAPPY_FLAG in row:
+        return bool(row[HAPPY_FLAG])
+    return not _is_missing(row.get('happy_moment'))
+
+
+def _at_least(value: Any, threshold: float) -> bool:
+    return not _is_missing(value) and value >= threshold
+
+
+class IncrementalSummary:
+    """
+    Event-driven summary metrics for one user.
+
+    Check-ins must arrive in date order (same-time check-ins keep arrival
+    order, like rows of a frame). HappyMoment and PomodoroSession events flag
+    the latest check-in, the row their happy_moment / is_pomodoro values
+    belong to in the analytics frame.
+    """
+
+    def __init__(self, period_days: int = 30):
+        """
+        Args:
+            period_days: Number of trailing days the period metrics cover
+        """
+        self.period_days = period_days
+        self.max_date: Optional[pd.Timestamp] = None
+
+        # Whole-history state
+        self.total_happy = 0
+        self.happy_milestone_date: Optional[pd.Timestamp] = None
+        self._last_day: Optional[int] = None
+        self._current_streak = 0
+        self._current_start: Optional[int] = None
+        self._longest_streak = 0
+        self._longest_start: Optional[int] = None
+        self._longest_end: Optional[int] = None
+
+        self._reset_window()
+
+    def _reset_window(self) -> None:
+        """Empty the trailing-period state."""
+        self._rows = deque()
+        self._seq = 0
+        self._happy = 0
+        self._pomodoro = 0
+        self._high_energy = 0
+        self._moods = Counter()
+        self._last_pomodoro: Optional[pd.Timestamp] = None
+        # Hydration runs: completed runs as [start_seq, end_seq), a
+        # sliding-maximum deque of them by length, and the open run's start
+        self._runs = deque()
+        self._run_max = deque()
+        self._run_start: Optional[int] = None
+
+    # Window maintenance
+
+    def _push(self, date: pd.Timestamp, happy: bool, pomodoro: bool, high_energy: bool,
+              mood: Any, hydrated: bool) -> None:
+        """Append a row to the trailing period."""
+        seq = self._seq
+        self._seq += 1
+        happy, pomodoro, high_energy, hydrated = map(bool, (happy, pomodoro, high_energy, hydrated))
+        self._rows.append([date, happy, pomodoro, high_energy, mood, hydrated, seq])
+        self._happy += happy
+        self._pomodoro += pomodoro
+        self._high_energy += high_energy
+        if not _is_missing(mood):
+            self._moods[mood] += 1
+        if pomodoro:
+            self._last_pomodoro = date
+
+        if hydrated:
+            if self._run_start is None:
+                self._run_start = seq
+        elif self._run_start is not None:
+            run = (self._run_start, seq)
+            self._runs.append(run)
+            while self._run_max and self._run_max[-1][1] - self._run_max[-1][0] <= seq - run[0]:
+                self._run_max.pop()
+            self._run_max.append(run)
+            self._run_start = None
+
+    def _evict(self) -> None:
+        """Drop rows that fell out of the trailing period."""
+        start = self.max_date - timedelta(days=self.period_days)
+        while self._rows and self._rows[0][_DATE] < start:
+            row = self._rows.popleft()
+            self._happy -= row[_HAPPY]
+            self._pomodoro -= row[_POMODORO]
+            self._high_energy -= row[_HIGH_ENERGY]
+            if not _is_missing(row[_MOOD]):
+                self._moods[row[_MOOD]] -= 1
+                if not self._moods[row[_MOOD]]:
+                    del self._moods[row[_MOOD]]
+
+        first = self._rows[0][_SEQ] if self._rows else self._seq
+        while self._runs and self._runs[0][1] <= first:
+            self._runs.popleft()
+        while self._run_max and self._run_max[0][0] < first:
+            self._run_max.popleft()
+
+    def _longest_hydration_run(self) -> int:
+        """Longest run of consecutive period rows at or above the hydration goal."""
+        first = self._rows[0][_SEQ] if self._rows else self._seq
+        longest = 0
+        if self._runs and self._runs[0][0] < first:
+            longest = self._runs[0][1] - first
+        if self._run_max:
+            longest = max(longest, self._run_max[0][1] - self._run_max[0][0])
+        if self._run_start is not None:
+            longest = max(longest, self._seq - max(self._run_start, first))
+        return longest
+
+    # Events
+
+    def add_check_in(self, row: Mapping) -> 'IncrementalSummary':
+        """
+        Add a check-in.
+
+        Args:
+            row: Mapping with date, physical_energy, mood, hydration and
+                optionally is_pomodoro and happy_moment (or has_happy_moment)
+
+        Returns:
+            IncrementalSummary: self, for chaining
+
+        Raises:
+            ValueError: If the check-in is older than the latest one
+        """
+        date = pd.Timestamp(row['date'])
+        if self.max_date is not None and date < self.max_date:
+            raise ValueError(f'Check-in at {date} is older than the latest ({self.max_date})')
+        self.max_date = date
+
+        # Tracking streaks over calendar days
+        day = int(date.to_datetime64().astype('datetime64[D]').astype(np.int64))
+        if day != self._last_day:
+            if self._last_day is not None and day == self._last_day + 1:
+                self._current_streak += 1
+            else:
+                self._current_streak, self._current_start = 1, day
+            self._last_day = day
+            if self._current_streak >= self._longest_streak:
+                self._longest_streak = self._current_streak
+                self._longest_start, self._longest_end = self._current_start, day
+
+        happy = _row_happy(row)
+        self._push(
+            date, happy, row.get('is_pomodoro') == 1,
+            _at_least(row.get('physical_energy'), HIGH_ENERGY_LEVEL), row.get('mood'),
+            _at_least(row.get('hydration'), HYDRATION_GOAL)
+        )
+        if happy:
+            self._count_happy(date)
+        self._evict()
+        return self
+
+    def _count_happy(self, date: pd.Timestamp) -> None:
+        self.total_happy += 1
+        if self.total_happy == HAPPY_MILESTONE:
+            self.happy_milestone_date = date
+
+    def _latest(self) -> list:
+        if not self._rows:
+            raise ValueError('No check-in to attach the event to')
+        return self._rows[-1]
+
+    def add_happy_moment(self) -> 'IncrementalSummary':
+        """Record a HappyMoment on the latest check-in."""
+        row = self._latest()
+        if not row[_HAPPY]:
+            row[_HAPPY] = True
+            self._happy += 1
+            self._count_happy(row[_DATE])
+        return self
+
+    def add_pomodoro_session(self) -> 'IncrementalSummary':
+        """Record a PomodoroSession on the latest check-in."""
+        row = self._latest()
+        if not row[_POMODORO]:
+            row[_POMODORO] = True
+            self._pomodoro += 1
+            self._last_pomodoro = row[_DATE]
+        return self
+
+    def update(self, events: Iterable[Mapping]) -> 'IncrementalSummary':
+        """
+        Apply a stream of events.
+
+        Args:
+            events: Mappings with a 'type' of 'check_in' (the other keys are
+                the check-in, see add_check_in), 'happy_moment' or
+                'pomodoro_session'
+
+        Raises:
+            ValueError: For an unknown event type
+        """
+        for event in events:
+            kind = event['type']
+            if kind == 'check_in':
+                self.add_check_in(event)
+            elif kind == 'happy_moment':
+                self.add_happy_moment()
+            elif kind == 'pomodoro_session':
+                self.add_pomodoro_session()
+            else:
+                raise ValueError(f'Unknown event type: {kind}')
+        return self
+
+    def update_frame(self, df: pd.DataFrame) -> 'IncrementalSummary':
+        """Add every row of a date-ordered analytics frame as a check-in."""
+        columns = [col for col in ('date', 'physical_energy', 'mood', 'hydration',
+                                   'is_pomodoro', 'happy_moment', HAPPY_FLAG)
+                   if col in df.columns]
+        values = [df[col].to_numpy(dtype=object) for col in columns]
+        for row in zip(*values):
+            self.add_check_in(dict(zip(columns, row)))
+        return self
+
+    # Results
+
+    def metrics(self) -> Dict[str, Union[int, float, str, pd.Timestamp]]:
+        """
+        Current summary metrics.
+
+        Returns:
+            dict: The dict calculate_summary_metrics returns for the same
+            check-ins and period
+
+        Raises:
+            ValueError: If no check-in was added
+        """
+        if not self._rows:
+            raise ValueError('No check-ins')
+        start = self.max_date - timedelta(days=self.period_days)
+        best_pomodoro = self._last_pomodoro
+        if best_pomodoro is None or best_pomodoro < start:
+            best_pomodoro = pd.NaT
+
+        def day(value):
+            return pd.Timestamp(np.datetime64(value, 'D'))
+
+        top = max(self._moods.values(), default=0)
+        longest_hydration = self._longest_hydration_run()
+        metrics = {
+            'happy_moments_count': np.int64(self._happy),
+            'pomodoro_usage_pct': np.int64(self._pomodoro) / len(self._rows) * 100,
+            'best_pomodoro_day': best_pomodoro,
+            'consecutive_tracking_days': self._longest_streak,
+            'current_streak': self._current_streak,
+            'longest_streak_start': day(self._longest_start),
+            'longest_streak_end': day(self._longest_end),
+            'high_energy_days': self._high_energy,
+            'most_used_mood': min(mood for mood, n in self._moods.items() if n == top),
+            'longest_hydration_run': longest_hydration,
+            'milestone_hydration': longest_hydration >= HYDRATION_STREAK_ENTRIES,
+            'milestone_happy': np.int64(self.total_happy) >= HAPPY_MILESTONE,
+        }
+        if metrics['milestone_happy']:
+            metrics['time_since_happy_milestone'] = (
+                self.max_date - self.happy_milestone_date
+            ).days
+        return metrics
+
+    # Snapshots
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        JSON-serializable snapshot.
+
+        Holds the whole-history counters and the rows of the trailing period;
+        the window counters are rebuilt from those rows on restore.
+        """
+        def stamp(value):
+            return None if value is None else value.isoformat()
+
+        return {
+            'version': _VERSION,
+            'period_days': self.period_days,
+            'max_date': stamp(self.max_date),
+            'total_happy': self.total_happy,
+            'happy_milestone_date': stamp(self.happy_milestone_date),
+            'streak': [self._last_day, self._current_streak, self._current_start,
+                       self._longest_streak, self._longest_start, self._longest_end],
+            'last_pomodoro': stamp(self._last_pomodoro),
+            'rows': [
+                [row[_DATE].isoformat(), bool(row[_HAPPY]), bool(row[_POMODORO]),
+                 bool(row[_HIGH_ENERGY]), None if _is_missing(row[_MOOD]) else str(row[_MOOD]),
+                 bool(row[_HYDRATED])]
+                for row in self._rows
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'IncrementalSummary':
+        """
+        Restore a snapshot written by to_state.
+
+        Raises:
+            ValueError: If the snapshot version is not supported
+        """
+        if state.get('version') != _VERSION:
+            raise ValueError(f"Unsupported summary snapshot version: {state.get('version')}")
+
+        def stamp(value):
+            return None if value is None else pd.Timestamp(value)
+
+        summary = cls(state['period_days'])
+        summary.max_date = stamp(state['max_date'])
+        summary.total_happy = state['total_happy']
+        summary.happy_milestone_date = stamp(state['happy_milestone_date'])
+        (summary._last_day, summary._current_streak, summary._current_start,
+         summary._longest_streak, summary._longest_start, summary._longest_end) = state['streak']
+        for date, happy, pomodoro, high_energy, mood, hydrated in state['rows']:
+            summary._push(pd.Timestamp(date), happy, pomodoro, high_energy, mood, hydrated)
+        summary._last_pomodoro = stamp(state['last_pomodoro'])
+        return summary
+
+    def save(self, path: str) -> None:
+        """Write a snapshot to disk, replacing the file atomically."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_state(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalSummary':
+        """Restore a snapshot written by save."""
+        with open(path) as f:
+            return cls.from_state(json.load(f))
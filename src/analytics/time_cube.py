@@ -0,0 +1,256 @@
+"""
+Time Breakdown Cube for Energy Tracker Analytics
+Hours and entry counts per user, day and time category held as dense arrays
+with prefix sums over days, so the breakdown of any date range is a
+difference of two prefix rows (O(categories), whatever the history length).
+New time entries are appended incrementally: only the touched users' prefix
+sums from the earliest new day onwards are recomputed.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Hashable, List, Optional, Tuple, Union
+
+from .schema import TIME_CATEGORIES
+
+DateLike = Union[str, datetime, pd.Timestamp]
+
+
+def _category_order(labels: List[str]) -> List[str]:
+    """Known time categories in their fixed order, then other labels sorted."""
+    known = [label for label in TIME_CATEGORIES if label in labels]
+    return known + sorted(label for label in labels if label not in TIME_CATEGORIES)
+
+
+def _grow(array: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    """Zero-padded copy of array with at least the given shape."""
+    grown = np.zeros(shape, dtype=array.dtype)
+    grown[tuple(slice(0, n) for n in array.shape)] = array
+    return grown
+
+
+class TimeBreakdownCube:
+    """
+    User x day x category hours cube with prefix sums over days.
+
+    Days are calendar days numbered from the first tracked day. The day axis
+    keeps spare capacity so daily appends do not reallocate the cube.
+    """
+
+    def __init__(self):
+        self.user_ids: List[Hashable] = []
+        self.categories: List[str] = []
+        self.first_day: Optional[int] = None
+        self.n_days = 0
+        self._users = {}
+        self.hours = np.zeros((0, 0, 0))
+        self.counts = np.zeros((0, 0, 0), dtype=np.int64)
+        self._hours_prefix = np.zeros((0, 1, 0))
+        self._counts_prefix = np.zeros((0, 1, 0), dtype=np.int64)
+        # Category order of the first frame appended, as groupby reports it:
+        # its categorical order, or [] for plain labels (sorted)
+        self._label_order: Optional[List[str]] = None
+
+    @classmethod
+    def from_entries(
+        cls,
+        df: pd.DataFrame,
+        user_col: Optional[str] = 'user_id',
+        user_id: Optional[Hashable] = None
+    ) -> 'TimeBreakdownCube':
+        """Build a cube from time entries (see append)."""
+        return cls().append(df, user_col, user_id)
+
+    def _reserve(self, n_users: int, n_days: int, categories: List[str]) -> None:
+        """Make room for more users, days and categories, keeping contents."""
+        order = _category_order(categories)
+        if order != self.categories:
+            position = [order.index(label) for label in self.categories]
+            arrays = []
+            for array in (self.hours, self.counts, self._hours_prefix, self._counts_prefix):
+                moved = np.zeros(array.shape[:2] + (len(order),), dtype=array.dtype)
+                moved[:, :, position] = array
+                arrays.append(moved)
+            self.hours, self.counts, self._hours_prefix, self._counts_prefix = arrays
+            self.categories = order
+
+        users_cap, days_cap = self.hours.shape[:2]
+        if n_users > users_cap or n_days > days_cap:
+            users_cap = max(n_users, 2 * users_cap) if n_users > users_cap else users_cap
+            days_cap = max(n_days, 2 * days_cap) if n_days > days_cap else days_cap
+            n_categories = len(self.categories)
+            self.hours = _grow(self.hours, (users_cap, days_cap, n_categories))
+            self.counts = _grow(self.counts, (users_cap, days_cap, n_categories))
+            self._hours_prefix = _grow(self._hours_prefix, (users_cap, days_cap + 1, n_categories))
+            self._counts_prefix = _grow(self._counts_prefix, (users_cap, days_cap + 1, n_categories))
+
+    def _shift_days(self, days: int) -> None:
+        """Insert days before the first day (entries older than the cube)."""
+        self.hours = np.concatenate(
+            [np.zeros((self.hours.shape[0], days, self.hours.shape[2])), self.hours], axis=1)
+        self.counts = np.concatenate(
+            [np.zeros((self.counts.shape[0], days, self.counts.shape[2]), dtype=np.int64),
+             self.counts], axis=1)
+        self._hours_prefix = np.zeros((self.hours.shape[0], self.hours.shape[1] + 1,
+                                       self.hours.shape[2]))
+        self._counts_prefix = np.zeros(self._hours_prefix.shape, dtype=np.int64)
+        self.first_day -= days
+        self.n_days += days
+        self._rebuild_prefix(np.arange(self.hours.shape[0]), 0)
+
+    def _rebuild_prefix(self, users: np.ndarray, start: int) -> None:
+        """Recompute prefix sums of the given users from day start onwards."""
+        end = self.n_days
+        rows = users[:, None]
+        self._hours_prefix[rows, np.arange(start + 1, end + 1)] = (
+            self._hours_prefix[users, start][:, None]
+            + np.cumsum(self.hours[rows, np.arange(start, end)], axis=1)
+        )
+        self._counts_prefix[rows, np.arange(start + 1, end + 1)] = (
+            self._counts_prefix[users, start][:, None]
+            + np.cumsum(self.counts[rows, np.arange(start, end)], axis=1)
+        )
+
+    def append(
+        self,
+        df: pd.DataFrame,
+        user_col: Optional[str] = 'user_id',
+        user_id: Optional[Hashable] = None
+    ) -> 'TimeBreakdownCube':
+        """
+        Add time entries.
+
+        Args:
+            df: Time entries with date, time_category and hours_worked
+                columns (e.g. load_user_frames()['time_entries']); either
+                long-format with a user column or one user's rows
+            user_col: Column holding the user id (None or ignored when
+                user_id is set: all rows belong to user_id)
+            user_id: Id of the user the rows belong to
+
+        Returns:
+            TimeBreakdownCube: self, for chaining
+        """
+        if self._label_order is None:
+            dtype = df['time_category'].dtype
+            self._label_order = [str(c) for c in dtype.categories] \
+                if isinstance(dtype, pd.CategoricalDtype) else []
+
+        valid = (df['time_category'].notna() & df['hours_worked'].notna()).to_numpy()
+        if not valid.any():
+            return self
+
+        days = df['date'].to_numpy()[valid].astype('datetime64[D]').astype(np.int64)
+        labels = df['time_category'].to_numpy()[valid].astype(str)
+        hours = df['hours_worked'].to_numpy(dtype=np.float64)[valid]
+        if user_id is not None or user_col is None:
+            user_codes, unique_users = np.zeros(len(days), dtype=np.intp), [user_id]
+        else:
+            user_codes, unique_users = pd.factorize(df[user_col].to_numpy()[valid])
+
+        # Extend users, categories and days
+        for uid in unique_users:
+            if uid not in self._users:
+                self._users[uid] = len(self.user_ids)
+                self.user_ids.append(uid)
+        users = np.array([self._users[uid] for uid in unique_users], dtype=np.intp)[user_codes]
+
+        if self.first_day is None:
+            self.first_day = int(days.min())
+        elif days.min() < self.first_day:
+            self._shift_days(self.first_day - int(days.min()))
+        old_days = self.n_days
+        self.n_days = max(self.n_days, int(days.max()) - self.first_day + 1)
+        self._reserve(len(self.user_ids), self.n_days,
+                      self.categories + [str(label) for label in np.unique(labels)
+                                         if label not in self.categories])
+        if self.n_days > old_days:
+            # Carry every user's totals across the new days
+            self._hours_prefix[:, old_days + 1:self.n_days + 1] = \
+                self._hours_prefix[:, old_days:old_days + 1]
+            self._counts_prefix[:, old_days + 1:self.n_days + 1] = \
+                self._counts_prefix[:, old_days:old_days + 1]
+
+        # Accumulate into the cube
+        categories = pd.Categorical(labels, categories=self.categories).codes.astype(np.intp)
+        day_index = days - self.first_day
+        cells, cell_codes = np.unique(
+            np.ravel_multi_index((users, day_index, categories), self.hours.shape),
+            return_inverse=True
+        )
+        self.hours.reshape(-1)[cells] += np.bincount(cell_codes, weights=hours)
+        self.counts.reshape(-1)[cells] += np.bincount(cell_codes)
+
+        self._rebuild_prefix(np.unique(users), int(day_index.min()))
+        return self
+
+    def _day_range(self, start: Optional[DateLike], end: Optional[DateLike]) -> Tuple[int, int]:
+        def position(value, default):
+            if value is None:
+                return default
+            day = pd.Timestamp(value).to_datetime64().astype('datetime64[D]').astype(np.int64)
+            return int(np.clip(day - self.first_day, 0, self.n_days))
+        return position(start, 0), position(end, self.n_days)
+
+    def totals(
+        self,
+        user_id: Hashable = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hours and entry counts per category over a date range.
+
+        Args:
+            user_id: User to read (None for a single-user cube)
+            start: First calendar day included (default: first tracked day)
+            end: First calendar day excluded (default: after the last day)
+
+        Returns:
+            tuple: (hours, counts), arrays aligned with categories (zeros
+            for an unknown user)
+        """
+        user = self._users.get(user_id)
+        if user is None or self.first_day is None:
+            n_categories = len(self.categories)
+            return np.zeros(n_categories), np.zeros(n_categories, dtype=np.int64)
+        lo, hi = self._day_range(start, end)
+        hi = max(lo, hi)
+        return (self._hours_prefix[user, hi] - self._hours_prefix[user, lo],
+                self._counts_prefix[user, hi] - self._counts_prefix[user, lo])
+
+    def breakdown(
+        self,
+        user_id: Hashable = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None
+    ) -> pd.Series:
+        """
+        Hours per category over a date range, for categories with entries.
+
+        Matches ``groupby('time_category', observed=True)['hours_worked'].sum()``
+        over the entries in the range, in the same category order: the
+        categorical order of the first frame appended (TIME_CATEGORIES first
+        for the analytics schema), or sorted labels if it held plain strings.
+        Labels outside a categorical order follow it, sorted.
+
+        Args:
+            user_id: User to read (None for a single-user cube)
+            start: First calendar day included
+            end: First calendar day excluded
+
+        Returns:
+            pd.Series: Hours indexed by time_category
+        """
+        hours, counts = self.totals(user_id, start, end)
+        present = np.flatnonzero(counts > 0)
+        rank = {label: i for i, label in enumerate(self._label_order or [])}
+        present = sorted(present, key=lambda i: (rank.get(self.categories[i], len(rank)),
+                                                 self.categories[i]))
+        return pd.Series(
+            hours[present],
+            index=pd.Index([self.categories[i] for i in present], dtype=object,
+                           name='time_category'),
+            name='hours_worked'
+        )
@@ -0,0 +1,114 @@
+"""
+Time-Indexed Frames for Energy Tracker Analytics
+A date-sorted wrapper around an analytics frame that answers "last N days"
+and [start, end) windows by binary search over the date column, returning
+row slices that share memory with the frame instead of masked copies. The
+analytics functions accept it wherever they accept a DataFrame.
+"""
+
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Optional, Union
+
+TimeLike = Union[str, datetime, pd.Timestamp]
+
+
+class TimeIndexedFrame:
+    """
+    Analytics frame kept in date order with binary-searched windows.
+
+    The frame is sorted once (stable, so same-time rows keep their order)
+    unless it already is; windows are positional slices of it. Slices are
+    views: treat them as read-only.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: Analytics frame with a date column
+        """
+        if not df['date'].is_monotonic_increasing:
+            df = df.sort_values('date', kind='stable')
+        self.frame = df
+        self._dates = df['date'].array
+
+    @classmethod
+    def wrap(cls, df: Union[pd.DataFrame, 'TimeIndexedFrame']) -> 'TimeIndexedFrame':
+        """Wrap a frame, passing TimeIndexedFrames through unchanged."""
+        return df if isinstance(df, cls) else cls(df)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __getitem__(self, key):
+        """Column access on the underlying frame."""
+        return self.frame[key]
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.frame.columns
+
+    @property
+    def min_date(self) -> pd.Timestamp:
+        """Earliest date (NaT when empty)."""
+        return self._dates[0] if len(self._dates) else pd.NaT
+
+    @property
+    def max_date(self) -> pd.Timestamp:
+        """Latest date (NaT when empty)."""
+        return self._dates[-1] if len(self._dates) else pd.NaT
+
+    def _position(self, value: Optional[TimeLike], default: int) -> int:
+        if value is None:
+            return default
+        return int(self._dates.searchsorted(pd.Timestamp(value), side='left'))
+
+    def window(
+        self,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None
+    ) -> pd.DataFrame:
+        """
+        Rows with start <= date < end.
+
+        Args:
+            start: First date included (default: from the beginning)
+            end: First date excluded (default: to the end)
+
+        Returns:
+            pd.DataFrame: Positional slice of the frame (no copy)
+        """
+        return self.frame.iloc[self._position(start, 0):self._position(end, len(self.frame))]
+
+    def last(
+        self,
+        days: float = 0,
+        weeks: float = 0,
+        normalize: bool = False
+    ) -> pd.DataFrame:
+        """
+        Rows dated at most the given span before the latest date.
+
+        Matches ``df[df['date'] >= df['date'].max() - timedelta(...)]`` as
+        used by the period filters of the analytics functions.
+
+        Args:
+            days: Span in days
+            weeks: Span in weeks
+            normalize: Measure the span from midnight of the latest day
+
+        Returns:
+            pd.DataFrame: Positional slice of the frame (no copy)
+        """
+        if not len(self.frame):
+            return self.frame
+        latest = self.max_date.normalize() if normalize else self.max_date
+        return self.window(latest - timedelta(days=days, weeks=weeks))
+
+
+FrameLike = Union[pd.DataFrame, TimeIndexedFrame]
+
+
+def as_frame(df: FrameLike) -> pd.DataFrame:
+    """The DataFrame behind a TimeIndexedFrame, or df itself."""
+    return df.frame if isinstance(df, TimeIndexedFrame) else df
@@ -0,0 +1,391 @@
+"""
+Energy Tracker Trend Engine
+Incremental linear trends over sliding daily windows. The engine keeps the
+running regression sums (n, Σx, Σy, Σxy, Σx²) of every metric and window and
+updates them in O(1) per new day, instead of resampling and refitting the
+whole window on every request.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Mapping, Optional
+
+from .schema import mood_values, row_values
+
+# Metrics and windows (in weeks) tracked by default
+TREND_METRICS = ['physical_energy', 'cognitive_clarity', 'mood_numeric', 'stress']
+TREND_WINDOWS = (2, 4, 8, 12)
+
+# Length of the rolling mean smoothing the daily values
+ROLLING_DAYS = 7
+
+_N, _SX, _SY, _SXY, _SXX = range(5)
+
+
+def describe_trend(metric: str, change: float, weeks: int) -> str:
+    """
+    Human-readable trend description, as shown under the trend chart.
+
+    Args:
+        metric: Metric name
+        change: Change of the fitted line over the window
+        weeks: Window length in weeks
+
+    Returns:
+        str: e.g. "Physical Energy has improved by 0.4 points over 8 weeks"
+    """
+    direction = "improved" if change > 0 else "declined"
+    return (f"{metric.replace('_', ' ').title()} has {direction} "
+            f"by {abs(change):.1f} points over {weeks} weeks")
+
+
+def _nanmean_rows(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Mean of the daily means in a block of days (NaN where no day is tracked)."""
+    tracked = counts > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(tracked, sums / np.where(tracked, counts, 1), 0.0)
+        return means.sum(axis=0) / tracked.sum(axis=0)
+
+
+def window_trends(
+    values: np.ndarray,
+    windows: Iterable[int] = TREND_WINDOWS
+) -> Dict[str, np.ndarray]:
+    """
+    Fit linear trends for several metrics and windows in one pass.
+
+    Every window ends on the last day and spans 7 * weeks + 1 days. Inside a
+    window the 7-day rolling mean (limited to the window) is computed from
+    prefix sums, forward-filled, and fitted with closed-form least squares
+    from the first tracked day of the window.
+
+    Args:
+        values: Daily means of shape (days, metrics) on a continuous
+            calendar, NaN on untracked days
+        windows: Window lengths in weeks
+
+    Returns:
+        dict: Arrays indexed by (window, ...):
+            starts - first day of each window, shape (W,)
+            rolling - window-limited rolling means, NaN outside the window,
+                shape (W, days, metrics)
+            slope, intercept - fitted line per day index, shape (W, metrics)
+            change - rise of the line over the fitted days, shape (W, metrics)
+            days - number of fitted days, shape (W, metrics)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = list(windows)
+    n_days, k = values.shape
+    last = n_days - 1
+    positions = np.arange(n_days)
+
+    # Prefix sums of daily means and tracked-day counts
+    tracked = ~np.isnan(values)
+    prefix_sum = np.vstack([np.zeros((1, k)), np.cumsum(np.where(tracked, values, 0.0), axis=0)])
+    prefix_count = np.vstack([np.zeros((1, k)), np.cumsum(tracked, axis=0)])
+
+    starts = np.array([max(0, last - 7 * w) for w in windows], dtype=np.intp)
+    low = np.maximum(starts[:, None], positions[None, :] - ROLLING_DAYS + 1)
+    in_window = (positions[None, :] >= starts[:, None])[..., None]
+    total = prefix_sum[positions + 1][None] - prefix_sum[low]
+    count = prefix_count[positions + 1][None] - prefix_count[low]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rolling = np.where(in_window & (count > 0), total / np.where(count > 0, count, 1), np.nan)
+
+    # Forward fill along the days axis
+    valid = ~np.isnan(rolling)
+    source = np.maximum.accumulate(
+        np.where(valid, positions[None, :, None], -1), axis=1
+    )
+    filled = np.where(
+        source >= 0, np.take_along_axis(rolling, np.maximum(source, 0), axis=1), np.nan
+    )
+
+    # Closed-form least squares over the filled points, x relative to the last day
+    fitted = ~np.isnan(filled)
+    x = (positions - last).astype(np.float64)[None, :, None]
+    y = np.where(fitted, filled, 0.0)
+    n = fitted.sum(axis=1)
+    sx = (fitted * x).sum(axis=1)
+    sy = y.sum(axis=1)
+    sxy = (y * x).sum(axis=1)
+    sxx = (fitted * x * x).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        denom = n * sxx - sx * sx
+        slope = np.where(denom > 0, (n * sxy - sx * sy) / np.where(denom > 0, denom, 1), 0.0)
+        intercept = np.where(n > 0, (sy - slope * sx) / np.where(n > 0, n, 1), np.nan)
+
+    has_points = fitted.any(axis=1)
+    first = np.where(has_points, fitted.argmax(axis=1), last)
+    span = last - first
+    return {
+        'starts': starts,
+        'rolling': rolling,
+        'slope': slope,
+        # Shift the intercept from x relative to the last day to the day index
+        'intercept': intercept - slope * last,
+        'change': slope * span,
+        'days': np.where(has_points, span + 1, 0),
+    }
+
+
+class TrendEngine:
+    """
+    Sliding-window linear trends for one user's metrics.
+
+    The trend of a window matches compute_metric_trend on daily means: a
+    7-day rolling mean (limited to the window) is forward-filled and fitted
+    with a least-squares line from the first tracked day of the window to the
+    last day; change is the rise of that line.
+
+    Each new day adds one point to, and drops one point from, the running
+    sums of every window. Because the rolling mean is limited to the window,
+    the first days of a window are corrected at query time; this touches a
+    constant number of days unless the window starts inside a gap of a week
+    or more.
+    """
+
+    def __init__(
+        self,
+        metrics: Optional[Iterable[str]] = None,
+        windows: Iterable[int] = TREND_WINDOWS
+    ):
+        """
+        Args:
+            metrics: Metrics to track (default: TREND_METRICS); 'mood' is
+                accepted as an alias for 'mood_numeric'
+            windows: Window lengths in weeks
+        """
+        self.metrics = ['mood_numeric' if m == 'mood' else m
+                        for m in (TREND_METRICS if metrics is None else metrics)]
+        self.windows = tuple(windows)
+        self._days = {w: 7 * w + 1 for w in self.windows}
+
+        k = len(self.metrics)
+        self._capacity = max(self._days.values(), default=1) + ROLLING_DAYS
+        self._sums = np.zeros((self._capacity, k))
+        self._counts = np.zeros((self._capacity, k))
+        self._y = np.full((self._capacity, k), np.nan)
+        self._stats = np.zeros((len(self.windows), 5, k))
+        self._first_day = None
+        self._last = -1
+
+    # Ring buffer helpers ------------------------------------------------
+
+    def _slot(self, p: int) -> int:
+        return p % self._capacity
+
+    def _block(self, array: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Rows for days [start, stop] of a ring array."""
+        return array[[self._slot(p) for p in range(start, stop + 1)]]
+
+    def _window_mean(self, start: int, p: int) -> np.ndarray:
+        """Mean of the daily means over days [start, p]."""
+        return _nanmean_rows(self._block(self._sums, start, p), self._block(self._counts, start, p))
+
+    def _apply(self, p: int, y: np.ndarray, sign: float, window_index=slice(None)) -> None:
+        """Add (sign=1) or remove (sign=-1) the point (p, y) from window sums."""
+        valid = ~np.isnan(y)
+        x = float(p)
+        y0 = np.where(valid, y, 0.0)
+        stats = self._stats[window_index]
+        stats[..., _N, :] += sign * valid
+        stats[..., _SX, :] += sign * valid * x
+        stats[..., _SY, :] += sign * y0
+        stats[..., _SXY, :] += sign * y0 * x
+        stats[..., _SXX, :] += sign * valid * x * x
+
+    def _rolling(self, p: int) -> np.ndarray:
+        """Forward-filled rolling mean of day p over all history."""
+        y = self._window_mean(max(0, p - ROLLING_DAYS + 1), p)
+        if p > 0:
+            y = np.where(np.isnan(y), self._y[self._slot(p - 1)], y)
+        return y
+
+    def _advance(self, p: int) -> None:
+        """Append empty days up to day p."""
+        while self._last < p:
+            self._last += 1
+            q = self._last
+            slot = self._slot(q)
+            self._sums[slot] = 0.0
+            self._counts[slot] = 0.0
+            self._y[slot] = self._rolling(q)
+            self._apply(q, self._y[slot], 1.0)
+            for i, w in enumerate(self.windows):
+                leaving = q - self._days[w]
+                if leaving >= 0:
+                    self._apply(leaving, self._y[self._slot(leaving)], -1.0, i)
+
+    # Feeding data -------------------------------------------------------
+
+    def add_day_totals(self, day, sums: np.ndarray, counts: np.ndarray) -> 'TrendEngine':
+        """
+        Add per-metric sums and counts of check-ins for one day.
+
+        Args:
+            day: Calendar day (anything np.datetime64 accepts); must not be
+                earlier than the last day added
+            sums: Sum of each metric's values that day
+            counts: Number of values of each metric that day
+
+        Returns:
+            TrendEngine: self, for chaining
+        """
+        day = np.datetime64(day, 'D')
+        if self._first_day is None:
+            self._first_day = day
+        p = int((day - self._first_day).astype(np.int64))
+        if p < self._last:
+            raise ValueError('Days must be added in chronological order')
+        self._advance(p)
+
+        # Only the newest day's own value changes; earlier days do not see it
+        slot = self._slot(p)
+        self._apply(p, self._y[slot], -1.0)
+        self._sums[slot] += sums
+        self._counts[slot] += counts
+        self._y[slot] = self._rolling(p)
+        self._apply(p, self._y[slot], 1.0)
+        return self
+
+    def add(self, date, row: Mapping) -> 'TrendEngine':
+        """
+        Add a single check-in.
+
+        Args:
+            date: Check-in timestamp
+            row: Mapping of metric name to value (mood labels are mapped)
+
+        Returns:
+            TrendEngine: self, for chaining
+        """
+        values = row_values(row, self.metrics)
+        present = ~np.isnan(values)
+        return self.add_day_totals(date, np.where(present, values, 0.0), present.astype(float))
+
+    def update_frame(self, df: pd.DataFrame) -> 'TrendEngine':
+        """
+        Add a batch of check-ins, aggregated per day in one vectorized step.
+
+        Args:
+            df: DataFrame with energy tracking data for this user
+
+        Returns:
+            TrendEngine: self, for chaining
+        """
+        values = np.column_stack([
+            mood_values(df) if m == 'mood_numeric' else df[m].to_numpy(dtype=np.float64)
+            for m in self.metrics
+        ]) if self.metrics else np.empty((len(df), 0))
+        days = pd.DatetimeIndex(df['date']).values.astype('datetime64[D]')
+        order = np.argsort(days, kind='stable')
+        days, values = days[order], values[order]
+        present = ~np.isnan(values)
+
+        unique_days, starts = np.unique(days, return_index=True)
+        if len(unique_days) == 0:
+            return self
+        sums = np.add.reduceat(np.where(present, values, 0.0), starts, axis=0)
+        counts = np.add.reduceat(present.astype(float), starts, axis=0)
+        for day, day_sums, day_counts in zip(unique_days, sums, counts):
+            self.add_day_totals(day, day_sums, day_counts)
+        return self
+
+    # Queries ------------------------------------------------------------
+
+    def _window_stats(self, i: int, w: int):
+        """Regression sums of window i with the window-start correction."""
+        stats = self._stats[i].copy()
+        start = max(0, self._last - self._days[w] + 1)
+        k = len(self.metrics)
+        first = np.full(k, np.nan)
+        if start == 0:
+            # The window covers all history, so no day needs correcting
+            tracked = self._block(self._counts, 0, self._last) > 0
+            first = np.where(tracked.any(axis=0), tracked.argmax(axis=0), np.nan)
+            return stats, first
+
+        previous = np.full(k, np.nan)
+        pending = np.ones(k, dtype=bool)
+        p = start
+        while pending.any() and p <= self._last:
+            raw = self._window_mean(max(start, p - ROLLING_DAYS + 1), p)
+            truncated = np.where(np.isnan(raw), previous, raw)
+            full = self._y[self._slot(p)]
+
+            # Replace the full-history value by the window-limited one
+            for sign, y in ((-1.0, full), (1.0, truncated)):
+                valid = pending & ~np.isnan(y)
+                y0 = np.where(valid, y, 0.0)
+                stats[_N] += sign * valid
+                stats[_SX] += sign * valid * p
+                stats[_SY] += sign * y0
+                stats[_SXY] += sign * y0 * p
+                stats[_SXX] += sign * valid * p * p
+
+            first = np.where(np.isnan(first) & ~np.isnan(truncated), p, first)
+            previous = truncated
+            # From here on the window-limited and full values agree
+            if p >= start + ROLLING_DAYS - 1:
+                pending &= np.isnan(raw)
+            p += 1
+        return stats, first
+
+    def _fit(self, i: int, w: int):
+        """Slope, change and fitted day count of every metric for window i."""
+        (n, sx, sy, sxy, sxx), first = self._window_stats(i, w)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denom = n * sxx - sx * sx
+            slope = np.where(denom > 0, (n * sxy - sx * sy) / np.where(denom > 0, denom, 1), 0.0)
+        fitted = ~np.isnan(first)
+        span = np.where(fitted, self._last - np.where(fitted, first, 0), 0)
+        return slope, slope * span, np.where(fitted, span + 1, 0)
+
+    def _row(self, metric: str, w: int, slope: float, change: float, days: int) -> Dict[str, object]:
+        return {
+            'metric': metric,
+            'weeks': w,
+            'slope': float(slope),
+            'change': float(change),
+            'days': int(days),
+            'description': describe_trend(metric, change, w),
+        }
+
+    def trends(self) -> pd.DataFrame:
+        """
+        Current trend of every metric over every window.
+
+        Returns:
+            pd.DataFrame: One row per (metric, weeks) with slope (points per
+            day), change (rise of the fitted line), days (fitted days) and
+            description
+        """
+        rows = []
+        for i, w in enumerate(self.windows):
+            slope, change, days = self._fit(i, w)
+            rows.extend(self._row(metric, w, slope[j], change[j], days[j])
+                        for j, metric in enumerate(self.metrics))
+        return pd.DataFrame(rows, columns=['metric', 'weeks', 'slope', 'change', 'days',
+                                           'description'])
+
+    def trend(self, metric: str, weeks: int) -> Dict[str, object]:
+        """
+        Current trend of one metric over one window.
+
+        Args:
+            metric: Tracked metric ('mood' maps to 'mood_numeric')
+            weeks: One of the engine's windows
+
+        Returns:
+            dict: metric, weeks, slope, change, days and description
+        """
+        metric = 'mood_numeric' if metric == 'mood' else metric
+        if metric not in self.metrics:
+            raise KeyError(metric)
+        if weeks not in self.windows:
+            raise KeyError(weeks)
+        i = self.windows.index(weeks)
+        j = self.metrics.index(metric)
+        slope, change, days = self._fit(i, weeks)
+        return self._row(metric, weeks, slope[j], change[j], days[j])
@@ -0,0 +1,103 @@
+"""
+Sample Database Generator for the Analytics API
+Creates the local SQLite stand-in database the API reads check-ins from,
+filled with generated users ('user-0', 'user-1', ...).
+
+Usage:
+    python src/api/data/generate_sample_data.py [--users 100] [--days 90]
+        [--output src/api/data/analytics.db]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from analytics.sample_data import iter_bulk_sample_data  # noqa: E402
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analytics.db')
+
+TABLE = 'check_ins'
+
+_SCHEMA = f'''
+CREATE TABLE {TABLE} (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    physical_energy REAL,
+    cognitive_clarity REAL,
+    mood TEXT,
+    stress REAL,
+    caffeine INTEGER,
+    hydration INTEGER,
+    socializing INTEGER,
+    hours_worked REAL,
+    time_category TEXT,
+    is_pomodoro INTEGER,
+    happy_moment TEXT
+);
+CREATE INDEX {TABLE}_user_date ON {TABLE} (user_id, date);
+'''
+
+
+def create_database(
+    path: str = DEFAULT_DB_PATH,
+    n_users: int = 100,
+    days: int = 90,
+    seed: int = 42,
+    start_date: datetime = None
+) -> int:
+    """
+    Create (or replace) the stand-in database with generated check-ins.
+
+    Args:
+        path: SQLite file to write
+        n_users: Number of users to generate
+        days: Number of days of data per user
+        seed: Base random seed
+        start_date: Starting date for the data (defaults to days ago from today)
+
+    Returns:
+        int: Number of check-ins written
+    """
+    if start_date is None:
+        start_date = datetime.combine(date.today() - timedelta(days=days), datetime.min.time())
+
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    rows = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        for chunk in iter_bulk_sample_data(days, start_date, seed, n_users):
+            chunk['date'] = chunk['date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            chunk.to_sql(TABLE, conn, if_exists='append', index=False)
+            rows += len(chunk)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.environ.get('ANALYTICS_DB', DEFAULT_DB_PATH))
+    args = parser.parse_args(argv)
+
+    rows = create_database(args.output, args.users, args.days, args.seed)
+    print(f'Wrote {rows} check-ins for {args.users} users to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+CPU-bound Jobs for the Analytics API
+Each job loads one user's check-ins from the stand-in database, runs an
+analytics entry point and returns plain, picklable results with encoded
+figures, so it can run in a worker process.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from analytics import energy_analytics as ea  # noqa: E402
+from analytics import profiling  # noqa: E402
+from analytics.batch_report import json_default  # noqa: E402
+from analytics.render import (  # noqa: E402
+    FigureBuffer,
+    render_energy_correlations,
+    render_time_breakdown
+)
+from analytics.schema import to_analytics_frame  # noqa: E402
+
+TABLE = 'check_ins'
+
+# Per-process Prometheus text files of analytics phase timings, if configured
+PROFILE_DIR = os.environ.get('ANALYTICS_PROFILE_DIR')
+if PROFILE_DIR:
+    profiling.enable(profiling.PrometheusFileSink(
+        os.path.join(PROFILE_DIR, 'analytics-{pid}.prom'), flush_interval=1.0
+    ))
+
+# One read-only connection per database and one figure buffer per worker process
+_connections: Dict[str, sqlite3.Connection] = {}
+_buffer = FigureBuffer()
+
+
+class UnknownUserError(LookupError):
+    """Raised when a user has no check-ins."""
+
+
+def _connection(db_path: str) -> sqlite3.Connection:
+    conn = _connections.get(db_path)
+    if conn is None:
+        conn = _connections[db_path] = sqlite3.connect(
+            f'file:{db_path}?mode=ro', uri=True, check_same_thread=False
+        )
+    return conn
+
+
+def _encode(fig) -> bytes:
+    return _buffer.encode(fig)
+
+
+def _json_float(value) -> Optional[float]:
+    # JSON has no NaN; undefined statistics (e.g. a constant factor) become null
+    return None if np.isnan(value) else float(value)
+
+
+def input_stats(db_path: str, user_id: str) -> tuple:
+    """
+    Latest check-in date and row count of a user, for cache keys.
+
+    Returns:
+        tuple: (max_date, row_count)
+    """
+    return _connection(db_path).execute(
+        f'SELECT MAX(date), COUNT(*) FROM {TABLE} WHERE user_id = ?', (user_id,)
+    ).fetchone()
+
+
+def load_user_frame(db_path: str, user_id: str) -> pd.DataFrame:
+    """
+    Load one user's check-ins in the analytics schema.
+
+    Raises:
+        UnknownUserError: If the user has no check-ins
+    """
+    df = pd.read_sql_query(
+        f'SELECT * FROM {TABLE} WHERE user_id = ? ORDER BY date',
+        _connection(db_path), params=(user_id,), parse_dates=['date']
+    )
+    if df.empty:
+        raise UnknownUserError(user_id)
+    return to_analytics_frame(df.drop(columns='user_id'))
+
+
+def correlations_job(
+    db_path: str,
+    user_id: str,
+    target_metric: str,
+    category: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Correlations with sample sizes, p-values and the bar chart and heatmap images."""
+    df = load_user_frame(db_path, user_id)
+    results = ea.compute_energy_correlations(df, target_metric, category)
+    bar_chart, heatmap = render_energy_correlations(results)
+    return {
+        'target_metric': target_metric,
+        'correlations': {k: _json_float(v) for k, v in results['correlations'].items()},
+        'counts': {k: int(v) for k, v in results['counts'].items()},
+        'p_values': {k: _json_float(v) for k, v in results['p_values'].items()},
+        'image': _encode(bar_chart),
+        'heatmap_image': _encode(heatmap),
+    }
+
+
+def history_job(db_path: str, user_id: str, metrics: List[str]) -> Dict[str, Any]:
+    """History chart image."""
+    df = load_user_frame(db_path, user_id)
+    return {'metrics': metrics, 'image': _encode(ea.plot_history_chart(df, metrics))}
+
+
+def time_breakdown_job(db_path: str, user_id: str) -> Dict[str, Any]:
+    """Hours per category with the donut chart image."""
+    df = load_user_frame(db_path, user_id)
+    results = ea.compute_time_breakdown(df)
+    return {
+        'stats': {
+            'total_hours': results['total_hours'],
+            'breakdown': {str(k): float(v) for k, v in results['hours_by_category'].items()},
+        },
+        'image': _encode(render_time_breakdown(results)),
+    }
+
+
+def trend_job(
+    db_path: str,
+    user_id: str,
+    metric: str,
+    periods: int,
+    trend_weeks: int
+) -> Dict[str, Any]:
+    """Trend description with the trend chart image."""
+    df = load_user_frame(db_path, user_id)
+    fig, description = ea.plot_metric_trend(df, metric, periods, trend_weeks)
+    return {'metric': metric, 'summary': description, 'image': _encode(fig)}
+
+
+def summary_job(db_path: str, user_id: str, period_days: int) -> Dict[str, Any]:
+    """Summary metrics as JSON-ready values."""
+    df = load_user_frame(db_path, user_id)
+    summary = ea.calculate_summary_metrics(df, period_days)
+    return json.loads(json.dumps(summary, default=json_default))
@@ -0,0 +1,244 @@
+"""
+Energy Tracker Analytics API
+Async FastAPI service exposing the analytics entry points under the same
+/api/analytics/* routes the Next.js client calls. Pandas and matplotlib work
+runs in a bounded process pool; results are cached per user and figures are
+returned base64-encoded in JSON or streamed as raw PNG bytes.
+
+Configuration (environment variables):
+    ANALYTICS_DB - SQLite stand-in database (see data/generate_sample_data.py)
+    ANALYTICS_WORKERS - worker processes (default 2)
+    ANALYTICS_MAX_PENDING - jobs queued or running before requests wait
+        (default 4 per worker)
+    ANALYTICS_CACHE_MB - in-memory result cache size (default 64)
+    ANALYTICS_DEFAULT_USER - user served when no user_id is given
+    ANALYTICS_PROFILE_DIR - directory for per-worker Prometheus text files of
+        analytics phase timings (profiling is off when unset)
+"""
+
+import asyncio
+import base64
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from analytics.cache import ResultCache, fingerprint_stats  # noqa: E402
+
+try:
+    from . import jobs
+    from .data.generate_sample_data import DEFAULT_DB_PATH
+except ImportError:
+    from api import jobs
+    from api.data.generate_sample_data import DEFAULT_DB_PATH
+
+CHUNK_SIZE = 64 * 1024
+IMAGE_KINDS = ('image', 'heatmap_image')
+
+
+def _to_json(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace image bytes with base64 strings, as the client expects."""
+    return {
+        key: base64.b64encode(value).decode('ascii') if key in IMAGE_KINDS else value
+        for key, value in result.items()
+    }
+
+
+def _stream(data: bytes) -> Iterator[bytes]:
+    view = memoryview(data)
+    for start in range(0, len(view), CHUNK_SIZE):
+        yield bytes(view[start:start + CHUNK_SIZE])
+
+
+class AnalyticsService:
+    """
+    Runs analytics jobs in a bounded process pool with a shared result cache.
+
+    At most max_pending jobs are submitted at once; further requests wait on
+    a semaphore instead of growing the executor queue.
+    """
+
+    def __init__(self, db_path: str, workers: int = 2, max_pending: Optional[int] = None,
+                 cache: Optional[ResultCache] = None):
+        self.db_path = db_path
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.slots = asyncio.Semaphore(max_pending or 4 * workers)
+        self.cache = ResultCache() if cache is None else cache
+
+    async def run(self, user_id: str, job: Callable[..., Dict[str, Any]], **params) -> Dict[str, Any]:
+        """
+        Run a job for a user, serving it from the cache when the user's
+        check-ins have not changed.
+
+        Raises:
+            HTTPException: 404 for unknown users, 400 for invalid parameters
+                (unknown metrics or factor categories)
+        """
+        loop = asyncio.get_running_loop()
+        max_date, row_count = await loop.run_in_executor(
+            None, jobs.input_stats, self.db_path, user_id
+        )
+        if not row_count:
+            raise HTTPException(status_code=404, detail=f'No check-ins for user {user_id}')
+
+        key = fingerprint_stats(user_id, max_date, row_count, job=job.__name__, **params)
+        found, result = self.cache.get(key, user_id)
+        if found:
+            return result
+
+        async with self.slots:
+            try:
+                result = await loop.run_in_executor(
+                    self.executor, partial(job, self.db_path, user_id, **params)
+                )
+            except KeyError as exc:
+                raise HTTPException(status_code=400, detail=f'Unknown metric: {exc.args[0]}')
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+            except jobs.UnknownUserError:
+                raise HTTPException(status_code=404, detail=f'No check-ins for user {user_id}')
+        self.cache.put(key, result, user_id)
+        return result
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def create_app(
+    db_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    cache_bytes: Optional[int] = None
+) -> FastAPI:
+    """
+    Build the analytics app.
+
+    Args:
+        db_path: SQLite stand-in database (default: ANALYTICS_DB)
+        workers: Worker processes (default: ANALYTICS_WORKERS or 2)
+        max_pending: Jobs in flight before requests wait (default:
+            ANALYTICS_MAX_PENDING or 4 per worker)
+        cache_bytes: Result cache size (default: ANALYTICS_CACHE_MB or 64 MiB)
+
+    Returns:
+        FastAPI: The application
+    """
+    db_path = db_path or os.environ.get('ANALYTICS_DB', DEFAULT_DB_PATH)
+    workers = workers or int(os.environ.get('ANALYTICS_WORKERS', 2))
+    max_pending = max_pending or int(os.environ.get('ANALYTICS_MAX_PENDING', 0)) or None
+    cache_bytes = cache_bytes or int(os.environ.get('ANALYTICS_CACHE_MB', 64)) * 2**20
+    default_user = os.environ.get('ANALYTICS_DEFAULT_USER', 'user-0')
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.service = AnalyticsService(
+            db_path, workers, max_pending, ResultCache(max_bytes=cache_bytes)
+        )
+        try:
+            yield
+        finally:
+            app.state.service.shutdown()
+
+    app = FastAPI(title='Energy Tracker Analytics', lifespan=lifespan)
+
+    def service(request: Request) -> AnalyticsService:
+        return request.app.state.service
+
+    UserId = Query(default=default_user)
+
+    async def correlations(request, user_id, target_metric, category_filter):
+        # The client sends several categories comma-separated; factors of any are kept
+        categories = [c for c in (category_filter or '').split(',') if c] or None
+        return await service(request).run(
+            user_id, jobs.correlations_job, target_metric=target_metric, category=categories
+        )
+
+    async def history(request, user_id, metrics):
+        metric_list = [m for m in metrics.split(',') if m]
+        if not metric_list:
+            raise HTTPException(status_code=400, detail='No metrics requested')
+        return await service(request).run(user_id, jobs.history_job, metrics=metric_list)
+
+    async def time_breakdown(request, user_id):
+        return await service(request).run(user_id, jobs.time_breakdown_job)
+
+    async def trend(request, user_id, metric, periods, trend_weeks):
+        return await service(request).run(
+            user_id, jobs.trend_job, metric=metric, periods=periods, trend_weeks=trend_weeks
+        )
+
+    @app.get('/api/analytics/correlations')
+    async def get_correlations(request: Request, user_id: str = UserId,
+                               target_metric: str = 'physical_energy',
+                               category_filter: Optional[str] = None):
+        return _to_json(await correlations(request, user_id, target_metric, category_filter))
+
+    @app.get('/api/analytics/correlations/image')
+    async def get_correlations_image(request: Request, user_id: str = UserId,
+                                     target_metric: str = 'physical_energy',
+                                     category_filter: Optional[str] = None,
+                                     figure: str = Query('bar', pattern='^(bar|heatmap)$')):
+        result = await correlations(request, user_id, target_metric, category_filter)
+        image = result['heatmap_image' if figure == 'heatmap' else 'image']
+        return StreamingResponse(_stream(image), media_type='image/png')
+
+    @app.get('/api/analytics/history')
+    async def get_history(request: Request, user_id: str = UserId,
+                          metrics: str = 'physical_energy,cognitive_clarity,mood'):
+        return _to_json(await history(request, user_id, metrics))
+
+    @app.get('/api/analytics/history/image')
+    async def get_history_image(request: Request, user_id: str = UserId,
+                                metrics: str = 'physical_energy,cognitive_clarity,mood'):
+        result = await history(request, user_id, metrics)
+        return StreamingResponse(_stream(result['image']), media_type='image/png')
+
+    @app.get('/api/analytics/time-breakdown')
+    async def get_time_breakdown(request: Request, user_id: str = UserId):
+        return _to_json(await time_breakdown(request, user_id))
+
+    @app.get('/api/analytics/time-breakdown/image')
+    async def get_time_breakdown_image(request: Request, user_id: str = UserId):
+        result = await time_breakdown(request, user_id)
+        return StreamingResponse(_stream(result['image']), media_type='image/png')
+
+    @app.get('/api/analytics/trend')
+    async def get_trend(request: Request, user_id: str = UserId,
+                        metric: str = 'physical_energy', periods: int = 4,
+                        trend_weeks: int = Query(8, ge=1)):
+        return _to_json(await trend(request, user_id, metric, periods, trend_weeks))
+
+    @app.get('/api/analytics/trend/image')
+    async def get_trend_image(request: Request, user_id: str = UserId,
+                              metric: str = 'physical_energy', periods: int = 4,
+                              trend_weeks: int = Query(8, ge=1)):
+        result = await trend(request, user_id, metric, periods, trend_weeks)
+        return StreamingResponse(_stream(result['image']), media_type='image/png')
+
+    @app.get('/api/analytics/summary')
+    async def get_summary(request: Request, user_id: str = UserId,
+                          period_days: int = Query(30, ge=1)):
+        return await service(request).run(user_id, jobs.summary_job, period_days=period_days)
+
+    @app.post('/api/analytics/invalidate')
+    async def invalidate(request: Request, user_id: str = UserId):
+        """Drop a user's cached results, e.g. after a new check-in."""
+        return {'user_id': user_id, 'invalidated': service(request).cache.invalidate(user_id)}
+
+    @app.get('/api/analytics/cache-stats')
+    async def cache_stats(request: Request):
+        return service(request).cache.stats()
+
+    return app
+
+
+app = create_app()
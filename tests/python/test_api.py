@@ -0,0 +1,181 @@
+"""
+Tests for the analytics API service, including a small concurrent load test
+against a local stand-in database
+"""
+import pytest
+import asyncio
+import base64
+import sqlite3
+import sys
+import os
+from datetime import datetime
+
+fastapi = pytest.importorskip('fastapi')
+httpx = pytest.importorskip('httpx')
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from fastapi.testclient import TestClient
+
+from api.data.generate_sample_data import create_database
+from api.main import create_app
+
+PNG = b'\x89PNG\r\n\x1a\n'
+
+
+@pytest.fixture(scope='module')
+def database(tmp_path_factory):
+    """Stand-in database with a few generated users"""
+    path = str(tmp_path_factory.mktemp('api') / 'analytics.db')
+    create_database(path, n_users=4, days=45, start_date=datetime(2024, 1, 1))
+    # A user who never socializes, so that factor has zero variance
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(
+            "CREATE TEMP TABLE steady AS SELECT * FROM check_ins WHERE user_id = 'user-0';"
+            "UPDATE steady SET user_id = 'user-steady', socializing = 0;"
+            "INSERT INTO check_ins SELECT * FROM steady;"
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture(scope='module')
+def client(database):
+    """Test client running the app lifespan"""
+    with TestClient(create_app(database, workers=2)) as client:
+        yield client
+
+
+class TestAnalyticsAPI:
+    """Test class for the analytics API routes"""
+
+    def test_correlations(self, client):
+        """Test the correlations route and its image stream"""
+        response = client.get('/api/analytics/correlations',
+                              params={'user_id': 'user-1', 'target_metric': 'stress'})
+        assert response.status_code == 200
+        body = response.json()
+        assert body['target_metric'] == 'stress'
+        assert base64.b64decode(body['image']).startswith(PNG)
+        assert base64.b64decode(body['heatmap_image']).startswith(PNG)
+        assert 'physical_energy' in body['correlations']
+        assert body['counts'].keys() == body['correlations'].keys()
+        assert 0 <= body['p_values']['physical_energy'] <= 1
+
+        image = client.get('/api/analytics/correlations/image',
+                           params={'user_id': 'user-1', 'target_metric': 'stress',
+                                   'figure': 'heatmap'})
+        assert image.headers['content-type'] == 'image/png'
+        assert image.content == base64.b64decode(body['heatmap_image'])
+
+    def test_correlations_with_constant_factor(self, client):
+        """Test that undefined correlations of a constant factor are null, not an error"""
+        response = client.get('/api/analytics/correlations', params={'user_id': 'user-steady'})
+        assert response.status_code == 200
+        body = response.json()
+        assert body['correlations']['socializing'] is None
+        assert body['p_values']['socializing'] is None
+        assert body['counts']['socializing'] > 0
+        assert isinstance(body['correlations']['stress'], float)
+
+    def test_correlations_multiple_categories(self, client):
+        """Test that comma-separated categories keep the factors of every category"""
+        def factors(category_filter):
+            response = client.get('/api/analytics/correlations',
+                                  params={'user_id': 'user-2', 'category_filter': category_filter})
+            assert response.status_code == 200
+            return set(response.json()['correlations'])
+
+        work, core = factors('work'), factors('core')
+        assert factors('work,core') == work | core
+        assert work and core and not work & core
+
+    def test_correlations_against_mood(self, client):
+        """Test that target_metric=mood correlates against the numeric mood scale"""
+        response = client.get('/api/analytics/correlations',
+                              params={'user_id': 'user-1', 'target_metric': 'mood'})
+        assert response.status_code == 200
+        body = response.json()
+        assert body['target_metric'] == 'mood'
+        assert 'mood_numeric' not in body['correlations']
+        assert 'physical_energy' in body['correlations']
+
+    def test_history_trend_and_breakdown(self, client):
+        """Test the history, trend and time breakdown routes"""
+        history = client.get('/api/analytics/history',
+                             params={'user_id': 'user-2', 'metrics': 'mood,stress'}).json()
+        assert history['metrics'] == ['mood', 'stress']
+
+        trend = client.get('/api/analytics/trend',
+                           params={'user_id': 'user-2', 'metric': 'mood', 'trend_weeks': 4}).json()
+        assert trend['metric'] == 'mood'
+        assert 'over 4 weeks' in trend['summary']
+
+        breakdown = client.get('/api/analytics/time-breakdown',
+                               params={'user_id': 'user-2'}).json()
+        assert breakdown['stats']['total_hours'] == \
+            pytest.approx(sum(breakdown['stats']['breakdown'].values()))
+
+        image = client.get('/api/analytics/trend/image', params={'user_id': 'user-2'})
+        assert image.content.startswith(PNG)
+
+    def test_summary(self, client):
+        """Test the summary route"""
+        body = client.get('/api/analytics/summary',
+                          params={'user_id': 'user-3', 'period_days': 14}).json()
+        assert body['consecutive_tracking_days'] == 45
+        assert isinstance(body['happy_moments_count'], int)
+        assert isinstance(body['best_pomodoro_day'], str)
+
+    def test_errors(self, client):
+        """Test unknown users and metrics"""
+        response = client.get('/api/analytics/summary', params={'user_id': 'nobody'})
+        assert response.status_code == 404
+        assert 'detail' in response.json()
+
+        response = client.get('/api/analytics/trend',
+                              params={'user_id': 'user-0', 'metric': 'sleep_quality'})
+        assert response.status_code == 400
+
+        response = client.get('/api/analytics/correlations',
+                              params={'user_id': 'user-0', 'category_filter': 'weather'})
+        assert response.status_code == 400
+
+    def test_cache_and_invalidation(self, client):
+        """Test that repeated requests hit the cache until invalidated"""
+        params = {'user_id': 'user-0', 'period_days': 7}
+        first = client.get('/api/analytics/summary', params=params).json()
+        hits = client.get('/api/analytics/cache-stats').json()['hits']
+        assert client.get('/api/analytics/summary', params=params).json() == first
+        assert client.get('/api/analytics/cache-stats').json()['hits'] == hits + 1
+
+        assert client.post('/api/analytics/invalidate', params={'user_id': 'user-0'}).json()[
+            'invalidated'] >= 1
+        misses = client.get('/api/analytics/cache-stats').json()['misses']
+        client.get('/api/analytics/summary', params=params)
+        assert client.get('/api/analytics/cache-stats').json()['misses'] == misses + 1
+
+
+def test_concurrent_load(database):
+    """Load test: concurrent requests for several users all succeed"""
+    app = create_app(database, workers=2, max_pending=2)
+    routes = ['/api/analytics/summary', '/api/analytics/time-breakdown',
+              '/api/analytics/trend', '/api/analytics/history/image']
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                requests = [
+                    client.get(route, params={'user_id': f'user-{i % 4}'})
+                    for i in range(12) for route in routes
+                ]
+                return await asyncio.gather(*requests)
+
+    responses = asyncio.run(run())
+    assert len(responses) == 48
+    assert all(r.status_code == 200 for r in responses)
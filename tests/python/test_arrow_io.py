@@ -0,0 +1,78 @@
+"""
+Unit tests for arrow_io.py module
+"""
+import pytest
+import numpy as np
+import sys
+import os
+from datetime import datetime
+
+pa = pytest.importorskip('pyarrow')
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.arrow_io import check_in_schema, check_ins_to_arrow, read_arrow, write_arrow
+from analytics.energy_analytics import calculate_summary_metrics, compute_metric_trend
+from analytics.sample_data import generate_sample_data
+
+
+class TestArrowIO:
+    """Test class for Arrow ingestion"""
+
+    @pytest.fixture
+    def sample_df(self):
+        """Two months of sample data"""
+        return generate_sample_data(days=60, start_date=datetime(2024, 1, 1), seed=5)
+
+    def test_round_trip_feeds_analytics(self, sample_df, tmp_path):
+        """Test that a memory-mapped frame gives the same analytics results"""
+        path = str(tmp_path / 'check_ins.arrow')
+        write_arrow(sample_df, path)
+        df = read_arrow(path)
+
+        assert len(df) == len(sample_df)
+        assert str(df['mood'].dtype) == 'category'
+        assert df['physical_energy'].dtype == np.int8
+        assert calculate_summary_metrics(df) == calculate_summary_metrics(sample_df)
+        assert compute_metric_trend(df, 'mood')['slope'] == \
+            pytest.approx(compute_metric_trend(sample_df, 'mood')['slope'])
+
+    def test_memory_mapped_columns_are_not_copied(self, sample_df, tmp_path):
+        """Test that numeric columns point into the Arrow buffers"""
+        path = str(tmp_path / 'check_ins.arrow')
+        write_arrow(sample_df, path)
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        df = read_arrow(table, columns=['date', 'stress'])
+
+        assert list(df.columns) == ['date', 'stress']
+        assert np.shares_memory(df['stress'].to_numpy(),
+                                table.column('stress').chunk(0).to_numpy())
+
+        with pytest.raises(KeyError):
+            read_arrow(path, columns=['sleep_quality'])
+
+    def test_check_in_converter(self):
+        """Test converting Prisma CheckIn records, including optional fields"""
+        records = [
+            {'id': 'c1', 'userId': 'u1', 'window': 'morning', 'tsUtc': '2024-01-01T08:00:00Z',
+             'physical17': 5, 'cognitive17': 4, 'mood17': None, 'stress17': 3, 'note': ''},
+            {'id': 'c2', 'userId': 'u1', 'window': 'evening', 'tsUtc': '2024-01-01T19:30:00Z',
+             'physical17': 3, 'cognitive17': 6, 'mood17': 6, 'stress17': None, 'note': 'tired'},
+        ]
+        table = check_ins_to_arrow(records)
+        assert table.schema.equals(check_in_schema())
+
+        # Round trip through an IPC stream, as sent by another process
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        df = read_arrow(sink.getvalue().to_pybytes())
+
+        assert list(df['check_in_id']) == ['c1', 'c2']
+        assert list(df['window'].cat.categories) == ['morning', 'evening']
+        assert df['date'].iloc[1] == datetime(2024, 1, 1, 19, 30)
+        assert df['physical_energy'].dtype == np.int8
+        assert np.isnan(df['mood17'].iloc[0]) and df['mood17'].iloc[1] == 6
+        assert 'mood_numeric' not in df.columns
+        assert check_ins_to_arrow([]).num_rows == 0
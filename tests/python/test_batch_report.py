@@ -0,0 +1,200 @@
+"""
+Unit tests for batch_report.py module
+"""
+import pytest
+import json
+import pickle
+import sqlite3
+import sys
+import os
+from datetime import datetime
+from functools import partial
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics import batch_report
+from analytics.quantiles import PopulationSketch
+from analytics.batch_report import (
+    RUN_FILE,
+    SKETCH_FILE,
+    SUMMARY_FILE,
+    USER_SKETCH_FILE,
+    is_complete,
+    load_db_partition,
+    load_sample_partition,
+    main,
+    report_dir,
+    run_reports
+)
+
+START = datetime(2024, 1, 1)
+LOAD = partial(load_sample_partition, days=30, seed=7, start_date=START)
+
+# The Prisma tables read by loader.load_user_frames
+SCHEMA = '''
+CREATE TABLE "CheckIn" ("id" TEXT PRIMARY KEY, "userId" TEXT, "window" TEXT NOT NULL,
+    "physical17" INTEGER NOT NULL, "cognitive17" INTEGER NOT NULL, "mood17" INTEGER,
+    "stress17" INTEGER, "note" TEXT NOT NULL, "tsUtc" TEXT NOT NULL);
+CREATE TABLE "TimeCategory" ("id" TEXT PRIMARY KEY, "label" TEXT NOT NULL, "icon" TEXT NOT NULL);
+CREATE TABLE "TimeEntry" ("id" TEXT PRIMARY KEY, "hours" INTEGER NOT NULL,
+    "checkInId" TEXT NOT NULL, "categoryId" TEXT NOT NULL);
+CREATE TABLE "SleepHygiene" ("id" TEXT PRIMARY KEY, "checkInId" TEXT NOT NULL UNIQUE,
+    "consistentSchedule" BOOLEAN, "noScreens" BOOLEAN, "relaxingRoutine" BOOLEAN,
+    "optimalEnvironment" BOOLEAN, "noCaffeine" BOOLEAN);
+CREATE TABLE "CheckInCustomTrackerValue" ("id" TEXT PRIMARY KEY, "checkInId" TEXT NOT NULL,
+    "trackerId" TEXT NOT NULL, "value" TEXT NOT NULL);
+'''
+
+
+class TestBatchReport:
+    """Test class for the nightly batch report runner"""
+
+    def test_reports_written(self, tmp_path):
+        """Test that every user gets five PNGs and a summary"""
+        progress = []
+        stats = run_reports(['user-0', 'user-1'], str(tmp_path), LOAD, workers=1,
+                            partition_size=1, progress=lambda *args: progress.append(args))
+
+        assert stats['rendered'] == 2
+        assert stats['skipped'] == 0
+        assert stats['failed'] == {}
+        assert stats['users_per_s'] > 0
+        assert [p[:2] for p in progress] == [(1, 2), (2, 2)]
+
+        files = sorted(os.listdir(report_dir(str(tmp_path), 'user-1')))
+        assert files == ['correlation_heatmap.png', 'correlations.png', 'history.png',
+                         SUMMARY_FILE, 'time_breakdown.png', 'trend.png', USER_SKETCH_FILE]
+        with open(os.path.join(report_dir(str(tmp_path), 'user-1'), 'trend.png'), 'rb') as f:
+            assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+        with open(os.path.join(report_dir(str(tmp_path), 'user-1'), SUMMARY_FILE)) as f:
+            summary = json.load(f)
+        assert summary['consecutive_tracking_days'] == 30
+        assert 'over 8 weeks' in summary['trend_description']
+
+        with open(tmp_path / RUN_FILE) as f:
+            assert json.load(f)['rendered'] == 2
+
+    def test_resume_skips_finished_users(self, tmp_path):
+        """Test that a restarted run only renders missing users"""
+        run_reports(['user-0'], str(tmp_path), LOAD, workers=1, progress=None)
+        assert is_complete(str(tmp_path), 'user-0')
+
+        stats = run_reports(['user-0', 'user-1'], str(tmp_path), LOAD, workers=1, progress=None)
+        assert stats['skipped'] == 1
+        assert stats['rendered'] == 1
+        with open(tmp_path / SKETCH_FILE, 'rb') as f:
+            assert PopulationSketch.from_bytes(f.read()).digests['stress'].count == 2
+
+        stats = run_reports(['user-0'], str(tmp_path), LOAD, workers=1,
+                            resume=False, progress=None)
+        assert stats['rendered'] == 1
+
+    def test_sketch_exact_after_crash_and_failures(self, tmp_path, monkeypatch):
+        """Test that the population sketch counts each rendered user once across a resume"""
+        write = batch_report.write_user_report
+
+        def write_failing_for_user_1(output_dir, user_id, files):
+            if user_id == 'user-1':
+                raise OSError('disk full')
+            write(output_dir, user_id, files)
+
+        monkeypatch.setattr(batch_report, 'write_user_report', write_failing_for_user_1)
+
+        def crash_on_user_3(user_ids):
+            if 'user-3' in user_ids:
+                raise RuntimeError('worker lost')
+            return LOAD(user_ids)
+
+        users = ['user-0', 'user-1', 'user-2', 'user-3']
+        with pytest.raises(RuntimeError):
+            run_reports(users, str(tmp_path), crash_on_user_3, workers=1,
+                        partition_size=1, progress=None)
+        assert is_complete(str(tmp_path), 'user-2')
+
+        for _ in range(2):
+            stats = run_reports(users, str(tmp_path), LOAD, workers=1,
+                                partition_size=1, progress=None)
+            complete = [u for u in users if is_complete(str(tmp_path), u)]
+            assert complete == ['user-0', 'user-2', 'user-3']
+            assert list(stats['failed']) == ['user-1']
+            with open(tmp_path / SKETCH_FILE, 'rb') as f:
+                sketch = PopulationSketch.from_bytes(f.read())
+            for metric in sketch.metrics:
+                assert sketch.digests[metric].count == len(complete)
+
+    def test_failures_recorded(self, tmp_path):
+        """Test that a user without data is reported instead of aborting the run"""
+        def load(user_ids):
+            return LOAD([u for u in user_ids if u != 'user-1'])
+
+        stats = run_reports(['user-0', 'user-1'], str(tmp_path), load, workers=1, progress=None)
+        assert stats['rendered'] == 1
+        assert stats['failed'] == {'user-1': 'no data'}
+        assert not is_complete(str(tmp_path), 'user-1')
+
+    def test_process_pool(self, tmp_path):
+        """Test the CLI with several workers"""
+        status = main([str(tmp_path), '--users', '2', '--days', '20',
+                       '--workers', '2', '--partition-size', '1'])
+        assert status == 0
+        assert is_complete(str(tmp_path), 'user-0')
+        assert is_complete(str(tmp_path), 'user-1')
+
+        # Sketches from both workers are merged
+        with open(tmp_path / SKETCH_FILE, 'rb') as f:
+            sketch = PopulationSketch.from_bytes(f.read())
+        assert sketch.digests['physical_energy'].count == 2
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        """Create a SQLite Prisma database with two users"""
+        path = str(tmp_path / 'energy.db')
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.executemany('INSERT INTO "TimeCategory" VALUES (?, ?, ?)',
+                         [('work', 'Work', 'w'), ('family', 'Family', 'f')])
+        for u, user in enumerate(('u1', 'u2')):
+            for day in range(30):
+                check_in = f'{user}-{day}'
+                conn.execute(
+                    'INSERT INTO "CheckIn" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (check_in, user, 'morning', 1 + (day + u) % 7, 1 + day * 3 % 7,
+                     1 + day * 5 % 7, 1 + day % 5, '', f'2024-03-{day + 1:02d}T08:30:00.000Z')
+                )
+                conn.execute('INSERT INTO "TimeEntry" VALUES (?, ?, ?, ?)',
+                             (f'{check_in}-w', 1 + day % 4, check_in, 'work'))
+                conn.execute('INSERT INTO "TimeEntry" VALUES (?, ?, ?, ?)',
+                             (f'{check_in}-f', 2, check_in, 'family'))
+        conn.commit()
+        conn.close()
+        return path
+
+    def test_database_run(self, database, tmp_path):
+        """Test the CLI against a database, for every user and for selected users"""
+        output_dir = tmp_path / 'all'
+        assert main([str(output_dir), '--dsn', database, '--workers', '1']) == 0
+        for user in ('u1', 'u2'):
+            assert is_complete(str(output_dir), user)
+        with open(os.path.join(report_dir(str(output_dir), 'u1'), SUMMARY_FILE)) as f:
+            summary = json.load(f)
+        assert summary['high_energy_days'] > 0
+        assert summary['most_used_mood'] is None
+
+        output_dir = tmp_path / 'selected'
+        assert main([str(output_dir), '--dsn', f'sqlite:///{database}',
+                     '--user-ids', 'u2,missing', '--workers', '1']) == 1
+        with open(output_dir / RUN_FILE) as f:
+            assert json.load(f)['failed'] == {'missing': 'no data'}
+        assert is_complete(str(output_dir), 'u2')
+        assert not is_complete(str(output_dir), 'u1')
+
+    def test_database_partition_is_picklable(self, database):
+        """Test that the bound database loader can be sent to worker processes"""
+        load = pickle.loads(pickle.dumps(partial(load_db_partition, dsn=database)))
+        df = load(['u1'])
+
+        assert len(df) == 30
+        assert set(df['time_category'].dropna()) == {'Work', 'Family'}
+        assert df['hours_worked'].sum() == sum(3 + day % 4 for day in range(30))
+
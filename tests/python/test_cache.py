@@ -0,0 +1,167 @@
+"""
+Unit tests for cache.py module
+"""
+import pytest
+import pandas as pd
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.cache import CachedDashboard, ResultCache, fingerprint
+from analytics.energy_analytics import calculate_summary_metrics
+from analytics.sample_data import generate_sample_data
+
+
+class TestResultCache:
+    """Test class for the analytics result cache"""
+
+    @pytest.fixture
+    def sample_df(self):
+        """Sample data for one user"""
+        return generate_sample_data(days=40, start_date=datetime(2024, 1, 1), seed=5)
+
+    def test_fingerprint(self, sample_df):
+        """Test that the key changes with user, data and parameters"""
+        key = fingerprint(sample_df, 'u1', function='summary', period_days=30)
+        assert key == fingerprint(sample_df.copy(), 'u1', period_days=30, function='summary')
+        assert key != fingerprint(sample_df, 'u2', function='summary', period_days=30)
+        assert key != fingerprint(sample_df, 'u1', function='summary', period_days=7)
+        assert key != fingerprint(sample_df.iloc[:-1], 'u1', function='summary', period_days=30)
+
+    def test_hits_and_misses(self, sample_df):
+        """Test that repeated calls are served from the cache"""
+        cache = ResultCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return calculate_summary_metrics(sample_df)
+
+        first = cache.get_or_compute(compute, sample_df, 'u1', function='summary')
+        second = cache.get_or_compute(compute, sample_df, 'u1', function='summary')
+
+        assert len(calls) == 1
+        assert first == second
+        assert second is not first
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_new_check_in_misses(self, sample_df):
+        """Test that appending a check-in changes the key"""
+        cache = ResultCache()
+        cache.get_or_compute(lambda: 1, sample_df, 'u1', function='f')
+
+        new_row = sample_df.iloc[[-1]].assign(date=sample_df['date'].max() + timedelta(hours=2))
+        updated = pd.concat([sample_df, new_row], ignore_index=True)
+        assert cache.get_or_compute(lambda: 2, updated, 'u1', function='f') == 2
+
+    def test_lru_eviction(self):
+        """Test that least recently used entries are evicted first"""
+        cache = ResultCache(max_bytes=2500)
+        cache.put('a', b'x' * 1000, 'u1')
+        cache.put('b', b'x' * 1000, 'u1')
+        assert cache.get('a', 'u1')[0]
+        cache.put('c', b'x' * 1000, 'u2')
+
+        assert cache.get('a', 'u1')[0]
+        assert not cache.get('b', 'u1')[0]
+        assert cache.get('c', 'u2')[0]
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['bytes'] <= 2500
+
+        cache.put('huge', b'x' * 5000, 'u1')
+        assert not cache.get('huge', 'u1')[0]
+
+    def test_invalidate(self, tmp_path):
+        """Test that invalidation drops one user's entries in both tiers"""
+        cache = ResultCache(directory=str(tmp_path))
+        cache.put('a', 1, 'u1')
+        cache.put('b', 2, 'u1')
+        cache.put('c', 3, 'u2')
+
+        assert cache.invalidate('u1') == 2
+        assert not cache.get('a', 'u1')[0]
+        assert not cache.get('b', 'u1')[0]
+        assert cache.get('c', 'u2') == (True, 3)
+        assert cache.stats()['entries'] == 1
+
+        # Entries only on disk, e.g. written by another process, count too
+        ResultCache(directory=str(tmp_path)).put('d', 4, 'u2')
+        assert cache.invalidate('u2') == 2
+        assert cache.stats()['disk_bytes'] == 0
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        """Test that the least recently used files are pruned past max_disk_bytes"""
+        cache = ResultCache(max_bytes=0, directory=str(tmp_path), max_disk_bytes=2500)
+        for i, key in enumerate(['a', 'b']):
+            cache.put(key, b'x' * 1000, 'u1')
+            os.utime(cache._disk_path('u1', key), (i, i))
+        assert cache.get('a', 'u1')[0]
+        cache.put('c', b'x' * 1000, 'u2')
+
+        assert cache.get('a', 'u1')[0]
+        assert not cache.get('b', 'u1')[0]
+        assert cache.get('c', 'u2')[0]
+        assert cache.stats()['disk_bytes'] <= 2500
+        assert ResultCache(directory=str(tmp_path)).stats()['disk_bytes'] == \
+            cache.stats()['disk_bytes']
+
+    def test_concurrent_put_and_invalidate(self, tmp_path):
+        """Test that invalidating a user while their entries are written never fails a put"""
+        cache = ResultCache(directory=str(tmp_path))
+        stop = threading.Event()
+
+        def invalidate():
+            while not stop.is_set():
+                cache.invalidate('u1')
+
+        worker = threading.Thread(target=invalidate)
+        worker.start()
+        try:
+            with ThreadPoolExecutor(4) as pool:
+                list(pool.map(lambda i: cache.put(f'k{i}', i, 'u1'), range(400)))
+        finally:
+            stop.set()
+            worker.join()
+
+    def test_disk_tier(self, tmp_path):
+        """Test that a new cache instance is warmed from disk"""
+        ResultCache(directory=str(tmp_path)).put('a', {'value': 1}, 'user/1')
+
+        cache = ResultCache(directory=str(tmp_path))
+        assert cache.get('a', 'user/1') == (True, {'value': 1})
+        assert cache.get('a', 'user/1') == (True, {'value': 1})
+        stats = cache.stats()
+        assert (stats['disk_hits'], stats['hits'], stats['misses']) == (1, 1, 0)
+
+
+class TestCachedDashboard:
+    """Test class for cached analytics entry points"""
+
+    def test_dashboard(self):
+        """Test that figures are cached as encoded bytes"""
+        df = generate_sample_data(days=30, start_date=datetime(2024, 1, 1), seed=2)
+        dashboard = CachedDashboard()
+
+        bar_chart, heatmap = dashboard.energy_correlations(df, 'u1')
+        assert bar_chart.startswith(b'\x89PNG')
+        assert heatmap.startswith(b'\x89PNG')
+        assert dashboard.energy_correlations(df, 'u1') == (bar_chart, heatmap)
+
+        trend, description = dashboard.metric_trend(df, 'u1', 'mood')
+        assert trend.startswith(b'\x89PNG')
+        assert 'Mood Numeric' in description
+        assert dashboard.history_chart(df, 'u1', ['physical_energy']).startswith(b'\x89PNG')
+        assert dashboard.time_breakdown(df, 'u1').startswith(b'\x89PNG')
+        assert dashboard.summary_metrics(df, 'u1') == calculate_summary_metrics(df)
+        assert dashboard.summary_metrics(df, 'u1', period_days=7) == \
+            calculate_summary_metrics(df, period_days=7)
+
+        stats = dashboard.cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 6
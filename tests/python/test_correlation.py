@@ -0,0 +1,256 @@
+"""
+Unit tests for correlation.py and the batched correlation API
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.correlation import (
+    correlation_p_values,
+    group_codes,
+    grouped_correlations,
+    grouped_moments,
+    pairwise_correlation
+)
+from analytics.energy_analytics import (
+    compute_batch_correlations,
+    compute_batch_lagged_correlations,
+    compute_energy_correlations,
+    compute_lagged_correlations,
+    CORE_METRICS,
+    MOOD_SCALE
+)
+from analytics.sample_data import generate_sample_data
+
+
+class TestCorrelationEngine:
+    """Test class for the grouped correlation engine"""
+
+    @pytest.fixture
+    def multi_user_dataframe(self):
+        """Create a long-format DataFrame with three users"""
+        frames = []
+        for user, seed in [('user-a', 1), ('user-b', 2), ('user-c', 3)]:
+            df = generate_sample_data(days=20, start_date=pd.Timestamp('2024-01-01'), seed=seed)
+            df['user_id'] = user
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+    def test_grouped_correlations_match_pandas(self):
+        """Test that a single group matches DataFrame.corr"""
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=(50, 4))
+        codes = np.zeros(50, dtype=np.intp)
+
+        result = grouped_correlations(values, codes, 1)
+
+        np.testing.assert_allclose(result[0], pd.DataFrame(values).corr().to_numpy())
+
+    def test_grouped_correlations_pairwise_missing(self):
+        """Test that missing values are dropped pairwise like pandas"""
+        rng = np.random.default_rng(1)
+        values = rng.normal(size=(40, 3))
+        values[rng.random((40, 3)) < 0.2] = np.nan
+        codes = np.zeros(40, dtype=np.intp)
+
+        result = grouped_correlations(values, codes, 1)
+
+        np.testing.assert_allclose(result[0], pd.DataFrame(values).corr().to_numpy())
+
+    def test_grouped_correlations_degenerate_groups(self):
+        """Test that constant columns and tiny groups yield NaN"""
+        values = np.array([[1.0, 2.0], [1.0, 3.0], [5.0, 1.0]])
+        codes = np.array([0, 0, 1])
+
+        result = grouped_correlations(values, codes, 2)
+
+        assert np.isnan(result[0, 0, 1])
+        assert np.isnan(result[1]).all()
+
+    def test_grouped_moments_empty_input(self):
+        """Test that empty input returns zeroed moments"""
+        moments = grouped_moments(np.empty((0, 3)), np.empty(0, dtype=np.intp), 0)
+
+        assert moments['n'].shape == (0, 3, 3)
+
+    def test_group_codes_without_user_column(self):
+        """Test that a frame without a user column is a single group"""
+        codes, uniques = group_codes(pd.DataFrame({'x': [1, 2, 3]}))
+
+        assert codes.tolist() == [0, 0, 0]
+        assert len(uniques) == 1
+
+    def test_compute_energy_correlations_matches_pandas(self):
+        """Test that single-user results match the pandas reference"""
+        df = generate_sample_data(days=30)
+        reference = df.copy()
+        reference['mood_numeric'] = reference['mood'].map(MOOD_SCALE)
+        numeric = reference.select_dtypes(include=['int64', 'float64'])
+
+        result = compute_energy_correlations(df)
+
+        expected = numeric.corr()['physical_energy'].sort_values().drop('physical_energy')
+        pd.testing.assert_series_equal(result['correlations'], expected, check_names=False)
+        pd.testing.assert_frame_equal(result['core_matrix'], reference[CORE_METRICS].corr())
+        assert 'mood_numeric' not in df.columns
+
+    def test_pairwise_correlation_counts_and_p_values(self):
+        """Test r, n and p matrices against pandas and closed-form p-values"""
+        rng = np.random.default_rng(3)
+        values = rng.normal(size=(120, 5))
+        values[rng.random(values.shape) < 0.25] = np.nan
+        stats = pairwise_correlation(values)
+
+        frame = pd.DataFrame(values)
+        np.testing.assert_allclose(stats['r'], frame.corr().to_numpy(), atol=1e-12)
+        present = frame.notna().astype(int)
+        np.testing.assert_array_equal(stats['n'], present.T @ present)
+        assert stats['p'].shape == (5, 5)
+
+        # t-distribution tails with 1 and 2 degrees of freedom have closed forms
+        t1 = 0.9 / np.sqrt(1 - 0.81)
+        t2 = 0.5 * np.sqrt(2 / 0.75)
+        p = correlation_p_values(np.array([0.9, -0.5, 0.0, 1.0, 0.3]), np.array([3, 4, 10, 10, 2]))
+        assert p[0] == pytest.approx(1 - 2 * np.arctan(t1) / np.pi)
+        assert p[1] == pytest.approx(1 - t2 / np.sqrt(2 + t2 ** 2))
+        assert p[2] == pytest.approx(1.0)
+        assert p[3] == 0.0
+        assert np.isnan(p[4])
+
+    def test_compute_energy_correlations_significance(self):
+        """Test that counts and p-values line up with the correlations"""
+        df = generate_sample_data(days=30, seed=6)
+        df.loc[df.index[:10], 'caffeine'] = np.nan
+        result = compute_energy_correlations(df)
+
+        assert list(result['counts'].index) == list(result['correlations'].index)
+        assert list(result['p_values'].index) == list(result['correlations'].index)
+        assert result['counts']['caffeine'] == len(df) - 10
+        assert result['counts']['stress'] == len(df)
+        assert ((result['p_values'] >= 0) & (result['p_values'] <= 1)).all()
+        assert result['core_counts'].loc['caffeine', 'hydration'] == len(df) - 10
+        assert result['core_p_values'].shape == (len(CORE_METRICS), len(CORE_METRICS))
+
+    def test_compute_energy_correlations_invalid_target(self):
+        """Test that an unknown target metric raises KeyError"""
+        df = generate_sample_data(days=10)
+
+        with pytest.raises(KeyError):
+            compute_energy_correlations(df, 'invalid_metric')
+
+    def test_compute_batch_correlations_matches_per_user(self, multi_user_dataframe):
+        """Test that batched results equal per-user computations"""
+        result = compute_batch_correlations(multi_user_dataframe)
+
+        assert list(result['user_ids']) == ['user-a', 'user-b', 'user-c']
+        assert result['core_matrices'].shape == (3, len(CORE_METRICS), len(CORE_METRICS))
+        for i, user in enumerate(result['user_ids']):
+            user_df = multi_user_dataframe[multi_user_dataframe['user_id'] == user]
+            single = compute_energy_correlations(user_df)
+
+            assert result['counts'][i] == len(user_df)
+            pd.testing.assert_series_equal(
+                result['correlations'].loc[user][single['correlations'].index],
+                single['correlations'],
+                check_names=False
+            )
+            np.testing.assert_allclose(
+                result['core_matrices'][i], single['core_matrix'].to_numpy()
+            )
+
+    def test_compute_batch_correlations_constant_factor_for_one_user(self, multi_user_dataframe):
+        """Test that a factor constant for one user only is NaN for that user, like pandas"""
+        df = multi_user_dataframe.astype({'caffeine': np.float64})
+        user_b = df['user_id'] == 'user-b'
+        caffeine = CORE_METRICS.index('caffeine')
+        for constant in (2.0, 0.1, 9.9, 3.7):
+            df.loc[user_b, 'caffeine'] = constant
+
+            result = compute_batch_correlations(df)
+            expected = compute_energy_correlations(df[user_b])
+
+            assert np.isnan(result['core_matrices'][1, caffeine]).all()
+            assert np.isnan(result['correlations'].loc['user-b', 'caffeine'])
+            assert expected['core_matrix']['caffeine'].isna().all()
+            assert not np.isnan(result['core_matrices'][0, caffeine]).any()
+
+    def test_compute_batch_correlations_excludes_numeric_user_id(self, multi_user_dataframe):
+        """Test that a numeric user id column is not treated as a factor"""
+        df = multi_user_dataframe.assign(user_id=multi_user_dataframe['user_id'].str[-1].map(
+            {'a': 1, 'b': 2, 'c': 3}
+        ))
+
+        result = compute_batch_correlations(df)
+
+        assert 'user_id' not in result['correlations'].columns
+        assert result['correlations'].index.name == 'user_id'
+
+
+class TestLaggedCorrelations:
+    """Test class for lagged correlations over daily means"""
+
+    def test_matches_shift_and_corr(self):
+        """Test every lag against shifting the daily means in pandas"""
+        df = generate_sample_data(days=60, start_date=pd.Timestamp('2024-01-01'), seed=2)
+        df = df[~df['date'].dt.day.isin([5, 6, 17])]
+        result = compute_lagged_correlations(df, max_lag=4, factors=['caffeine', 'mood'])
+
+        assert list(result['correlations'].columns) == ['caffeine', 'mood_numeric']
+        daily = pd.DataFrame({
+            'caffeine': df['caffeine'].to_numpy(),
+            'mood_numeric': df['mood'].map(MOOD_SCALE).to_numpy(),
+            'physical_energy': df['physical_energy'].to_numpy(),
+        }, index=df['date']).resample('D').mean()
+        for lag in result['lags']:
+            for factor in ('caffeine', 'mood_numeric'):
+                shifted = daily[factor].shift(lag)
+                assert result['correlations'].loc[lag, factor] == \
+                    pytest.approx(shifted.corr(daily['physical_energy']))
+                assert result['counts'].loc[lag, factor] == \
+                    (shifted.notna() & daily['physical_energy'].notna()).sum()
+        assert result['p_values'].notna().all().all()
+
+    def test_batch_matches_per_user(self):
+        """Test that users with different calendars match their single-user results"""
+        frames = []
+        for i in range(3):
+            df = generate_sample_data(days=20 + 10 * i,
+                                      start_date=pd.Timestamp('2024-01-01') + pd.Timedelta(days=i),
+                                      seed=i)
+            frames.append(df.assign(user_id=f'user-{i}'))
+        result = compute_batch_lagged_correlations(pd.concat(frames), max_lag=3,
+                                                   target_metric='stress')
+
+        assert result['correlations'].shape == (12, len(result['correlations'].columns))
+        for i, df in enumerate(frames):
+            single = compute_lagged_correlations(df.drop(columns='user_id'), 'stress', max_lag=3)
+            np.testing.assert_allclose(result['correlations'].loc[f'user-{i}'],
+                                       single['correlations'], atol=1e-12)
+            np.testing.assert_array_equal(result['counts'].loc[f'user-{i}'], single['counts'])
+
+    def test_constant_factor_is_nan(self):
+        """Test that a constant non-integer factor is NaN at every lag, like pandas"""
+        df = generate_sample_data(days=60, seed=2).astype({'caffeine': np.float64})
+        for constant in np.linspace(0.1, 9.9, 50):
+            df['caffeine'] = constant
+            result = compute_lagged_correlations(df, max_lag=3, factors=['caffeine', 'stress'])
+            assert result['correlations']['caffeine'].isna().all()
+            assert result['p_values']['caffeine'].isna().all()
+            assert result['correlations']['stress'].notna().all()
+
+    def test_long_lags_and_errors(self):
+        """Test lags beyond the history and invalid arguments"""
+        df = generate_sample_data(days=3, seed=1)
+        result = compute_lagged_correlations(df, max_lag=10, factors=['hydration'])
+        assert result['counts'].loc[10, 'hydration'] == 0
+        assert np.isnan(result['correlations'].loc[10, 'hydration'])
+
+        with pytest.raises(KeyError):
+            compute_lagged_correlations(df, factors=['sleep_quality'])
+        with pytest.raises(ValueError):
+            compute_lagged_correlations(df, max_lag=-1)
@@ -0,0 +1,159 @@
+"""
+Unit tests for custom_trackers.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.custom_trackers import CustomTrackerMatrix
+from analytics.energy_analytics import compute_energy_correlations
+from analytics.sample_data import generate_sample_data
+
+TRACKERS = pd.DataFrame({
+    'tracker_id': ['t-steps', 't-focus', 't-meds', 't-place'],
+    'label': ['Steps', 'Focus', 'Took meds', 'Place'],
+    'unit_type': ['number', 'scale', 'boolean', 'string'],
+})
+
+
+class TestCustomTrackerMatrix:
+    """Test class for the sparse custom-tracker engine"""
+
+    def test_parse_by_unit_type(self):
+        """Test typed parsing, unknown check-ins, bad values and repeats"""
+        values = pd.DataFrame({
+            'check_in_id': ['c0', 'c1', 'c2', 'c0', 'c1', 'c2', 'c0', 'c1', 'c9', 'c2'],
+            'tracker_id': ['t-steps', 't-steps', 't-steps', 't-meds', 't-meds', 't-meds',
+                           't-place', 't-place', 't-steps', 't-focus'],
+            'value': ['1000', 'n/a', '2500.5', 'true', 'No', 'maybe', 'home', 'office',
+                      '7', '4'],
+        })
+        matrix = CustomTrackerMatrix.from_values(values, ['c0', 'c1', 'c2'], TRACKERS)
+
+        assert matrix.names == ['Focus', 'Took meds', 'Place', 'Steps']
+        assert matrix.numeric_names == ['Focus', 'Took meds', 'Steps']
+        assert matrix.nnz == 7
+        steps = matrix.column('Steps')
+        assert steps.dtype == pd.SparseDtype(np.float64, np.nan)
+        np.testing.assert_array_equal(np.asarray(steps), [1000.0, np.nan, 2500.5])
+        np.testing.assert_array_equal(np.asarray(matrix.column('Took meds')), [1.0, 0.0, np.nan])
+        place = np.asarray(matrix.column('Place'))
+        assert list(place[:2]) == ['home', 'office'] and pd.isna(place[2])
+
+        frame = matrix.to_frame()
+        assert frame.shape == (3, 4)
+        assert isinstance(frame['Focus'].dtype, pd.SparseDtype)
+
+    def test_inferred_unit_types_and_repeats(self):
+        """Test inference without tracker metadata; repeated values keep the last"""
+        values = pd.DataFrame({
+            'check_in_id': ['a', 'b', 'a', 'b', 'a', 'a'],
+            'tracker_id': ['x', 'x', 'y', 'y', 'z', 'z'],
+            'value': ['3', '4', 'yes', 'no', 'tea', 'coffee'],
+        })
+        matrix = CustomTrackerMatrix.from_values(values, ['a', 'b'])
+
+        assert list(matrix.trackers['unit_type']) == ['number', 'boolean', 'string']
+        z = np.asarray(matrix.column('z'))
+        assert z[0] == 'coffee' and pd.isna(z[1])
+
+    def test_correlations_match_dense_pairwise(self):
+        """Test sparse correlations against pandas on the densified pivot"""
+        rng = np.random.default_rng(0)
+        n_rows, n_trackers = 400, 300
+        target = rng.normal(size=n_rows)
+        target[rng.random(n_rows) < 0.1] = np.nan
+
+        rows = []
+        for t in range(n_trackers):
+            present = np.flatnonzero(rng.random(n_rows) < 0.05)
+            noise = rng.normal(size=len(present))
+            rows += [(f'c{r}', f't{t:03d}', str(0.5 * (target[r] if not np.isnan(target[r])
+                                                        else 0) + v))
+                     for r, v in zip(present, noise)]
+        values = pd.DataFrame(rows, columns=['check_in_id', 'tracker_id', 'value'])
+        matrix = CustomTrackerMatrix.from_values(values, [f'c{r}' for r in range(n_rows)])
+        result = matrix.correlations(target)
+
+        dense = matrix.to_frame().sparse.to_dense()
+        expected = dense.corrwith(pd.Series(target))
+        counts = dense.notna().mul(~np.isnan(target), axis=0).sum()
+        assert len(result) == n_trackers
+        np.testing.assert_allclose(result['r'], expected[result.index], atol=1e-12)
+        np.testing.assert_array_equal(result['n'], counts[result.index])
+
+        with pytest.raises(ValueError):
+            matrix.correlations(target[:-1])
+
+    def test_constant_tracker_is_nan(self):
+        """Test that constant non-integer trackers have zero variance, so r and p are NaN"""
+        rng = np.random.default_rng(5)
+        constants = np.round(np.arange(0.1, 10.0, 0.1), 1)
+        values = pd.DataFrame(
+            [(f'c{r}', f't{i:02d}', str(c)) for i, c in enumerate(constants) for r in range(30)]
+            + [(f'c{r}', 'varying', str(r % 7 + 0.1)) for r in range(30)],
+            columns=['check_in_id', 'tracker_id', 'value']
+        )
+        matrix = CustomTrackerMatrix.from_values(values, [f'c{r}' for r in range(30)])
+        result = matrix.correlations(rng.normal(size=30))
+
+        constant = result.drop(index='varying')
+        assert constant['r'].isna().all()
+        assert constant['p'].isna().all()
+        assert (constant['n'] == 30).all()
+        assert not np.isnan(result.loc['varying', 'r'])
+
+
+class TestCustomTrackerCorrelations:
+    """Test class for custom trackers and categories in energy correlations"""
+
+    @pytest.fixture
+    def sample_df(self):
+        """Sample data with a check-in id per row"""
+        df = generate_sample_data(days=40, start_date=datetime(2024, 1, 1), seed=8)
+        df['check_in_id'] = [f'c{i}' for i in range(len(df))]
+        return df
+
+    def test_trackers_join_correlations(self, sample_df):
+        """Test that tracker correlations join the factors and the custom category"""
+        rows = sample_df.iloc[::3]
+        values = pd.DataFrame({
+            'check_in_id': rows['check_in_id'],
+            'tracker_id': 't-focus',
+            'value': (rows['physical_energy'] * 2 + 1).astype(str),
+        })
+        trackers = CustomTrackerMatrix.from_values(values, sample_df['check_in_id'], TRACKERS)
+
+        result = compute_energy_correlations(sample_df, trackers=trackers)
+        assert result['correlations']['Focus'] == pytest.approx(1.0)
+        assert result['correlations'].is_monotonic_increasing
+
+        custom = compute_energy_correlations(sample_df, category='custom', trackers=trackers)
+        assert list(custom['correlations'].index) == ['Focus']
+
+        mood = compute_energy_correlations(sample_df, 'mood_numeric', 'custom', trackers)
+        assert -1 <= mood['correlations']['Focus'] <= 1
+
+    def test_factor_categories(self, sample_df):
+        """Test filtering built-in factors by category"""
+        work = compute_energy_correlations(sample_df, category='work')
+        assert set(work['correlations'].index) == {'hours_worked', 'is_pomodoro'}
+
+        core = compute_energy_correlations(sample_df, 'stress', category='core')
+        assert set(core['correlations'].index) == {'physical_energy', 'cognitive_clarity',
+                                                   'mood_numeric'}
+
+        both = compute_energy_correlations(sample_df, 'stress', category=['work', 'core'])
+        assert set(both['correlations'].index) == \
+            set(work['correlations'].index) | set(core['correlations'].index)
+
+        with pytest.raises(ValueError):
+            compute_energy_correlations(sample_df, category='weather')
+        with pytest.raises(ValueError):
+            compute_energy_correlations(sample_df, category=['work', 'weather'])
@@ -0,0 +1,118 @@
+"""
+Unit tests for daily_store.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.daily_store import DailyAggregateStore, aggregate_daily, DAILY_METRICS
+from analytics.energy_analytics import compute_history_chart, compute_metric_trend, MOOD_SCALE
+from analytics.sample_data import generate_sample_data
+
+
+class TestDailyAggregateStore:
+    """Test class for the daily aggregate store"""
+
+    @pytest.fixture
+    def sample_dataframe(self):
+        """Create sample tracking data with a gap day"""
+        df = generate_sample_data(days=60, start_date=pd.Timestamp('2024-01-01'), seed=5)
+        return df[df['date'] != pd.Timestamp('2024-01-20')].reset_index(drop=True)
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Create an empty store in a temporary directory"""
+        return DailyAggregateStore(str(tmp_path / 'daily'))
+
+    def _reference_means(self, df):
+        reference = df.assign(mood_numeric=df['mood'].map(MOOD_SCALE))
+        return reference.set_index('date')[DAILY_METRICS].resample('D').mean()
+
+    def test_aggregate_daily(self, sample_dataframe):
+        """Test daily sum/count/min/max against pandas groupby"""
+        result = aggregate_daily(sample_dataframe)
+
+        by_day = sample_dataframe.groupby(sample_dataframe['date'].dt.normalize())['stress']
+        np.testing.assert_allclose(result['stress_sum'], by_day.sum())
+        np.testing.assert_allclose(result['stress_count'], by_day.count())
+        np.testing.assert_allclose(result['stress_min'], by_day.min())
+        np.testing.assert_allclose(result['stress_max'], by_day.max())
+
+    def test_daily_means_match_resample(self, store, sample_dataframe):
+        """Test that stored means equal resampling the raw check-ins"""
+        store.update(sample_dataframe, user_id='user-1')
+
+        means = store.daily_means('user-1')
+
+        pd.testing.assert_frame_equal(means, self._reference_means(sample_dataframe),
+                                      check_freq=False)
+        assert np.isnan(means.loc['2024-01-20', 'stress'])
+
+    def test_incremental_updates(self, store, sample_dataframe):
+        """Test that updating in batches (sharing a day) equals one bulk update"""
+        split = sample_dataframe.index[sample_dataframe['date'] == pd.Timestamp('2024-02-01')][0]
+        store.update(sample_dataframe.iloc[:split + 1], user_id='user-1')
+        store.update(sample_dataframe.iloc[split + 1:], user_id='user-1')
+
+        pd.testing.assert_frame_equal(
+            store.daily_means('user-1'), self._reference_means(sample_dataframe), check_freq=False
+        )
+
+    def test_out_of_order_update(self, store, sample_dataframe):
+        """Test that backfilled days are inserted in order"""
+        late = sample_dataframe['date'] >= pd.Timestamp('2024-02-01')
+        store.update(sample_dataframe[late], user_id='user-1')
+        store.update(sample_dataframe[~late], user_id='user-1')
+
+        assert store.load('user-1').index.is_monotonic_increasing
+        pd.testing.assert_frame_equal(
+            store.daily_means('user-1'), self._reference_means(sample_dataframe), check_freq=False
+        )
+
+    def test_long_format_update_and_persistence(self, store, sample_dataframe):
+        """Test updating several users at once and reopening the store"""
+        frame = pd.concat([
+            sample_dataframe.assign(user_id='a/b'),
+            generate_sample_data(days=5, seed=9).assign(user_id='c'),
+        ])
+        store.update(frame)
+
+        reopened = DailyAggregateStore(store.root)
+
+        assert reopened.users() == ['a/b', 'c']
+        assert reopened.metrics == DAILY_METRICS
+        assert len(reopened.load('c')) == 5
+        assert reopened.load('unknown').empty
+
+    def test_metric_mismatch(self, store):
+        """Test that reopening with different metrics raises ValueError"""
+        with pytest.raises(ValueError):
+            DailyAggregateStore(store.root, metrics=['stress'])
+
+    def test_daily_means_unknown_metric(self, store, sample_dataframe):
+        """Test that requesting an unstored metric raises KeyError"""
+        store.update(sample_dataframe, user_id='user-1')
+
+        with pytest.raises(KeyError):
+            store.daily_means('user-1', ['socializing'])
+
+    def test_history_and_trend_from_store(self, store, sample_dataframe):
+        """Test that chart computations read the store like raw check-ins"""
+        store.update(sample_dataframe, user_id='user-1')
+        metrics = ['physical_energy', 'mood']
+        daily = store.daily_means('user-1', metrics)
+
+        from_store = compute_history_chart(None, metrics, daily=daily)
+        from_raw = compute_history_chart(sample_dataframe, metrics)
+        pd.testing.assert_frame_equal(from_store['daily'], from_raw['daily'], check_freq=False)
+        assert from_store['peak'] == from_raw['peak']
+
+        trend_store = compute_metric_trend(None, 'mood', trend_weeks=4, daily=daily)
+        trend_raw = compute_metric_trend(sample_dataframe, 'mood', trend_weeks=4)
+        assert trend_store['description'] == trend_raw['description']
+        np.testing.assert_allclose(trend_store['trend'], trend_raw['trend'])
@@ -16,9 +16,15 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
 from analytics.energy_analytics import (
     plot_energy_correlations,
     plot_history_chart,
+    compute_history_chart,
+    compute_time_breakdown,
+    compute_metric_trend,
     plot_time_breakdown,
     plot_metric_trend,
     calculate_summary_metrics,
+    compute_energy_correlations,
+    compute_trend_table,
+    no_copy_mode,
     MOOD_SCALE,
     PRIMARY_COLOR,
     COLOR_PALETTE
@@ -67,7 +73,7 @@ class TestEnergyAnalytics:
         assert PRIMARY_COLOR == '#953599'
         assert 'physical_energy' in COLOR_PALETTE
 
-    @patch('matplotlib.pyplot.subplots')
+    @patch('analytics.render._subplots')
     @patch('matplotlib.pyplot.close')
     def test_plot_energy_correlations_success(self, mock_close, mock_subplots, sample_dataframe):
         """Test successful energy correlations plotting"""
@@ -92,7 +98,7 @@ class TestEnergyAnalytics:
 
     def test_plot_energy_correlations_with_category(self, sample_dataframe):
         """Test energy correlations with category filter"""
-        with patch('matplotlib.pyplot.subplots') as mock_subplots, \
+        with patch('analytics.render._subplots') as mock_subplots, \
              patch('matplotlib.pyplot.close') as mock_close:
             
             mock_fig_bar = MagicMock()
@@ -110,7 +116,7 @@ class TestEnergyAnalytics:
             assert isinstance(result, tuple)
             assert len(result) == 2
 
-    @patch('matplotlib.pyplot.subplots')
+    @patch('analytics.render._subplots')
     @patch('matplotlib.pyplot.close')
     def test_plot_history_chart_success(self, mock_close, mock_subplots, sample_dataframe):
         """Test successful history chart plotting"""
@@ -125,7 +131,7 @@ class TestEnergyAnalytics:
 
     def test_plot_history_chart_with_mood_conversion(self, sample_dataframe):
         """Test history chart with mood to numeric conversion"""
-        with patch('matplotlib.pyplot.subplots') as mock_subplots:
+        with patch('analytics.render._subplots') as mock_subplots:
             mock_fig = MagicMock()
             mock_ax = MagicMock()
             mock_subplots.return_value = (mock_fig, mock_ax)
@@ -135,7 +141,7 @@ class TestEnergyAnalytics:
             
             assert result == mock_fig
 
-    @patch('matplotlib.pyplot.subplots')
+    @patch('analytics.render._subplots')
     def test_plot_time_breakdown_success(self, mock_subplots, sample_dataframe):
         """Test successful time breakdown plotting"""
         mock_fig = MagicMock()
@@ -146,7 +152,7 @@ class TestEnergyAnalytics:
         
         assert result == mock_fig
 
-    @patch('matplotlib.pyplot.subplots')
+    @patch('analytics.render._subplots')
     def test_plot_metric_trend_success(self, mock_subplots, sample_dataframe):
         """Test successful metric trend plotting"""
         mock_fig = MagicMock()
@@ -162,7 +168,7 @@ class TestEnergyAnalytics:
 
     def test_plot_metric_trend_with_mood(self, sample_dataframe):
         """Test metric trend with mood conversion"""
-        with patch('matplotlib.pyplot.subplots') as mock_subplots:
+        with patch('analytics.render._subplots') as mock_subplots:
             mock_fig = MagicMock()
             mock_ax = MagicMock()
             mock_subplots.return_value = (mock_fig, mock_ax)
@@ -227,7 +233,7 @@ class TestEnergyAnalytics:
 
     def test_plot_energy_correlations_invalid_target_metric(self, sample_dataframe):
         """Test energy correlations with invalid target metric"""
-        with patch('matplotlib.pyplot.subplots') as mock_subplots, \
+        with patch('analytics.render._subplots') as mock_subplots, \
              patch('matplotlib.pyplot.close') as mock_close:
             
             mock_fig_bar = MagicMock()
@@ -246,7 +252,7 @@ class TestEnergyAnalytics:
 
     def test_plot_history_chart_invalid_metrics(self, sample_dataframe):
         """Test history chart with invalid metrics"""
-        with patch('matplotlib.pyplot.subplots') as mock_subplots:
+        with patch('analytics.render._subplots') as mock_subplots:
             mock_fig = MagicMock()
             mock_ax = MagicMock()
             mock_subplots.return_value = (mock_fig, mock_ax)
@@ -257,7 +263,7 @@ class TestEnergyAnalytics:
 
     def test_plot_metric_trend_invalid_metric(self, sample_dataframe):
         """Test metric trend with invalid metric"""
-        with patch('matplotlib.pyplot.subplots') as mock_subplots:
+        with patch('analytics.render._subplots') as mock_subplots:
             mock_fig = MagicMock()
             mock_ax = MagicMock()
             mock_subplots.return_value = (mock_fig, mock_ax)
@@ -277,7 +283,7 @@ class TestEnergyAnalytics:
 
     def test_plot_metric_trend_custom_parameters(self, sample_dataframe):
         """Test metric trend with custom parameters"""
-        with patch('matplotlib.pyplot.subplots') as mock_subplots:
+        with patch('analytics.render._subplots') as mock_subplots:
             mock_fig = MagicMock()
             mock_ax = MagicMock()
             mock_subplots.return_value = (mock_fig, mock_ax)
@@ -286,3 +292,107 @@ class TestEnergyAnalytics:
             
             assert isinstance(result, tuple)
             assert len(result) == 2
+
+    def test_compute_history_chart_does_not_mutate_metrics(self, sample_dataframe):
+        """Test that history computation leaves the caller's list untouched"""
+        metrics = ['physical_energy', 'mood']
+
+        result = compute_history_chart(sample_dataframe, metrics)
+
+        assert metrics == ['physical_energy', 'mood']
+        assert result['metrics'] == ['physical_energy', 'mood_numeric']
+        assert len(result['daily']) == 30
+        assert result['peak'][1] == sample_dataframe['physical_energy'].max()
+        assert 'mood_numeric' not in sample_dataframe.columns
+
+    def test_compute_time_breakdown(self, sample_dataframe):
+        """Test time breakdown computation without figures"""
+        result = compute_time_breakdown(sample_dataframe)
+
+        assert set(result['hours_by_category'].index) == set(sample_dataframe['time_category'])
+        assert result['total_hours'] == pytest.approx(sample_dataframe['hours_worked'].sum())
+
+    def test_compute_metric_trend(self, sample_dataframe):
+        """Test trend computation on a perfectly linear metric"""
+        sample_dataframe['physical_energy'] = np.arange(30, dtype=float)
+
+        result = compute_metric_trend(sample_dataframe, 'physical_energy', trend_weeks=8)
+
+        assert result['slope'] > 0
+        assert result['description'].startswith('Physical Energy has improved')
+        assert len(result['trend']) == len(result['rolling'])
+
+    def test_analytics_do_not_mutate_or_copy_input(self, sample_dataframe):
+        """Test that inputs stay untouched and no-copy mode gives the same results"""
+        before = sample_dataframe.copy()
+        metrics = ['mood', 'stress']
+        calls = [
+            lambda: calculate_summary_metrics(sample_dataframe, 14),
+            lambda: compute_energy_correlations(sample_dataframe)['correlations'],
+            lambda: compute_history_chart(sample_dataframe, metrics)['daily'],
+            lambda: compute_trend_table(sample_dataframe),
+            lambda: compute_time_breakdown(sample_dataframe)['hours_by_category'],
+        ]
+
+        results = [call() for call in calls]
+        with no_copy_mode():
+            assert pd.get_option('mode.copy_on_write')
+            cow_results = [call() for call in calls]
+        assert not pd.get_option('mode.copy_on_write')
+
+        for result, cow_result in zip(results, cow_results):
+            if isinstance(result, pd.DataFrame):
+                pd.testing.assert_frame_equal(result, cow_result)
+            elif isinstance(result, pd.Series):
+                pd.testing.assert_series_equal(result, cow_result)
+            else:
+                assert result == cow_result
+        pd.testing.assert_frame_equal(sample_dataframe, before)
+        assert metrics == ['mood', 'stress']
+
+    def test_plot_functions_release_figures(self, sample_dataframe):
+        """Test that rendered figures are detached from pyplot"""
+        plt.close('all')
+
+        plot_history_chart(sample_dataframe, ['physical_energy'])
+        plot_time_breakdown(sample_dataframe)
+        plot_metric_trend(sample_dataframe, 'stress')
+
+        assert plt.get_fignums() == []
+
+    def test_import_does_not_load_plotting_libraries(self):
+        """Test that compute-only use never imports matplotlib or seaborn"""
+        import subprocess
+        src_dir = os.path.join(os.path.dirname(__file__), '../../src')
+        code = (
+            f"import sys; sys.path.insert(0, {src_dir!r}); "
+            "import analytics.energy_analytics as ea; "
+            "from analytics.sample_data import generate_sample_data; "
+            "ea.compute_energy_correlations(generate_sample_data(days=10)); "
+            "print(sorted(m for m in ('matplotlib', 'seaborn', 'plotly') if m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], check=True, capture_output=True, text=True
+        ).stdout
+
+        assert output.strip() == '[]'
+
+    def test_modules_run_as_scripts(self, tmp_path):
+        """Test that the example runs from the module files as well as with -m"""
+        import subprocess
+        src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src'))
+        env = {k: v for k, v in os.environ.items() if k != 'PYTHONPATH'}
+        commands = [
+            ([sys.executable, os.path.join(src_dir, 'analytics', 'energy_analytics.py')], env),
+            ([sys.executable, os.path.join(src_dir, 'analytics', 'sample_data.py')], env),
+            ([sys.executable, '-m', 'analytics'], {**env, 'PYTHONPATH': src_dir}),
+        ]
+        for i, (command, command_env) in enumerate(commands):
+            cwd = tmp_path / str(i)
+            cwd.mkdir()
+            result = subprocess.run(command, cwd=cwd, capture_output=True, text=True,
+                                    env=command_env)
+
+            assert result.returncode == 0, result.stderr
+            assert 'Summary Metrics:' in result.stdout
+            assert (cwd / 'trend_analysis.png').exists()
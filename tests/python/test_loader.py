@@ -0,0 +1,221 @@
+"""
+Unit tests for loader.py module, using SQLite as a stand-in for Postgres
+"""
+import pytest
+import sqlite3
+import threading
+import time
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.loader import ConnectionPool, energy_frame, load_custom_trackers, load_user_frames
+from analytics.energy_analytics import (
+    compute_energy_correlations,
+    compute_history_chart,
+    compute_lagged_correlations,
+    compute_metric_trend,
+    compute_time_breakdown
+)
+
+SCHEMA = '''
+CREATE TABLE "CheckIn" ("id" TEXT PRIMARY KEY, "userId" TEXT, "window" TEXT NOT NULL,
+    "physical17" INTEGER NOT NULL, "cognitive17" INTEGER NOT NULL, "mood17" INTEGER,
+    "stress17" INTEGER, "note" TEXT NOT NULL, "tsUtc" TEXT NOT NULL);
+CREATE TABLE "TimeCategory" ("id" TEXT PRIMARY KEY, "label" TEXT NOT NULL, "icon" TEXT NOT NULL);
+CREATE TABLE "TimeEntry" ("id" TEXT PRIMARY KEY, "hours" INTEGER NOT NULL,
+    "checkInId" TEXT NOT NULL, "categoryId" TEXT NOT NULL);
+CREATE TABLE "SleepHygiene" ("id" TEXT PRIMARY KEY, "checkInId" TEXT NOT NULL UNIQUE,
+    "consistentSchedule" BOOLEAN, "noScreens" BOOLEAN, "relaxingRoutine" BOOLEAN,
+    "optimalEnvironment" BOOLEAN, "noCaffeine" BOOLEAN);
+CREATE TABLE "CheckInCustomTrackerValue" ("id" TEXT PRIMARY KEY, "checkInId" TEXT NOT NULL,
+    "trackerId" TEXT NOT NULL, "value" TEXT NOT NULL);
+'''
+
+
+class TestLoader:
+    """Test class for the bulk Prisma loader"""
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        """Create a SQLite database with the Prisma tables for three users"""
+        path = str(tmp_path / 'energy.db')
+        conn = sqlite3.connect(path)
+        conn.executescript(SCHEMA)
+        conn.executemany('INSERT INTO "TimeCategory" VALUES (?, ?, ?)',
+                         [('work', 'Work', 'w'), ('rest', 'Rest', 'r')])
+        rng = np.random.default_rng(0)
+        for user in ('u1', 'u2', 'u3'):
+            for day in range(20):
+                check_in = f'{user}-{day}'
+                conn.execute(
+                    'INSERT INTO "CheckIn" VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (check_in, user, 'morning', int(rng.integers(1, 8)), int(rng.integers(1, 8)),
+                     None if day % 5 == 0 else int(rng.integers(1, 8)), int(rng.integers(1, 5)),
+                     '', f'2024-03-{day + 1:02d}T08:30:00.000Z')
+                )
+                conn.execute('INSERT INTO "TimeEntry" VALUES (?, ?, ?, ?)',
+                             (f'{check_in}-w', 3, check_in, 'work'))
+                conn.execute('INSERT INTO "TimeEntry" VALUES (?, ?, ?, ?)',
+                             (f'{check_in}-r', 1, check_in, 'rest'))
+                if day % 2 == 0:
+                    conn.execute('INSERT INTO "SleepHygiene" VALUES (?, ?, 1, 0, 1, 0, 1)',
+                                 (f'{check_in}-s', check_in))
+                conn.execute('INSERT INTO "CheckInCustomTrackerValue" VALUES (?, ?, ?, ?)',
+                             (f'{check_in}-t', check_in, 'steps', str(day * 100)))
+        conn.commit()
+        conn.close()
+        return path
+
+    @pytest.fixture
+    def pool(self, database):
+        """Create a connection pool for the SQLite database"""
+        pool = ConnectionPool(lambda: sqlite3.connect(database, check_same_thread=False),
+                              max_size=2)
+        yield pool
+        pool.close()
+
+    def test_load_user_frames(self, pool):
+        """Test loading and typing frames for a subset of users"""
+        frames = load_user_frames(pool, ['u1', 'u3'], dialect='sqlite', chunk_size=7)
+
+        check_ins = frames['check_ins']
+        assert len(check_ins) == 40
+        assert set(check_ins['user_id']) == {'u1', 'u3'}
+        assert check_ins['user_id'].dtype == 'category'
+        assert check_ins['date'].dtype == 'datetime64[ns]'
+        assert check_ins['date'].iloc[0] == pd.Timestamp('2024-03-01 08:30')
+        assert check_ins['physical_energy'].dtype == np.int8
+        assert check_ins['mood17'].isna().sum() == 8
+        assert 'mood_numeric' not in check_ins.columns
+        assert check_ins['sleep_no_screens'].dtype == bool
+        assert check_ins['sleep_consistent_schedule'].sum() == 20
+
+        time_entries = frames['time_entries']
+        assert len(time_entries) == 80
+        assert time_entries['time_category'].dtype == 'category'
+        assert compute_time_breakdown(time_entries)['total_hours'] == 160
+
+        assert len(frames['custom_values']) == 40
+        assert frames['custom_values']['value'].iloc[1] == '100'
+
+    def test_energy_frame_feeds_analytics(self, pool):
+        """Test that adapted check-ins feed the compute_* analytics functions"""
+        frames = load_user_frames(pool, ['u2'], dialect='sqlite')
+        df = energy_frame(frames)
+        check_ins = frames['check_ins']
+
+        assert len(df) == len(check_ins)
+        assert df['mood_numeric'].min() >= 1 and df['mood_numeric'].max() <= 10
+        assert (df['hours_worked'] == 4).all()
+
+        result = compute_energy_correlations(df, 'mood')
+        expected = check_ins['mood17'].corr(check_ins['physical_energy'])
+        assert result['correlations']['physical_energy'] == pytest.approx(expected)
+        assert result['core_counts'].loc['caffeine', 'physical_energy'] == 0
+        assert np.isnan(result['core_matrix'].loc['hydration', 'stress'])
+
+        lagged = compute_lagged_correlations(df, max_lag=2, factors=['stress', 'mood'])
+        assert lagged['counts'].loc[1, 'stress'] == 19
+        history = compute_history_chart(df, ['physical_energy', 'mood'])
+        assert len(history['daily']) == 20
+        assert compute_metric_trend(df, 'mood', trend_weeks=2)['metric'] == 'mood_numeric'
+        assert compute_time_breakdown(frames['time_entries'])['total_hours'] == 80
+
+    def test_load_custom_trackers(self, database, pool):
+        """Test loading tracker definitions for parsing custom values"""
+        conn = sqlite3.connect(database)
+        conn.execute('CREATE TABLE "CustomTracker" ("id" TEXT PRIMARY KEY, "userId" TEXT, '
+                     '"label" TEXT, "icon" TEXT, "unit" TEXT, "unitType" TEXT, "maxValue" INTEGER)')
+        conn.execute('INSERT INTO "CustomTracker" VALUES '
+                     "('steps', 'u1', 'Steps', 's', 'steps', 'number', NULL)")
+        conn.commit()
+        conn.close()
+
+        trackers = load_custom_trackers(pool, ['u1', 'u2'], dialect='sqlite')
+        assert trackers[['tracker_id', 'label', 'unit_type']].values.tolist() == \
+            [['steps', 'Steps', 'number']]
+        assert np.isnan(trackers['max_value'].iloc[0])
+
+    def test_load_unknown_users(self, pool):
+        """Test that unknown or no users give empty frames"""
+        frames = load_user_frames(pool, [], dialect='sqlite')
+
+        assert all(frame.empty for frame in frames.values())
+
+    def test_unsupported_dialect(self, pool):
+        """Test that an unknown dialect raises ValueError"""
+        with pytest.raises(ValueError):
+            load_user_frames(pool, ['u1'], dialect='mysql')
+
+    def test_pool_reuses_connections(self):
+        """Test that connections are reused and capped at max_size"""
+        created = []
+
+        def connect():
+            created.append(sqlite3.connect(':memory:', check_same_thread=False))
+            return created[-1]
+
+        pool = ConnectionPool(connect, max_size=2)
+        for _ in range(3):
+            with pool.connection() as conn:
+                conn.execute('SELECT 1')
+        assert len(created) == 1
+
+        def worker():
+            with pool.connection():
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(created) <= 2
+        pool.close()
+
+    def test_pool_discards_failed_connections(self):
+        """Test that a connection that raised is closed and not reused"""
+        created = []
+        pool = ConnectionPool(lambda: created.append(sqlite3.connect(':memory:')) or created[-1])
+
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection() as conn:
+                conn.execute('SELECT * FROM missing')
+        with pool.connection():
+            pass
+
+        assert len(created) == 2
+        pool.close()
+        with pytest.raises(RuntimeError):
+            with pool.connection():
+                pass
+
+    def test_pool_closes_connections_returned_after_close(self):
+        """Test that a connection borrowed across close() is closed, not re-queued"""
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:'))
+        with pool.connection() as conn:
+            pool.close()
+            conn.execute('SELECT 1')
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute('SELECT 1')
+        assert pool._idle.empty()
+
+    def test_pool_ends_transactions_before_reuse(self):
+        """Test that a returned connection is not left inside an open transaction"""
+        pool = ConnectionPool(lambda: sqlite3.connect(':memory:'))
+        with pool.connection() as conn:
+            conn.execute('CREATE TABLE t (x INTEGER)')
+        with pool.connection() as conn:
+            conn.execute('INSERT INTO t VALUES (1)')
+            assert conn.in_transaction
+        with pool.connection() as reused:
+            assert reused is conn
+            assert not reused.in_transaction
+            assert reused.execute('SELECT COUNT(*) FROM t').fetchone() == (0,)
+        pool.close()
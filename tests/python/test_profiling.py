@@ -0,0 +1,147 @@
+"""
+Unit tests for profiling.py module
+"""
+import pytest
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics import profiling
+from analytics.profiling import HistogramSink, LoggingSink, PrometheusFileSink
+from analytics import energy_analytics as ea
+from analytics.render import FigureBuffer
+from analytics.sample_data import generate_sample_data
+from analytics.schema import to_analytics_frame
+
+
+@pytest.fixture
+def df():
+    """Two months of check-ins"""
+    return to_analytics_frame(generate_sample_data(days=60, start_date=datetime(2024, 1, 1),
+                                                   seed=3))
+
+
+@pytest.fixture(autouse=True)
+def profiling_off():
+    """Leave profiling disabled after every test"""
+    yield
+    profiling.disable()
+
+
+class TestProfiling:
+    """Test class for the profiling hooks and sinks"""
+
+    def test_disabled_records_nothing(self, df):
+        """Test that calls without a sink are not measured"""
+        records = []
+        LoggingSink(records.append)
+        assert not profiling.enabled()
+        ea.compute_energy_correlations(df)
+        assert profiling.phase('resample') is profiling.phase('mood')
+        assert records == []
+
+    def test_phases_of_a_call(self, df):
+        """Test total, nested phase and row attribution in the histogram sink"""
+        # Raw check-ins, so mood codes are derived inside the call
+        raw = generate_sample_data(days=60, seed=3)
+        with profiling.profiling(HistogramSink(), track_memory=True) as sink:
+            ea.compute_energy_correlations(raw)
+        assert not profiling.enabled()
+
+        summary = {(s['call'], s['phase']): s for s in sink.summary()}
+        call = 'compute_energy_correlations'
+        for phase in ('total', 'mood', 'correlation'):
+            assert summary[(call, phase)]['count'] >= 1, phase
+        total = summary[(call, 'total')]
+        assert total['rows'] == len(raw)
+        assert total['allocated_bytes'] > 0
+        assert total['seconds'] >= summary[(call, 'correlation')]['seconds']
+        assert sink.quantile(call, 'total', 0.5) >= total['mean_seconds']
+        assert sink.quantile('nothing', 'total', 0.5) != sink.quantile('nothing', 'total', 0.5)
+
+    def test_figure_and_savefig(self, df):
+        """Test that figure building and encoding are recorded separately"""
+        records = []
+        with profiling.profiling(LoggingSink(records.append)):
+            fig, _ = ea.plot_metric_trend(df, 'physical_energy')
+            FigureBuffer().encode(fig)
+
+        seen = {(r.call, r.phase) for r in records}
+        assert ('plot_metric_trend', 'figure') in seen
+        assert ('plot_metric_trend', 'total') in seen
+        assert ('encode', 'savefig') in seen
+        assert all(r.allocated_bytes is None for r in records)
+
+    def test_prometheus_file(self, df, tmp_path):
+        """Test the text exposition file written by the Prometheus sink"""
+        path = str(tmp_path / 'analytics-{pid}.prom')
+        with profiling.profiling(PrometheusFileSink(path, flush_interval=0)):
+            ea.calculate_summary_metrics(df)
+
+        text = (tmp_path / f'analytics-{os.getpid()}.prom').read_text()
+        labels = 'call="calculate_summary_metrics",phase="total"'
+        assert '# TYPE analytics_phase_seconds histogram' in text
+        assert f'analytics_phase_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+        assert f'analytics_phase_seconds_count{{{labels}}} 1' in text
+        assert f'analytics_phase_rows_total{{{labels}}} {len(df)}' in text
+        assert not list(tmp_path.glob('*.tmp'))
+
+    def test_profiled_keeps_metadata(self):
+        """Test that decorated entry points keep their name and docstring"""
+        assert ea.compute_energy_correlations.__name__ == 'compute_energy_correlations'
+        assert 'Args:' in ea.compute_energy_correlations.__doc__
+
+    def test_sink_errors_do_not_fail_calls(self, df):
+        """Test that a failing sink is logged instead of failing the analytics call"""
+        def broken(record):
+            raise OSError('disk full')
+
+        with profiling.profiling(LoggingSink(broken)):
+            result = ea.calculate_summary_metrics(df)
+        assert result == ea.calculate_summary_metrics(df)
+
+        with pytest.raises(TypeError):
+            profiling.Sink()
+
+    def test_concurrent_prometheus_flushes(self, df, tmp_path):
+        """Test that threads flushing the same file at once neither fail nor leak tmp files"""
+        path = str(tmp_path / 'analytics.prom')
+        with profiling.profiling(PrometheusFileSink(path, flush_interval=0)) as sink:
+            with ThreadPoolExecutor(8) as pool:
+                list(pool.map(lambda _: ea.calculate_summary_metrics(df), range(32)))
+            sink.flush()
+
+        labels = 'call="calculate_summary_metrics",phase="total"'
+        text = (tmp_path / 'analytics.prom').read_text()
+        assert f'analytics_phase_seconds_count{{{labels}}} 32' in text
+        assert not list(tmp_path.glob('*.tmp'))
+
+    def test_memory_tracking_is_single_threaded(self, df):
+        """Test that only phases on the enabling thread, without overlap, report allocations"""
+        records = []
+        entered, release = threading.Event(), threading.Event()
+
+        def other_thread():
+            ea.calculate_summary_metrics(df)
+            with profiling.phase('blocking'):
+                entered.set()
+                release.wait(10)
+
+        with profiling.profiling(LoggingSink(records.append), track_memory=True):
+            worker = threading.Thread(target=other_thread)
+            worker.start()
+            entered.wait(10)
+            ea.compute_metric_trend(df, 'stress')
+            release.set()
+            worker.join()
+            ea.compute_time_breakdown(df)
+
+        allocated = {r.call: r.allocated_bytes for r in records if r.phase == 'total'}
+        assert allocated['calculate_summary_metrics'] is None
+        assert allocated['compute_metric_trend'] is None
+        assert allocated['compute_time_breakdown'] > 0
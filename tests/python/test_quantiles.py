@@ -0,0 +1,108 @@
+"""
+Unit tests for quantiles.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.quantiles import PopulationSketch, TDigest
+from analytics.sample_data import generate_bulk_sample_data
+
+QUANTILES = np.array([0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999])
+
+
+class TestTDigest:
+    """Test class for the mergeable t-digest"""
+
+    def test_accuracy_and_merge(self):
+        """Test ranks against exact quantiles, built whole and from merged parts"""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(size=100000)
+        exact = np.quantile(values, QUANTILES)
+
+        whole = TDigest.from_values(values)
+        parts = [TDigest.from_values(part) for part in np.array_split(values, 16)]
+        merged = TDigest().merge(*parts)
+
+        assert len(whole) <= 100
+        for digest in (whole, merged):
+            np.testing.assert_allclose(digest.cdf(exact), QUANTILES, atol=2e-3)
+            assert digest.count == len(values)
+            assert digest.quantile(0.0) == values.min()
+            assert digest.quantile(1.0) == values.max()
+        assert merged.quantile(0.5) == pytest.approx(exact[4], rel=0.01)
+
+    def test_discrete_values_and_edges(self):
+        """Test mid-rank percentiles for small-integer metrics and empty digests"""
+        values = np.array([1, 2, 2, 3, 3, 3, 4, 5, 6, 7, np.nan])
+        digest = TDigest.from_values(values)
+
+        assert digest.count == 10
+        assert digest.cdf(3.0) == pytest.approx(0.45)
+        assert digest.cdf(0.0) == 0.0
+        assert digest.cdf(9.0) == 1.0
+        assert np.isnan(TDigest().cdf(1.0))
+        assert np.isnan(TDigest().quantile(0.5))
+
+    def test_serialization(self):
+        """Test that serialized digests round-trip compactly"""
+        digest = TDigest.from_values(np.random.default_rng(1).normal(size=50000))
+        data = digest.to_bytes()
+        restored = TDigest.from_bytes(data)
+
+        assert len(data) < 2048
+        np.testing.assert_array_equal(restored.means, digest.means)
+        assert restored.cdf(0.25) == digest.cdf(0.25)
+        with pytest.raises(ValueError):
+            TDigest.from_bytes(b'XXXX' + data[4:])
+
+
+class TestPopulationSketch:
+    """Test class for population percentiles of user averages"""
+
+    @pytest.fixture
+    def population(self):
+        """Forty users with 45 days of data"""
+        return generate_bulk_sample_data(days=45, n_users=40, start_date=datetime(2024, 1, 1))
+
+    def test_percentiles_of_user_averages(self, population):
+        """Test that batch and per-user sketches approximate exact user ranks"""
+        batch = PopulationSketch().add_users(population)
+        single = PopulationSketch()
+        for _, user_df in population.groupby('user_id', sort=False):
+            single.add_user(user_df)
+
+        user_df = population[population['user_id'] == 'user-3']
+        averages = pd.DataFrame([
+            single.user_values(frame) for _, frame in population.groupby('user_id', sort=False)
+        ])
+        for metric, value in batch.user_values(user_df).items():
+            exact = ((averages[metric] < value).mean() + (averages[metric] == value).mean() / 2)
+            assert batch.percentile(metric, value) == pytest.approx(exact * 100, abs=2.5)
+            assert single.percentile(metric, value) == pytest.approx(exact * 100, abs=2.5)
+
+        percentiles = batch.user_percentiles(user_df)
+        assert set(percentiles) == {'physical_energy', 'stress', 'hydration'}
+
+    def test_merge_and_serialization(self, population):
+        """Test merging worker sketches and the byte round trip"""
+        users = population['user_id'].unique()
+        halves = [
+            PopulationSketch().add_users(population[population['user_id'].isin(part)])
+            for part in (users[:15], users[15:])
+        ]
+        merged = PopulationSketch.from_bytes(halves[0].to_bytes()).merge(halves[1])
+        whole = PopulationSketch().add_users(population)
+
+        for metric in merged.metrics:
+            assert merged.digests[metric].count == 40
+            assert merged.percentile(metric, 5.0) == pytest.approx(whole.percentile(metric, 5.0))
+
+        with pytest.raises(KeyError):
+            merged.percentile('caffeine', 1.0)
@@ -0,0 +1,92 @@
+"""
+Unit tests for render.py module
+"""
+import pytest
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.energy_analytics import (
+    compute_energy_correlations,
+    compute_history_chart,
+    compute_time_breakdown,
+    compute_metric_trend
+)
+from analytics.render import (
+    FigureBuffer,
+    render_energy_correlations,
+    render_history_chart,
+    render_time_breakdown,
+    render_metric_trend
+)
+from analytics.sample_data import generate_sample_data
+
+
+class TestRender:
+    """Test class for the headless render pipeline"""
+
+    @pytest.fixture
+    def sample_dataframe(self):
+        """Create sample tracking data"""
+        return generate_sample_data(days=30)
+
+    def test_renderers_return_closed_figures(self, sample_dataframe):
+        """Test that every renderer returns figures no longer tracked by pyplot"""
+        plt.close('all')
+
+        figures = [
+            *render_energy_correlations(compute_energy_correlations(sample_dataframe)),
+            render_history_chart(compute_history_chart(sample_dataframe, ['stress', 'mood'])),
+            render_time_breakdown(compute_time_breakdown(sample_dataframe)),
+            render_metric_trend(compute_metric_trend(sample_dataframe, 'mood')),
+        ]
+
+        assert all(isinstance(fig, plt.Figure) for fig in figures)
+        assert all(isinstance(fig.canvas, FigureCanvasAgg) for fig in figures)
+        assert plt.get_fignums() == []
+
+    def test_backend_left_alone(self):
+        """Test that rendering does not switch the process-wide matplotlib backend"""
+        import subprocess
+        src_dir = os.path.join(os.path.dirname(__file__), '../../src')
+        code = (
+            f"import sys; sys.path.insert(0, {src_dir!r}); "
+            "import matplotlib; "
+            "from analytics.energy_analytics import plot_time_breakdown; "
+            "from analytics.sample_data import generate_sample_data; "
+            "plot_time_breakdown(generate_sample_data(days=10)); "
+            "print(matplotlib.get_backend())"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], check=True, capture_output=True, text=True,
+            env={**os.environ, 'MPLBACKEND': 'svg'}
+        ).stdout
+
+        assert output.strip() == 'svg'
+
+    def test_figure_buffer_encodes_png_and_svg(self, sample_dataframe):
+        """Test encoding to PNG and SVG with a reused buffer"""
+        fig = render_time_breakdown(compute_time_breakdown(sample_dataframe))
+        buffer = FigureBuffer()
+
+        png = buffer.encode(fig, 'png', dpi=50)
+        svg = buffer.encode(fig, 'svg')
+        png_again = buffer.encode(fig, 'png', dpi=50)
+
+        assert png.startswith(b'\x89PNG')
+        assert b'<svg' in svg
+        assert png_again == png
+
+    def test_figure_buffer_stream(self, sample_dataframe):
+        """Test that streamed chunks reassemble to the encoded image"""
+        fig = render_metric_trend(compute_metric_trend(sample_dataframe, 'stress'))
+        buffer = FigureBuffer()
+
+        chunks = list(buffer.stream(fig, 'png', chunk_size=1024, dpi=50))
+
+        assert all(len(chunk) <= 1024 for chunk in chunks)
+        assert b''.join(chunks) == buffer.encode(fig, 'png', dpi=50)
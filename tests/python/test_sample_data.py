@@ -5,13 +5,19 @@ import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
 import sys
 import os
 
 # Add the src directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
 
-from analytics.sample_data import generate_sample_data, generate_example_usage
+from analytics.sample_data import (
+    generate_sample_data,
+    generate_example_usage,
+    generate_bulk_sample_data,
+    iter_bulk_sample_data
+)
 
 
 class TestSampleData:
@@ -243,3 +249,77 @@ class TestSampleData:
         # Parameters should remain unchanged
         assert original_days == 10
         assert original_seed == 123
+
+
+class TestBulkSampleData:
+    """Test class for the vectorized multi-user sample data generator"""
+
+    START = datetime(2024, 1, 1)
+
+    def test_columns_and_dtypes_match_original(self):
+        """Test that bulk output has the original columns and dtypes plus user_id"""
+        bulk = generate_bulk_sample_data(days=10, start_date=self.START, n_users=2)
+        original = generate_sample_data(days=10, start_date=self.START)
+
+        assert list(bulk.columns) == ['user_id'] + list(original.columns)
+        pd.testing.assert_series_equal(bulk.dtypes.drop('user_id'), original.dtypes)
+
+    def test_value_ranges(self):
+        """Test that generated values stay within the original ranges"""
+        df = generate_bulk_sample_data(days=30, start_date=self.START, n_users=5)
+
+        assert df['physical_energy'].between(1, 7).all()
+        assert df['cognitive_clarity'].between(1, 7).all()
+        assert df['stress'].between(1, 4).all()
+        assert df['caffeine'].between(0, 6).all()
+        assert df['hydration'].between(0, 10).all()
+        assert df['hours_worked'].between(0.5, 8.0).all()
+        assert set(df['is_pomodoro']) <= {0, 1}
+        assert df.groupby(['user_id', 'date']).size().between(1, 4).all()
+        assert df.groupby('user_id')['date'].is_monotonic_increasing.all()
+
+    def test_statistically_equivalent(self):
+        """Test that summary statistics match the original generator"""
+        bulk = generate_bulk_sample_data(days=365, start_date=self.START, n_users=20)
+        original = pd.concat([
+            generate_sample_data(days=365, start_date=self.START, seed=seed)
+            for seed in range(20)
+        ])
+
+        for column in ['physical_energy', 'cognitive_clarity', 'stress', 'caffeine',
+                       'hydration', 'hours_worked', 'is_pomodoro']:
+            assert bulk[column].mean() == pytest.approx(original[column].mean(), abs=0.05)
+            assert bulk[column].std() == pytest.approx(original[column].std(), abs=0.05)
+        assert bulk['happy_moment'].notna().mean() == pytest.approx(0.7, abs=0.01)
+        assert len(bulk) / 20 == pytest.approx(len(original) / 20, rel=0.03)
+        assert bulk['physical_energy'].corr(bulk['stress']) == pytest.approx(
+            original['physical_energy'].corr(original['stress']), abs=0.03
+        )
+
+    def test_per_user_determinism_across_chunks(self):
+        """Test that a user's data does not depend on chunking or user count"""
+        small = generate_bulk_sample_data(days=20, start_date=self.START, n_users=3,
+                                          users_per_chunk=1)
+        large = generate_bulk_sample_data(days=20, start_date=self.START, n_users=5,
+                                          users_per_chunk=4)
+
+        pd.testing.assert_frame_equal(small, large[large['user_id'].isin(small['user_id'])])
+
+    def test_different_seeds(self):
+        """Test that different seeds produce different data"""
+        df1 = generate_bulk_sample_data(days=5, start_date=self.START, seed=1)
+        df2 = generate_bulk_sample_data(days=5, start_date=self.START, seed=2)
+
+        assert not df1.equals(df2)
+
+    def test_streaming_chunks(self):
+        """Test that the iterator yields bounded chunks of users"""
+        chunks = list(iter_bulk_sample_data(days=5, start_date=self.START, n_users=7,
+                                            users_per_chunk=3))
+
+        assert [chunk['user_id'].nunique() for chunk in chunks] == [3, 3, 1]
+
+    def test_zero_users_and_days(self):
+        """Test empty outputs"""
+        assert generate_bulk_sample_data(n_users=0).empty
+        assert generate_bulk_sample_data(days=0, n_users=2).empty
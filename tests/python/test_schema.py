@@ -0,0 +1,125 @@
+"""
+Unit tests for schema.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.schema import (
+    MOOD_CATEGORIES,
+    TIME_CATEGORIES,
+    happy_flags,
+    mood_values,
+    to_analytics_frame
+)
+from analytics.energy_analytics import (
+    MOOD_SCALE,
+    calculate_summary_metrics,
+    compute_energy_correlations,
+    compute_history_chart,
+    compute_metric_trend,
+    compute_time_breakdown
+)
+from analytics.sample_data import generate_sample_data
+
+
+class TestSchema:
+    """Test class for the canonical analytics frame schema"""
+
+    @pytest.fixture
+    def raw(self):
+        """Sample data with string labels"""
+        return generate_sample_data(days=120, seed=3)
+
+    @pytest.fixture
+    def typed(self, raw):
+        """The same data converted to the analytics schema"""
+        return to_analytics_frame(raw)
+
+    def test_dtypes(self, typed):
+        """Test that labels, metrics and flags get compact dtypes"""
+        assert list(typed['mood'].cat.categories) == MOOD_CATEGORIES
+        assert list(typed['time_category'].cat.categories) == TIME_CATEGORIES
+        assert typed['happy_moment'].dtype == 'category'
+        assert typed['mood_numeric'].dtype == np.int8
+        assert typed['physical_energy'].dtype == np.int8
+        assert typed['hydration'].dtype == np.int8
+        assert typed['hours_worked'].dtype == np.float64
+        assert typed['has_happy_moment'].dtype == bool
+
+    def test_values_preserved(self, raw, typed):
+        """Test that conversion is lossless"""
+        assert (typed['mood'].astype(str) == raw['mood']).all()
+        assert (typed['physical_energy'] == raw['physical_energy']).all()
+        np.testing.assert_array_equal(
+            typed['mood_numeric'], raw['mood'].map(MOOD_SCALE).to_numpy()
+        )
+        np.testing.assert_array_equal(typed['has_happy_moment'], raw['happy_moment'].notna())
+        assert typed['happy_moment'].isna().sum() == raw['happy_moment'].isna().sum()
+
+    def test_input_not_modified_and_idempotent(self, raw, typed):
+        """Test that the input is left alone and reconversion is a no-op"""
+        assert raw['mood'].dtype == object
+        assert 'mood_numeric' not in raw.columns
+        again = to_analytics_frame(typed)
+        pd.testing.assert_frame_equal(again, typed)
+
+    def test_unknown_labels_appended(self):
+        """Test that labels outside the fixed orders are kept"""
+        df = pd.DataFrame({
+            'mood': ['Calm', 'Elated', None],
+            'time_category': ['Work', 'Reading', 'Rest'],
+        })
+        typed = to_analytics_frame(df)
+
+        assert list(typed['mood'].cat.categories) == MOOD_CATEGORIES + ['Elated']
+        assert list(typed['time_category'].cat.categories) == TIME_CATEGORIES + ['Reading']
+        assert typed['mood_numeric'].dtype == np.float64
+        assert typed['mood_numeric'].iloc[0] == MOOD_SCALE['Calm']
+        assert typed['mood_numeric'].iloc[1:].isna().all()
+
+    def test_non_integral_metrics_kept(self):
+        """Test that metrics with fractions or missing values are not downcast"""
+        df = pd.DataFrame({'stress': [1.0, np.nan], 'caffeine': [1.5, 2.0]})
+        typed = to_analytics_frame(df)
+        assert typed['stress'].dtype == np.float64
+        assert typed['caffeine'].dtype == np.float64
+
+    def test_memory_shrinks(self, raw, typed):
+        """Test that the typed frame is several times smaller"""
+        raw_bytes = raw.memory_usage(deep=True).sum()
+        typed_bytes = typed.memory_usage(deep=True).sum()
+        assert typed_bytes * 3 < raw_bytes
+
+    def test_helpers_on_raw_and_typed(self, raw, typed):
+        """Test that the accessors agree for raw and typed frames"""
+        np.testing.assert_array_equal(mood_values(raw), mood_values(typed))
+        np.testing.assert_array_equal(happy_flags(raw), happy_flags(typed))
+
+    def test_analytics_match_raw(self, raw, typed):
+        """Test that analytics results do not depend on the representation"""
+        pd.testing.assert_series_equal(
+            compute_energy_correlations(raw)['correlations'],
+            compute_energy_correlations(typed)['correlations']
+        )
+
+        raw_history = compute_history_chart(raw, ['physical_energy', 'mood'])
+        typed_history = compute_history_chart(typed, ['physical_energy', 'mood'])
+        pd.testing.assert_frame_equal(raw_history['daily'], typed_history['daily'])
+
+        raw_trend = compute_metric_trend(raw, 'mood')
+        typed_trend = compute_metric_trend(typed, 'mood')
+        assert typed_trend['description'] == raw_trend['description']
+        assert typed_trend['slope'] == pytest.approx(raw_trend['slope'])
+
+        raw_hours = compute_time_breakdown(raw)['hours_by_category']
+        typed_hours = compute_time_breakdown(typed)['hours_by_category']
+        assert list(typed_hours.index) == [c for c in TIME_CATEGORIES if c in raw_hours.index]
+        assert typed_hours.to_dict() == pytest.approx(raw_hours.to_dict())
+
+        assert calculate_summary_metrics(typed) == calculate_summary_metrics(raw)
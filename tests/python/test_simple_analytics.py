@@ -28,7 +28,7 @@ def test_color_constants():
     assert PRIMARY_COLOR == '#953599'
     assert 'physical_energy' in COLOR_PALETTE
 
-@patch('matplotlib.pyplot.subplots')
+@patch('analytics.render._subplots')
 @patch('matplotlib.pyplot.close')
 def test_plot_energy_correlations_mock(mock_close, mock_subplots):
     """Test energy correlations plotting with mocked matplotlib"""
@@ -0,0 +1,119 @@
+"""
+Unit tests for streaks.py module and batched streak metrics
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.streaks import day_streaks, longest_true_runs
+from analytics.energy_analytics import calculate_summary_metrics, compute_batch_streaks
+from analytics.sample_data import generate_sample_data
+
+
+def _reference_longest_streak(dates):
+    """Day-by-day loop used by the original implementation"""
+    tracked = set(pd.DatetimeIndex(dates).normalize())
+    current = longest = 0
+    for day in pd.date_range(min(tracked), max(tracked), freq='D'):
+        current = current + 1 if day in tracked else 0
+        longest = max(longest, current)
+    return longest, current
+
+
+class TestStreaks:
+    """Test class for vectorized streak computations"""
+
+    @pytest.fixture
+    def gappy_dates(self):
+        """Dates with gaps, duplicates and shuffled order"""
+        days = pd.to_datetime([
+            '2024-01-01', '2024-01-02', '2024-01-02', '2024-01-03',
+            '2024-01-05', '2024-01-06', '2024-01-07', '2024-01-08 18:30',
+            '2024-01-10', '2024-01-11',
+        ], format='ISO8601')
+        return days[np.random.default_rng(0).permutation(len(days))]
+
+    def test_day_streaks_single_group(self, gappy_dates):
+        """Test current and longest streaks with their bounds"""
+        result = day_streaks(gappy_dates.to_numpy())
+
+        assert result['longest_streak'][0] == 4
+        assert result['current_streak'][0] == 2
+        assert result['longest_streak_start'][0] == np.datetime64('2024-01-05')
+        assert result['longest_streak_end'][0] == np.datetime64('2024-01-08')
+
+    def test_day_streaks_prefers_most_recent_tie(self):
+        """Test that the most recent of equally long streaks is reported"""
+        days = pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-04', '2024-01-05'])
+
+        result = day_streaks(days.to_numpy())
+
+        assert result['longest_streak_start'][0] == np.datetime64('2024-01-04')
+
+    def test_day_streaks_multiple_groups(self, gappy_dates):
+        """Test that groups never share a streak across their boundary"""
+        days = np.concatenate([gappy_dates.to_numpy(), pd.to_datetime(['2024-01-12']).to_numpy()])
+        codes = np.r_[np.zeros(len(gappy_dates), dtype=np.intp), 2]
+
+        result = day_streaks(days, codes, 3)
+
+        assert result['longest_streak'].tolist() == [4, 0, 1]
+        assert result['current_streak'].tolist() == [2, 0, 1]
+        assert np.isnat(result['longest_streak_start'][1])
+
+    def test_day_streaks_match_reference_loop(self):
+        """Test against the original day-by-day loop on sparse random data"""
+        rng = np.random.default_rng(3)
+        days = pd.Timestamp('2020-01-01') + pd.to_timedelta(
+            np.sort(rng.choice(1500, size=900, replace=False)), unit='D'
+        )
+
+        result = day_streaks(days.to_numpy())
+
+        assert (result['longest_streak'][0], result['current_streak'][0]) == \
+            _reference_longest_streak(days)
+
+    def test_longest_true_runs(self):
+        """Test longest runs per group, keeping row order"""
+        flags = np.array([1, 1, 0, 1, 1, 1, 1, 0, 1], dtype=bool)
+        codes = np.array([0, 0, 0, 1, 1, 0, 1, 1, 0])
+
+        assert longest_true_runs(flags).tolist() == [4]
+        assert longest_true_runs(flags, codes, 3).tolist() == [2, 3, 0]
+        assert longest_true_runs(np.array([], dtype=bool), n_groups=2).tolist() == [0, 0]
+
+    def test_summary_metrics_streak_outputs(self):
+        """Test the new streak outputs of calculate_summary_metrics"""
+        df = generate_sample_data(days=60)
+        df = df[~df['date'].dt.day.isin([10, 11])]
+
+        result = calculate_summary_metrics(df)
+
+        longest, current = _reference_longest_streak(df['date'])
+        assert result['consecutive_tracking_days'] == longest
+        assert result['current_streak'] == current
+        assert (result['longest_streak_end'] - result['longest_streak_start']).days == longest - 1
+        assert result['milestone_hydration'] == (result['longest_hydration_run'] >= 7)
+
+    def test_compute_batch_streaks(self):
+        """Test that batched streaks match per-user summary metrics"""
+        frames = [
+            generate_sample_data(days=30, seed=seed).assign(user_id=seed)
+            for seed in (1, 2)
+        ]
+        frames[1] = frames[1][frames[1]['date'].dt.day != 15]
+
+        result = compute_batch_streaks(pd.concat(frames, ignore_index=True))
+
+        for user_df in frames:
+            user = user_df['user_id'].iloc[0]
+            longest, current = _reference_longest_streak(user_df['date'])
+            flags = (user_df['hydration'] >= 7).to_numpy()
+            assert result.loc[user, 'longest_streak'] == longest
+            assert result.loc[user, 'current_streak'] == current
+            assert result.loc[user, 'longest_hydration_run'] == longest_true_runs(flags)[0]
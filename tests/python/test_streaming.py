@@ -0,0 +1,128 @@
+"""
+Unit tests for streaming.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.streaming import CorrelationAccumulator, accumulators_from_frame
+from analytics.energy_analytics import CORE_METRICS, MOOD_SCALE, compute_batch_correlations
+from analytics.sample_data import generate_sample_data
+
+
+class TestCorrelationAccumulator:
+    """Test class for the streaming correlation accumulator"""
+
+    @pytest.fixture
+    def sample_dataframe(self):
+        """Create sample tracking data with the mood mapped to numbers"""
+        df = generate_sample_data(days=40, seed=7)
+        df['mood_numeric'] = df['mood'].map(MOOD_SCALE)
+        return df
+
+    def test_row_updates_match_batch_correlations(self, sample_dataframe):
+        """Test that row-by-row updates reproduce DataFrame.corr"""
+        acc = CorrelationAccumulator()
+        for row in sample_dataframe.drop(columns='mood_numeric').to_dict('records'):
+            acc.update(row)
+
+        pd.testing.assert_frame_equal(
+            acc.correlations(), sample_dataframe[CORE_METRICS].corr()
+        )
+        np.testing.assert_allclose(acc.means, sample_dataframe[CORE_METRICS].mean())
+        np.testing.assert_allclose(acc.variances, sample_dataframe[CORE_METRICS].var())
+
+    def test_update_with_missing_values(self, sample_dataframe):
+        """Test that missing values are handled pairwise"""
+        sample_dataframe.loc[::5, 'stress'] = np.nan
+        sample_dataframe.loc[::7, 'caffeine'] = np.nan
+
+        acc = CorrelationAccumulator()
+        for row in sample_dataframe[CORE_METRICS].to_dict('records'):
+            acc.update({k: (None if pd.isna(v) else v) for k, v in row.items()})
+
+        pd.testing.assert_frame_equal(
+            acc.correlations(), sample_dataframe[CORE_METRICS].corr()
+        )
+        assert acc.count['stress'] == sample_dataframe['stress'].notna().sum()
+
+    def test_update_frame_and_merge(self, sample_dataframe):
+        """Test that a bulk seed followed by row updates matches the full history"""
+        head, tail = sample_dataframe.iloc[:60], sample_dataframe.iloc[60:]
+
+        acc = CorrelationAccumulator().update_frame(head)
+        for row in tail.to_dict('records'):
+            acc.update(row)
+
+        pd.testing.assert_frame_equal(
+            acc.correlations(), sample_dataframe[CORE_METRICS].corr()
+        )
+
+    def test_merge_rejects_different_metrics(self):
+        """Test that merging over different metrics raises ValueError"""
+        with pytest.raises(ValueError):
+            CorrelationAccumulator().merge(CorrelationAccumulator(['stress']))
+
+    def test_empty_accumulator(self):
+        """Test that an empty accumulator reports NaN statistics"""
+        acc = CorrelationAccumulator()
+        acc.update({})
+
+        assert acc.correlations().isna().all().all()
+        assert acc.summary()['stress']['count'] == 0
+
+    def test_bytes_round_trip(self, sample_dataframe):
+        """Test serialization to and from bytes"""
+        acc = CorrelationAccumulator().update_frame(sample_dataframe)
+
+        restored = CorrelationAccumulator.from_bytes(acc.to_bytes())
+
+        assert restored.metrics == acc.metrics
+        pd.testing.assert_frame_equal(restored.correlations(), acc.correlations())
+        assert restored.summary() == acc.summary()
+
+    def test_from_bytes_rejects_garbage(self):
+        """Test that invalid payloads raise ValueError"""
+        with pytest.raises(ValueError):
+            CorrelationAccumulator.from_bytes(b'XXXX' + bytes(10))
+
+    def test_accumulators_from_frame(self, sample_dataframe):
+        """Test seeding one accumulator per user from a long-format frame"""
+        other = generate_sample_data(days=20, seed=8)
+        frame = pd.concat([
+            sample_dataframe.drop(columns='mood_numeric').assign(user_id='a'),
+            other.assign(user_id='b'),
+        ], ignore_index=True)
+
+        accumulators = accumulators_from_frame(frame)
+
+        assert set(accumulators) == {'a', 'b'}
+        pd.testing.assert_frame_equal(
+            accumulators['a'].correlations(), sample_dataframe[CORE_METRICS].corr()
+        )
+
+    def test_constant_metric_for_one_user_matches_batch(self, sample_dataframe):
+        """Test that a metric constant for one user is NaN in seeded and merged accumulators"""
+        other = generate_sample_data(days=20, seed=8)
+        frame = pd.concat([
+            sample_dataframe.drop(columns='mood_numeric').assign(user_id='a'),
+            other.assign(user_id='b'),
+        ], ignore_index=True).astype({'caffeine': np.float64})
+        user_a = frame['user_id'] == 'a'
+        for constant in (2.0, 0.1, 9.9, 3.7):
+            frame.loc[user_a, 'caffeine'] = constant
+            expected = compute_batch_correlations(frame)['core_matrices'][0]
+
+            seeded = accumulators_from_frame(frame)['a']
+            merged = CorrelationAccumulator().update_frame(frame[user_a].iloc[:30])
+            merged.update_frame(frame[user_a].iloc[30:])
+
+            for acc in (seeded, merged):
+                assert acc.correlations().loc['caffeine'].isna().all()
+                np.testing.assert_allclose(acc.correlations().to_numpy(), expected)
+            assert not accumulators_from_frame(frame)['b'].correlations().isna().any().any()
@@ -0,0 +1,91 @@
+"""
+Unit tests for summary.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.summary import IncrementalSummary
+from analytics.energy_analytics import calculate_summary_metrics
+from analytics.sample_data import generate_sample_data
+from analytics.schema import to_analytics_frame
+
+
+def assert_same_summary(incremental, batch):
+    """Same keys, values and value types (NaT compares equal to NaT)"""
+    assert list(incremental) == list(batch)
+    for key, value in batch.items():
+        assert type(incremental[key]) is type(value), key
+        assert incremental[key] == value or (pd.isna(value) and pd.isna(incremental[key])), key
+
+
+@pytest.fixture
+def history():
+    """Half a year of check-ins with gaps and long hydration runs"""
+    rng = np.random.default_rng(11)
+    df = generate_sample_data(days=180, start_date=datetime(2024, 1, 1), seed=11)
+    df = df[rng.random(len(df)) > 0.2].reset_index(drop=True)
+    runs = rng.integers(1, 12, len(df))
+    df['hydration'] = np.resize(np.repeat(rng.integers(5, 10, len(df)), runs), len(df))
+    df.loc[rng.random(len(df)) < 0.05, 'physical_energy'] = np.nan
+    return df
+
+
+class TestIncrementalSummary:
+    """Test class for the event-driven summary"""
+
+    @pytest.mark.parametrize('period_days', [7, 30])
+    def test_matches_batch_on_every_prefix(self, history, period_days):
+        """Test equality with calculate_summary_metrics as check-ins arrive"""
+        for frame in (history, to_analytics_frame(history)):
+            summary = IncrementalSummary(period_days)
+            for end in range(0, len(frame), 25):
+                summary.update_frame(frame.iloc[end:end + 25])
+                stop = min(end + 25, len(frame))
+                assert_same_summary(summary.metrics(),
+                                    calculate_summary_metrics(frame.iloc[:stop], period_days))
+
+        assert summary.metrics()['milestone_happy']
+        assert summary.metrics()['longest_hydration_run'] > 1
+
+    def test_happy_moment_and_pomodoro_events(self, history):
+        """Test that HappyMoment and PomodoroSession events flag the latest check-in"""
+        summary = IncrementalSummary()
+        for row in history.to_dict('records'):
+            happy = row.pop('happy_moment')
+            pomodoro = row.pop('is_pomodoro')
+            events = [{'type': 'check_in', **row}]
+            if happy is not None:
+                events.append({'type': 'happy_moment'})
+            if pomodoro == 1:
+                events += [{'type': 'pomodoro_session'}] * 2
+            summary.update(events)
+
+        assert_same_summary(summary.metrics(), calculate_summary_metrics(history))
+
+        with pytest.raises(ValueError):
+            summary.update([{'type': 'meditation'}])
+        with pytest.raises(ValueError):
+            IncrementalSummary().add_happy_moment()
+
+    def test_snapshot_restore(self, history, tmp_path):
+        """Test that a restored snapshot continues exactly like the original"""
+        summary = IncrementalSummary(14).update_frame(history.iloc[:200])
+        path = str(tmp_path / 'summary.json')
+        summary.save(path)
+        restored = IncrementalSummary.load(path)
+        assert_same_summary(restored.metrics(), summary.metrics())
+
+        restored.update_frame(history.iloc[200:])
+        assert_same_summary(restored.metrics(), calculate_summary_metrics(history, 14))
+
+        with pytest.raises(ValueError):
+            restored.add_check_in(history.iloc[0].to_dict())
+        with pytest.raises(ValueError):
+            IncrementalSummary.from_state({**summary.to_state(), 'version': 99})
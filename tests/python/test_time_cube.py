@@ -0,0 +1,105 @@
+"""
+Unit tests for time_cube.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.time_cube import TimeBreakdownCube
+from analytics.energy_analytics import compute_time_breakdown
+from analytics.sample_data import generate_sample_data
+from analytics.schema import to_analytics_frame
+
+
+@pytest.fixture
+def entries():
+    """Time entries of several users, including a category outside TIME_CATEGORIES"""
+    rng = np.random.default_rng(4)
+    n = 2000
+    return pd.DataFrame({
+        'user_id': rng.choice(['u1', 'u2', 'u3'], n),
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 120 * 24, n),
+                                                             unit='h'),
+        'time_category': rng.choice(['Work', 'Rest', 'Gardening', 'Family'], n),
+        'hours_worked': np.round(rng.random(n) * 4, 1),
+    })
+
+
+def expected_breakdown(entries, user_id, start=None, end=None):
+    """Reference breakdown via groupby over the rows in the range"""
+    mask = entries['user_id'] == user_id
+    if start is not None:
+        mask &= entries['date'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= entries['date'] < pd.Timestamp(end)
+    return entries[mask].groupby('time_category')['hours_worked'].sum()
+
+
+class TestTimeBreakdownCube:
+    """Test class for the prefix-sum time breakdown cube"""
+
+    def test_ranges_match_groupby(self, entries):
+        """Test arbitrary day ranges, including empty and out-of-range ones"""
+        cube = TimeBreakdownCube.from_entries(entries)
+        assert cube.categories == ['Work', 'Family', 'Rest', 'Gardening']
+        ranges = [(None, None), ('2024-02-01', '2024-03-01'), ('2023-06-01', '2024-01-05'),
+                  ('2024-03-10', None), ('2024-02-01', '2024-02-01'), ('2025-01-01', None)]
+        for user_id in ['u1', 'u2', 'u3']:
+            for start, end in ranges:
+                got = cube.breakdown(user_id, start, end)
+                expected = expected_breakdown(entries, user_id, start, end)
+                # Plain labels come out sorted, like groupby
+                pd.testing.assert_series_equal(got, expected, check_index_type=not expected.empty)
+
+        assert cube.breakdown('nobody').empty
+
+    def test_incremental_append(self, entries):
+        """Test that appends in any order, with older days and new categories, agree"""
+        full = TimeBreakdownCube.from_entries(entries)
+        late = entries[entries['date'] >= '2024-02-15']
+        early = entries[entries['date'] < '2024-02-15']
+
+        cube = TimeBreakdownCube.from_entries(late[late['time_category'] != 'Gardening'])
+        cube.append(early)
+        cube.append(late[late['time_category'] == 'Gardening'])
+
+        assert cube.categories == full.categories
+        assert cube.first_day == full.first_day and cube.n_days == full.n_days
+        for user_id in ['u1', 'u2', 'u3']:
+            for start, end in [(None, None), ('2024-02-10', '2024-02-20')]:
+                hours, counts = cube.totals(user_id, start, end)
+                full_hours, full_counts = full.totals(user_id, start, end)
+                np.testing.assert_allclose(hours, full_hours)
+                np.testing.assert_array_equal(counts, full_counts)
+
+        for day in pd.date_range('2024-05-01', periods=5):
+            cube.append(pd.DataFrame({'date': [day], 'time_category': ['Work'],
+                                      'hours_worked': [1.0]}), user_id='u1')
+        assert cube.breakdown('u1', '2024-05-01')['Work'] == pytest.approx(5.0)
+
+    def test_compute_time_breakdown_ranges(self):
+        """Test date ranges on frames and cubes in compute_time_breakdown"""
+        df = to_analytics_frame(generate_sample_data(days=60, start_date=datetime(2024, 1, 1),
+                                                     seed=6))
+        # Typed frames keep the TIME_CATEGORIES order, plain labels are sorted
+        for frame in (df.astype({'time_category': str}), df):
+            cube = TimeBreakdownCube.from_entries(frame, user_col=None)
+            whole = compute_time_breakdown(frame)['hours_by_category']
+            from_cube = compute_time_breakdown(None, cube=cube)['hours_by_category']
+            assert list(from_cube.index) == list(whole.index)
+            np.testing.assert_allclose(from_cube.to_numpy(), whole.to_numpy())
+        assert list(whole.index) != sorted(whole.index)
+
+        start, end = '2024-01-15', '2024-02-01'
+        ranged = compute_time_breakdown(df, start, end)
+        in_range = df[(df['date'] >= start) & (df['date'] < end)]
+        expected = in_range.groupby('time_category', observed=True)['hours_worked'].sum()
+        pd.testing.assert_series_equal(ranged['hours_by_category'], expected)
+        assert compute_time_breakdown(None, start, end, cube)['total_hours'] == \
+            pytest.approx(ranged['total_hours'])
@@ -0,0 +1,92 @@
+"""
+Unit tests for timeframe.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.timeframe import TimeIndexedFrame, as_frame
+from analytics.energy_analytics import (
+    calculate_summary_metrics,
+    compute_energy_correlations,
+    compute_metric_trend,
+    compute_time_breakdown,
+    compute_trend_table
+)
+from analytics.sample_data import generate_sample_data
+
+
+@pytest.fixture
+def sample_df():
+    """Sample data over a bit more than three months"""
+    return generate_sample_data(days=100, start_date=datetime(2024, 1, 1), seed=21)
+
+
+class TestTimeIndexedFrame:
+    """Test class for binary-searched windows"""
+
+    def test_windows_match_masks(self, sample_df):
+        """Test window and last against boolean masks"""
+        indexed = TimeIndexedFrame(sample_df)
+        dates = sample_df['date']
+        start, end = datetime(2024, 2, 3, 12), datetime(2024, 3, 1)
+
+        pd.testing.assert_frame_equal(indexed.window(start, end),
+                                      sample_df[(dates >= start) & (dates < end)])
+        pd.testing.assert_frame_equal(indexed.window(end=start), sample_df[dates < start])
+        pd.testing.assert_frame_equal(indexed.window(), sample_df)
+
+        for days, weeks in [(30, 0), (0, 8), (0.5, 0)]:
+            expected = sample_df[dates >= dates.max() - timedelta(days=days, weeks=weeks)]
+            pd.testing.assert_frame_equal(indexed.last(days=days, weeks=weeks), expected)
+
+        assert indexed.min_date == dates.min() and indexed.max_date == dates.max()
+        assert len(indexed) == len(sample_df)
+        assert as_frame(indexed) is indexed.frame and as_frame(sample_df) is sample_df
+
+    def test_sorts_once_and_slices_share_memory(self, sample_df):
+        """Test stable sorting of unsorted input and zero-copy slices"""
+        shuffled = sample_df.sample(frac=1, random_state=0)
+        indexed = TimeIndexedFrame(shuffled)
+        assert indexed.frame['date'].is_monotonic_increasing
+        pd.testing.assert_frame_equal(indexed.frame.sort_index(), sample_df)
+
+        already = TimeIndexedFrame(sample_df)
+        assert already.frame is sample_df
+        assert TimeIndexedFrame.wrap(already) is already
+
+        window = already.last(days=10)
+        assert np.shares_memory(window['physical_energy'].to_numpy(),
+                                sample_df['physical_energy'].to_numpy())
+
+        empty = TimeIndexedFrame(sample_df.iloc[:0])
+        assert empty.last(days=7).empty and pd.isna(empty.max_date)
+
+
+class TestAnalyticsOnTimeIndexedFrame:
+    """Test that analytics functions give the same results for a TimeIndexedFrame"""
+
+    def test_same_results(self, sample_df):
+        """Test period-filtered and whole-frame functions on both inputs"""
+        indexed = TimeIndexedFrame(sample_df)
+
+        assert calculate_summary_metrics(indexed) == calculate_summary_metrics(sample_df)
+        assert calculate_summary_metrics(indexed, 7) == calculate_summary_metrics(sample_df, 7)
+        pd.testing.assert_frame_equal(compute_trend_table(indexed),
+                                      compute_trend_table(sample_df))
+
+        trend, expected = (compute_metric_trend(df, 'mood', trend_weeks=4)
+                           for df in (indexed, sample_df))
+        pd.testing.assert_series_equal(trend['daily'], expected['daily'])
+        assert trend['slope'] == expected['slope']
+
+        pd.testing.assert_series_equal(compute_energy_correlations(indexed)['correlations'],
+                                       compute_energy_correlations(sample_df)['correlations'])
+        assert compute_time_breakdown(indexed)['total_hours'] == \
+            compute_time_breakdown(sample_df)['total_hours']
@@ -0,0 +1,152 @@
+"""
+Unit tests for trend.py module
+"""
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from analytics.trend import TrendEngine, describe_trend, window_trends
+from analytics.energy_analytics import MOOD_SCALE, compute_metric_trend, compute_trend_table
+from analytics.sample_data import generate_sample_data
+
+
+def _daily_means(df):
+    """Daily means of the trend metrics, as DailyAggregateStore.daily_means returns"""
+    return pd.DataFrame({
+        'physical_energy': df['physical_energy'].to_numpy(),
+        'mood_numeric': df['mood'].map(MOOD_SCALE).to_numpy(),
+        'stress': df['stress'].to_numpy(),
+    }, index=df['date']).resample('D').mean()
+
+
+class TestTrendEngine:
+    """Test class for the incremental trend engine"""
+
+    @pytest.fixture
+    def gappy_df(self):
+        """Sample data with a ten-day and a three-day tracking gap"""
+        df = generate_sample_data(days=150, start_date=datetime(2024, 1, 1), seed=1)
+        days = df['date'].dt.normalize()
+        gaps = days.isin(pd.date_range('2024-03-01', '2024-03-10')) | \
+            days.isin(pd.date_range('2024-04-02', '2024-04-04'))
+        return df[~gaps].reset_index(drop=True)
+
+    def test_matches_compute_metric_trend_day_by_day(self, gappy_df):
+        """Test that every update agrees with refitting from scratch"""
+        engine = TrendEngine(['physical_energy', 'mood', 'stress'], windows=(2, 4, 8))
+        daily_all = _daily_means(gappy_df)
+        checked = 0
+
+        for day, day_df in gappy_df.groupby(gappy_df['date'].dt.normalize()):
+            engine.update_frame(day_df)
+            daily = daily_all.loc[:day]
+            for weeks in (2, 4, 8):
+                start = day - pd.Timedelta(weeks=weeks)
+                if start < daily.index[0] or np.isnan(daily.loc[start, 'stress']):
+                    continue
+                for metric in ('physical_energy', 'mood', 'stress'):
+                    expected = compute_metric_trend(None, metric, trend_weeks=weeks, daily=daily)
+                    result = engine.trend(metric, weeks)
+                    assert result['slope'] == pytest.approx(expected['slope'], abs=1e-9)
+                    assert result['change'] == pytest.approx(expected['change'], abs=1e-9)
+                    assert result['days'] == len(expected['daily'])
+                    checked += 1
+
+        assert checked > 800
+
+    def test_single_check_ins(self):
+        """Test feeding check-ins one at a time, several per day"""
+        df = generate_sample_data(days=40, start_date=datetime(2024, 1, 1), seed=4)
+        engine = TrendEngine(windows=(4,))
+        for row in df.to_dict('records'):
+            engine.add(row['date'], row)
+
+        batch = TrendEngine(windows=(4,)).update_frame(df)
+        pd.testing.assert_frame_equal(engine.trends(), batch.trends())
+
+        expected = compute_metric_trend(None, 'cognitive_clarity', trend_weeks=4,
+                                        daily=df.set_index('date')[['cognitive_clarity']]
+                                        .resample('D').mean())
+        result = engine.trend('cognitive_clarity', 4)
+        assert result['slope'] == pytest.approx(expected['slope'])
+        assert result['description'] == expected['description']
+
+    def test_trends_table(self):
+        """Test the table covers every metric and window"""
+        df = generate_sample_data(days=100, start_date=datetime(2024, 1, 1), seed=2)
+        table = TrendEngine().update_frame(df).trends()
+
+        assert len(table) == 16
+        assert set(table['weeks']) == {2, 4, 8, 12}
+        assert set(table['metric']) == {'physical_energy', 'cognitive_clarity',
+                                         'mood_numeric', 'stress'}
+        row = table[(table['metric'] == 'stress') & (table['weeks'] == 12)].iloc[0]
+        assert row['days'] == 85
+        assert row['description'] == describe_trend('stress', row['change'], 12)
+
+    def test_short_history_and_errors(self):
+        """Test windows longer than the history and invalid input"""
+        engine = TrendEngine(['stress'], windows=(2,))
+        engine.add('2024-01-01 09:00', {'stress': 2})
+        assert engine.trend('stress', 2)['slope'] == 0.0
+        engine.add('2024-01-02 09:00', {'stress': 4})
+        assert engine.trend('stress', 2)['slope'] == pytest.approx(1.0)
+
+        with pytest.raises(ValueError):
+            engine.add('2023-12-31 09:00', {'stress': 1})
+        with pytest.raises(KeyError):
+            engine.trend('stress', 8)
+        with pytest.raises(KeyError):
+            engine.trend('hydration', 2)
+
+    def test_describe_trend(self):
+        """Test the description wording"""
+        assert describe_trend('physical_energy', 0.44, 8) == \
+            'Physical Energy has improved by 0.4 points over 8 weeks'
+        assert describe_trend('stress', -1.26, 2) == 'Stress has declined by 1.3 points over 2 weeks'
+
+
+class TestTrendTable:
+    """Test class for the vectorized multi-metric, multi-window trends"""
+
+    def test_matches_engine_and_single_metric_trend(self):
+        """Test the table against the incremental engine and compute_metric_trend"""
+        df = generate_sample_data(days=120, start_date=datetime(2024, 1, 1), seed=3)
+        table = compute_trend_table(df)
+        engine = TrendEngine().update_frame(df).trends()
+
+        pd.testing.assert_frame_equal(table[['metric', 'weeks', 'days']],
+                                      engine[['metric', 'weeks', 'days']])
+        np.testing.assert_allclose(table['slope'], engine['slope'], atol=1e-9)
+        np.testing.assert_allclose(table['change'], engine['change'], atol=1e-9)
+
+        daily = _daily_means(df)
+        from_daily = compute_trend_table(None, ['physical_energy', 'mood', 'stress'],
+                                         windows=(4, 8), daily=daily)
+        for row in from_daily.itertuples():
+            expected = compute_metric_trend(None, row.metric, trend_weeks=row.weeks, daily=daily)
+            assert row.slope == pytest.approx(expected['slope'])
+            assert row.change == pytest.approx(expected['change'])
+            assert row.description == expected['description']
+
+    def test_window_trends_gaps(self):
+        """Test that days without a rolling mean are filled from the previous one"""
+        values = np.full((10, 1), np.nan)
+        values[0] = 2.0
+        values[9] = 4.0
+        fit = window_trends(values, windows=(2,))
+
+        assert fit['starts'][0] == 0
+        assert np.isnan(fit['rolling'][0, 8, 0])
+        assert fit['days'][0, 0] == 10
+        # Rolling means 2 for days 0-6, filled for days 7-8, then 4
+        expected = np.polyfit(np.arange(10), [2.0] * 9 + [4.0], 1)
+        assert fit['slope'][0, 0] == pytest.approx(expected[0])
+        assert fit['intercept'][0, 0] == pytest.approx(expected[1])
+        assert fit['change'][0, 0] == pytest.approx(9 * expected[0])